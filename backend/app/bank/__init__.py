@@ -0,0 +1,5 @@
+"""
+题库工具包
+
+提供题库的离线处理命令，通过 python -m app.bank 调用。
+"""
@@ -0,0 +1,121 @@
+"""
+题库命令行工具
+
+用法：
+    python -m app.bank compile [--data-dir DIR] [--output PATH]
+    python -m app.bank ingest SOURCE [SOURCE ...] [--output-dir DIR] [--workers N] [--dry-run]
+
+compile：读取data目录下的全部试卷JSON，把答案键中的解析合并进题目，
+交叉校验题目ID、分值和正确答案与答案键是否一致，全部通过后编译为可mmap加载的题库打包文件。
+任何试卷校验失败都会列出全部问题并以非零状态退出，不会写出打包文件。
+服务端配置 QUESTION_BANK_PACK 后直接加载打包文件。
+
+ingest：把纯文本试卷（article.txt、questions.txt、answers.txt）并行解析为JSON，
+校验通过后写入 data/papers/<目录名>/，逐份输出进度和校验问题。
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from .ingest import DEFAULT_DIFFICULTY, find_text_papers, ingest_papers
+from ..services.bank_validator import BankValidationError
+from ..services.question_bank import (
+    DATA_DIR,
+    DEFAULT_PACK_NAME,
+    PAPERS_DIR_NAME,
+    QuestionBankService,
+    write_bank_pack
+)
+
+
+def compile_command(args: argparse.Namespace) -> int:
+    """编译题库打包文件"""
+    data_dir = Path(args.data_dir)
+    output = Path(args.output) if args.output else data_dir / DEFAULT_PACK_NAME
+
+    started = time.perf_counter()
+    try:
+        bank = QuestionBankService(data_dir, strict=True).reload()
+    except BankValidationError as e:
+        print(f"题库校验失败，共{len(e.issues)}个问题：", file=sys.stderr)
+        for issue in e.issues:
+            print(f"  - {issue}", file=sys.stderr)
+        return 1
+    path = write_bank_pack(bank, output)
+    elapsed = time.perf_counter() - started
+
+    question_count = sum(entry.question_count for entry in bank.entries)
+    print(f"题库编译完成: {path}")
+    print(f"  版本: {bank.version}")
+    print(f"  试卷: {len(bank)}份，题目: {question_count}道")
+    print(f"  大小: {path.stat().st_size}字节，耗时: {elapsed:.2f}s")
+    return 0
+
+
+def ingest_command(args: argparse.Namespace) -> int:
+    """并行导入纯文本试卷"""
+    sources = find_text_papers([Path(source) for source in args.sources])
+    if not sources:
+        print("没有找到纯文本试卷目录（需包含article.txt、questions.txt、answers.txt）", file=sys.stderr)
+        return 1
+    output_dir = Path(args.output_dir)
+
+    started = time.perf_counter()
+    failed = 0
+    results = ingest_papers(
+        sources,
+        output_dir,
+        workers=args.workers,
+        difficulty=args.difficulty,
+        dry_run=args.dry_run,
+        overwrite=args.overwrite
+    )
+    for done, result in enumerate(results, start=1):
+        prefix = f"[{done}/{len(sources)}]"
+        if result.ok:
+            target = result.output or "（未写入）"
+            print(f"{prefix} OK   {result.paper_id}: {result.question_count}道题目 -> {target}", flush=True)
+        else:
+            failed += 1
+            print(f"{prefix} FAIL {result.paper_id} ({result.source}):", flush=True)
+            for issue in result.issues:
+                print(f"         - {issue}", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"导入完成: 成功{len(sources) - failed}份，失败{failed}份，耗时{elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(prog="python -m app.bank", description="DSE题库工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", help="把JSON题库编译为打包文件")
+    compile_parser.add_argument("--data-dir", default=str(DATA_DIR), help="题库数据目录")
+    compile_parser.add_argument("--output", help=f"输出文件路径（默认: <data-dir>/{DEFAULT_PACK_NAME}）")
+    compile_parser.set_defaults(func=compile_command)
+
+    ingest_parser = subparsers.add_parser("ingest", help="把纯文本试卷导入为JSON题库")
+    ingest_parser.add_argument("sources", nargs="+", help="试卷目录，或包含多个试卷子目录的目录")
+    ingest_parser.add_argument(
+        "--output-dir",
+        default=str(DATA_DIR / PAPERS_DIR_NAME),
+        help=f"输出目录（默认: data/{PAPERS_DIR_NAME}）"
+    )
+    ingest_parser.add_argument("--workers", type=int, help="并行进程数（默认: CPU核数）")
+    ingest_parser.add_argument("--difficulty", default=DEFAULT_DIFFICULTY, help="试卷难度等级")
+    ingest_parser.add_argument("--dry-run", action="store_true", help="只解析和校验，不写入文件")
+    ingest_parser.add_argument("--overwrite", action="store_true", help="覆盖已存在的试卷目录")
+    ingest_parser.set_defaults(func=ingest_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,441 @@
+"""
+纯文本试卷导入
+
+把纯文本格式的DSE试卷（article.txt、questions.txt、answers.txt）解析为题库JSON格式，
+交叉校验后写入题库目录。多份试卷在进程池中并行解析，结果按完成顺序逐条返回。
+
+文本格式约定（与data目录下的txt文件一致）：
+- article.txt：首段为标题；"[n] "开头的段落为正文第n段；其余单行段落为小标题；
+  末尾形如"2023-DSE-..."的一行为试卷编号
+- questions.txt："Question N (M marks)"开头的题目块；"(i) 词语 ____"为填空子题目，
+  "A. 选项"为选择题选项，含"Available Options:"和"Timeline:"的为时序题
+- answers.txt："Question N Answers:"下为各题答案，"Detailed Explanations:"后为各题解析
+"""
+
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..services.bank_validator import validate_paper
+from ..services.question_bank import ANSWERS_FILE, ARTICLE_FILE, QUESTIONS_FILE
+
+# 纯文本试卷的数据文件
+TEXT_FILES = ("article.txt", "questions.txt", "answers.txt")
+
+DEFAULT_AUTHOR = "DSE English Language Paper"
+DEFAULT_DIFFICULTY = "Medium"
+
+_NUMBERED_PARAGRAPH_RE = re.compile(r"^\[(\d+)\]\s")
+_LIST_ITEM_RE = re.compile(r"^\d+\.\s")
+_REFERENCE_RE = re.compile(r"^(\d{4})-DSE-\S.*$")
+_QUESTION_HEADER_RE = re.compile(r"^Question\s+(\d+)(?:\s*\((\d+)\s+marks?\))?\s*$", re.IGNORECASE)
+_SUB_QUESTION_RE = re.compile(r"^\(([ivx]+)\)\s+(.*?)\s*_{3,}\s*$")
+_OPTION_RE = re.compile(r"^([A-H])\.\s+(.+)$")
+_TIMELINE_BLANK_RE = re.compile(r"^\(([ivx]+)\)\s*\[_+\]$")
+_PARAGRAPH_REF_RE = re.compile(r"paragraphs?\s+([\d\s,\-–]+(?:\s*(?:or|and)\s*\d+)?)", re.IGNORECASE)
+_ANSWER_HEADER_RE = re.compile(r"^Question\s+(\d+)\s+Answers?:\s*$", re.IGNORECASE)
+_EXPLANATION_HEADER_RE = re.compile(r"^Question\s+(\d+):\s*$", re.IGNORECASE)
+_SUB_ANSWER_RE = re.compile(r"^\(([ivx]+)\)\s+(.+)$")
+_WORD_RE = re.compile(r"[A-Za-z0-9']+")
+
+
+class IngestError(Exception):
+    """纯文本试卷无法解析"""
+
+
+class IngestResult(NamedTuple):
+    """单份试卷的导入结果（跨进程传递）"""
+    source: str
+    paper_id: str
+    question_count: int
+    issues: Tuple[str, ...]
+    output: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def _blocks(text: str) -> List[List[str]]:
+    """按空行切分文本块，每块为去掉行尾空白的非空行列表"""
+    blocks: List[List[str]] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line.strip():
+            current.append(line)
+        elif current:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+# ===== 文章 =====
+
+def parse_article(
+    text: str,
+    paper_id: str,
+    difficulty: str = DEFAULT_DIFFICULTY,
+    author: str = DEFAULT_AUTHOR
+) -> Tuple[Dict[str, Any], Dict[int, str]]:
+    """
+    解析article.txt
+
+    小标题层级无法从纯文本中区分，默认为3级，紧跟在另一个小标题后的为4级。
+
+    Returns:
+        (article.json内容, 原文段落号 -> 段落ID)
+    """
+    blocks = _blocks(text)
+    if not blocks:
+        raise IngestError("article.txt为空")
+
+    title = " ".join(line.strip() for line in blocks[0])
+    reference = None
+    if len(blocks) > 1 and len(blocks[-1]) == 1 and _REFERENCE_RE.match(blocks[-1][0].strip()):
+        reference = blocks.pop()[0].strip()
+    if reference is None:
+        raise IngestError("article.txt末尾缺少试卷编号（如2023-DSE-ENG LANG 1-A-RP-2）")
+
+    paragraphs: List[Dict[str, Any]] = []
+    numbered: Dict[int, str] = {}
+    paragraph_count = heading_count = 0
+    previous_type = None
+    for block in blocks[1:]:
+        content = " ".join(line.strip() for line in block)
+        match = _NUMBERED_PARAGRAPH_RE.match(content)
+        if match or _LIST_ITEM_RE.match(content) or len(block) > 1:
+            paragraph_count += 1
+            para_id = f"p{paragraph_count}"
+            if match:
+                numbered[int(match.group(1))] = para_id
+            paragraphs.append({"id": para_id, "type": "paragraph", "content": content})
+            previous_type = "paragraph"
+        else:
+            heading_count += 1
+            paragraphs.append({
+                "id": f"h{heading_count}",
+                "type": "heading",
+                "level": 4 if previous_type == "heading" else 3,
+                "content": content
+            })
+            previous_type = "heading"
+
+    if not numbered:
+        raise IngestError("article.txt中没有找到[n]编号段落")
+
+    word_count = sum(
+        len(_WORD_RE.findall(_NUMBERED_PARAGRAPH_RE.sub("", para["content"])))
+        for para in paragraphs if para["type"] == "paragraph"
+    )
+    article = {
+        "id": paper_id,
+        "title": title,
+        "author": author,
+        "publicationDate": _REFERENCE_RE.match(reference).group(1),
+        "reference": reference,
+        "wordCount": word_count,
+        "difficulty": difficulty,
+        "paragraphs": paragraphs
+    }
+    return article, numbered
+
+
+def _reference_paragraphs(question_text: str, numbered: Dict[int, str]) -> List[str]:
+    """从题干中的"paragraph(s) ..."提取参考段落ID"""
+    numbers: List[int] = []
+    for match in _PARAGRAPH_REF_RE.finditer(question_text):
+        for part in re.split(r",|\bor\b|\band\b", match.group(1)):
+            part = part.strip()
+            bounds = re.split(r"\s*[-–]\s*", part)
+            if len(bounds) == 2 and all(b.isdigit() for b in bounds):
+                numbers.extend(range(int(bounds[0]), int(bounds[1]) + 1))
+            elif part.isdigit():
+                numbers.append(int(part))
+    return [numbered[n] for n in dict.fromkeys(numbers) if n in numbered]
+
+
+# ===== 题目 =====
+
+def _parse_timeline(lines: List[str], qid: str) -> List[Dict[str, str]]:
+    """
+    解析时序题的时间线
+
+    时间线行用"→"分隔，"(i) [____]"为待填空格，其余为固定事件；
+    下方"↑"行和说明行按列对齐，说明文字归到列位置最近的事件。
+    """
+    timeline_index = next((i for i, line in enumerate(lines) if line.strip() == "Timeline:"), None)
+    if timeline_index is None or timeline_index + 1 >= len(lines):
+        raise IngestError(f"{qid}: 时序题缺少Timeline")
+    timeline_line = lines[timeline_index + 1]
+
+    events: List[Dict[str, str]] = []
+    starts: List[int] = []
+    column = 0
+    for part in timeline_line.split("→"):
+        item = part.strip()
+        if item:
+            starts.append(column + part.index(item))
+            blank = _TIMELINE_BLANK_RE.match(item)
+            events.append({
+                "id": f"event{len(events) + 1}",
+                "position": blank.group(1) if blank else "fixed",
+                "description": "" if blank else item
+            })
+        column += len(part) + 1
+
+    # ↑标记行与其下一行的说明文字
+    following = lines[timeline_index + 2:timeline_index + 4]
+    if len(following) == 2 and "↑" in following[0]:
+        arrows = [i for i, ch in enumerate(following[0]) if ch == "↑"]
+        for label in re.finditer(r"\S+(?: \S+)*", following[1]):
+            arrow = min(arrows, key=lambda col: abs(col - label.start()))
+            event = min(range(len(events)), key=lambda i: abs(starts[i] - arrow))
+            if events[event]["position"] != "fixed" and not events[event]["description"]:
+                events[event]["description"] = label.group(0)
+    return events
+
+
+def parse_questions(text: str, numbered: Dict[int, str]) -> List[Dict[str, Any]]:
+    """解析questions.txt（不含答案，正确答案在合并答案时填入）"""
+    questions: List[Dict[str, Any]] = []
+    current: Optional[Tuple[int, Optional[int], List[str]]] = None
+    sections: List[Tuple[int, Optional[int], List[str]]] = []
+    for line in text.splitlines():
+        header = _QUESTION_HEADER_RE.match(line.strip())
+        if header:
+            current = (int(header.group(1)), int(header.group(2)) if header.group(2) else None, [])
+            sections.append(current)
+        elif current is not None:
+            current[2].append(line.rstrip())
+    if not sections:
+        raise IngestError("questions.txt中没有找到Question N题目")
+
+    for number, marks, lines in sections:
+        qid = f"q{number}"
+        blocks = _blocks("\n".join(lines))
+        if not blocks:
+            raise IngestError(f"{qid}: 缺少题干")
+        question_text = " ".join(line.strip() for line in blocks[0])
+        body = [line.strip() for block in blocks[1:] for line in block]
+        stripped = [line.strip() for line in lines]
+
+        question: Dict[str, Any] = {
+            "id": qid,
+            "questionNumber": number,
+            # 与手工转换的题目一致，分值保留在题干末尾
+            "questionText": f"{question_text} ({marks} marks)" if marks else question_text,
+        }
+        if "Available Options:" in stripped and "Timeline:" in stripped:
+            start = stripped.index("Available Options:") + 1
+            options = []
+            for line in stripped[start:]:
+                option = _OPTION_RE.match(line)
+                if not option:
+                    break
+                options.append({"letter": option.group(1), "description": option.group(2)})
+            events = _parse_timeline(lines, qid)
+            question.update({
+                "type": "timeline-sequencing",
+                "timelineEvents": events,
+                "availableOptions": options,
+                "correctAnswers": {},
+                "totalMarks": marks or sum(1 for e in events if e["position"] != "fixed"),
+                "skillType": "sequencing",
+            })
+        elif any(_SUB_QUESTION_RE.match(line) for line in body):
+            sub_questions = []
+            for line in body:
+                sub = _SUB_QUESTION_RE.match(line)
+                if sub:
+                    sub_questions.append({
+                        "id": f"{qid}_{sub.group(1)}",
+                        "questionText": f"({sub.group(1)}) {sub.group(2)}",
+                        "correctAnswer": "",
+                        "marks": 1
+                    })
+            question.update({
+                "type": "fill-in-blank",
+                "subQuestions": sub_questions,
+                "totalMarks": marks or len(sub_questions),
+                "skillType": "vocabulary" if "meaning" in question_text.lower() else "detail",
+            })
+        elif any(_OPTION_RE.match(line) for line in body):
+            question.update({
+                "type": "multiple-choice",
+                "options": [line for line in body if _OPTION_RE.match(line)],
+                "correctAnswer": "",
+                "totalMarks": marks or 1,
+                "skillType": "detail",
+            })
+        else:
+            raise IngestError(f"{qid}: 无法识别题目类型")
+
+        if marks is not None:
+            # 题头标注了分值的填空题，分值按子题目平均分配
+            subs = question.get("subQuestions")
+            if subs and marks % len(subs) == 0:
+                for sub in subs:
+                    sub["marks"] = marks // len(subs)
+        question["referenceParagraphs"] = _reference_paragraphs(question_text, numbered)
+        questions.append(question)
+    return questions
+
+
+# ===== 答案 =====
+
+def parse_answers(text: str, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    解析answers.txt，生成answers.json内容，并把正确答案填入题目
+
+    填空题解析中以"- "开头的各行按顺序对应各子题目。
+    """
+    by_number = {q["questionNumber"]: q for q in questions}
+    answer_lines: Dict[int, List[str]] = {}
+    explanation_lines: Dict[int, List[str]] = {}
+
+    target: Optional[List[str]] = None
+    in_explanations = False
+    for raw in text.splitlines():
+        line = raw.strip()
+        if line.lower().startswith("detailed explanations"):
+            in_explanations = True
+            target = None
+            continue
+        header = (_EXPLANATION_HEADER_RE if in_explanations else _ANSWER_HEADER_RE).match(line)
+        if header:
+            target = (explanation_lines if in_explanations else answer_lines).setdefault(int(header.group(1)), [])
+        elif line and target is not None:
+            target.append(line)
+
+    answers: Dict[str, Any] = {}
+    for number, question in by_number.items():
+        qid = question["id"]
+        lines = answer_lines.get(number)
+        if not lines:
+            raise IngestError(f"{qid}: answers.txt中缺少答案")
+        explanation = explanation_lines.get(number, [])
+        explanation_text = " ".join(line[2:] if line.startswith("- ") else line for line in explanation)
+
+        if question["type"] == "multiple-choice":
+            option = _OPTION_RE.match(lines[0]) or re.match(r"^([A-H])\b", lines[0])
+            if not option:
+                raise IngestError(f"{qid}: 无法解析选择题答案 {lines[0]!r}")
+            question["correctAnswer"] = option.group(1)
+            answers[qid] = {"answer": option.group(1), "explanation": explanation_text}
+
+        elif question["type"] == "fill-in-blank":
+            sub_answers = {}
+            for line in lines:
+                sub = _SUB_ANSWER_RE.match(line)
+                if sub:
+                    sub_answers[sub.group(1)] = sub.group(2).split("→")[-1].strip()
+            bullets = [line[2:].strip() for line in explanation if line.startswith("- ")]
+            answers[qid] = {}
+            for position, sub in enumerate(question["subQuestions"]):
+                roman = sub["id"].rsplit("_", 1)[-1]
+                if roman not in sub_answers:
+                    raise IngestError(f"{sub['id']}: answers.txt中缺少答案")
+                sub["correctAnswer"] = sub_answers[roman]
+                answers[qid][sub["id"]] = {
+                    "answer": sub_answers[roman],
+                    "explanation": bullets[position] if position < len(bullets) else ""
+                }
+
+        else:
+            correct = {}
+            for line in lines:
+                sub = _SUB_ANSWER_RE.match(line)
+                if sub:
+                    correct[sub.group(1)] = sub.group(2).split()[0]
+            question["correctAnswers"] = correct
+            answers[qid] = {**correct, "explanation": explanation_text}
+
+    return answers
+
+
+# ===== 导入流程 =====
+
+def ingest_paper(
+    source_dir: str,
+    output_root: str,
+    difficulty: str = DEFAULT_DIFFICULTY,
+    dry_run: bool = False,
+    overwrite: bool = False
+) -> IngestResult:
+    """
+    导入一份纯文本试卷（在进程池中执行）
+
+    解析、交叉校验全部通过后写入 <output_root>/<试卷ID>/ 下的三个JSON文件；
+    有任何问题时不写入，问题列表随结果返回。
+    """
+    source = Path(source_dir)
+    paper_id = source.name
+    try:
+        texts = [(source / name).read_text(encoding="utf-8") for name in TEXT_FILES]
+        article, numbered = parse_article(texts[0], paper_id, difficulty)
+        questions = parse_questions(texts[1], numbered)
+        answers = parse_answers(texts[2], questions)
+    except (OSError, IngestError) as e:
+        return IngestResult(str(source), paper_id, 0, (str(e),), None)
+
+    issues = tuple(validate_paper(article, questions, answers))
+    for question in questions:
+        if not question["referenceParagraphs"]:
+            issues += (f"{question['id']}: 题干中没有找到参考段落",)
+    if issues:
+        return IngestResult(str(source), paper_id, len(questions), issues, None)
+
+    output_dir = Path(output_root) / paper_id
+    if dry_run:
+        return IngestResult(str(source), paper_id, len(questions), (), None)
+    if output_dir.exists() and not overwrite:
+        return IngestResult(str(source), paper_id, len(questions), (f"目标目录已存在: {output_dir}",), None)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # 文章最后写入：题库监视以article.json判断试卷目录是否存在
+    for name, data in ((QUESTIONS_FILE, questions), (ANSWERS_FILE, answers), (ARTICLE_FILE, article)):
+        path = output_dir / name
+        tmp_path = path.with_name(f".{name}.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+    return IngestResult(str(source), paper_id, len(questions), (), str(output_dir))
+
+
+def find_text_papers(paths: Sequence[Path]) -> List[Path]:
+    """查找纯文本试卷目录：给定目录本身或其直接子目录中包含article.txt的目录"""
+    found: List[Path] = []
+    for path in paths:
+        if (path / TEXT_FILES[0]).exists():
+            found.append(path)
+        elif path.is_dir():
+            found.extend(child for child in sorted(path.iterdir()) if (child / TEXT_FILES[0]).exists())
+    return found
+
+
+def ingest_papers(
+    sources: Sequence[Path],
+    output_root: Path,
+    workers: Optional[int] = None,
+    difficulty: str = DEFAULT_DIFFICULTY,
+    dry_run: bool = False,
+    overwrite: bool = False
+) -> Iterator[IngestResult]:
+    """
+    在进程池中并行导入多份试卷，按完成顺序逐条产出结果
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(ingest_paper, str(source), str(output_root), difficulty, dry_run, overwrite): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                source = futures[future]
+                yield IngestResult(str(source), source.name, 0, (f"{type(e).__name__}: {e}",), None)
@@ -0,0 +1,170 @@
+from pydantic_settings import BaseSettings
+from pydantic import field_validator
+from typing import Optional, List, Union
+import os
+import json
+
+
+class Settings(BaseSettings):
+    """应用程序配置"""
+    # 基本设置
+    APP_NAME: str = "DSE AI Teacher API"
+    VERSION: str = "1.0.0"
+    API_V1_STR: str = "/api"
+    DEBUG: bool = True  # 🔥 临时开启DEBUG模式以诊断TTS问题
+    
+    # 服务器配置
+    HOST: str = "0.0.0.0"
+    PORT: int = 8001
+    WORKER_ID: Optional[int] = None  # ID生成器的worker ID（0-65535），未配置时根据主机名和进程号推导
+    
+    # CORS配置
+    ALLOWED_ORIGINS: Union[List[str], str] = [
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        "http://localhost:8080",
+        "http://127.0.0.1:8080"
+    ]
+    
+    # OpenRouter API配置
+    OPENROUTER_API_KEY: Optional[str] = None
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+    
+    # Azure Speech服务配置 (已弃用，替换为Minimax)
+    AZURE_SPEECH_KEY: Optional[str] = None
+    AZURE_SPEECH_REGION: Optional[str] = None
+    
+    # Minimax TTS服务配置
+    MINIMAX_API_KEY: Optional[str] = None
+    MINIMAX_GROUP_ID: Optional[str] = None
+    MINIMAX_TTS_MODEL: str = "speech-02-hd"
+    
+    # AI模型配置
+    DEFAULT_MODEL: str = "qwen/qwen3-235b-a22b"
+    MODEL_MAX_TOKENS: int = 4000
+    MODEL_TEMPERATURE: float = 0.1
+    
+    # 文件路径配置
+    DATA_DIR: str = "../data"
+    LOGS_DIR: str = "logs"
+    
+    # 题库配置
+    QUESTION_BANK_PACK: Optional[str] = None  # 题库打包文件路径（相对data目录），未配置时直接读取JSON
+    QUESTION_BANK_WATCH: bool = True  # 是否监视数据文件并热重载
+    QUESTION_BANK_WATCH_INTERVAL: float = 2.0  # 数据文件检查间隔（秒）
+    
+    # 提交记录存储配置
+    SUBMISSION_STORE_BACKEND: str = "memory"  # memory（进程内）或 redis（多worker共享，需配置REDIS_URL）
+    SUBMISSION_STORE_MAX_ENTRIES: int = 10000  # 最大提交记录数
+    SUBMISSION_STORE_MAX_MEMORY_MB: int = 256  # 提交记录估算内存上限（MB）
+    SUBMISSION_COMPLETED_TTL: float = 3600  # 批改完成记录保留时间（秒）
+    SUBMISSION_FAILED_TTL: float = 600  # 批改失败和已取消记录保留时间（秒）
+    SUBMISSION_SWEEP_INTERVAL: float = 60  # 过期记录清理间隔（秒）
+    
+    # 共享HTTP连接池配置（聊天和批改访问OpenRouter）
+    HTTP_MAX_CONNECTIONS: int = 100  # 最大连接数
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20  # 最多保留的空闲keep-alive连接数
+    HTTP_KEEPALIVE_EXPIRY: float = 30  # 空闲连接保留时间（秒）
+    HTTP_CONNECT_TIMEOUT: float = 10  # 建立连接超时（秒）
+    HTTP2_ENABLED: bool = False  # 启用HTTP/2多路复用（需要安装h2）
+    
+    # 批改调度配置
+    GRADING_CONCURRENCY: int = 4  # 同时执行的批改任务数
+    GRADING_MAX_QUEUE_DEPTH: int = 200  # 最大排队任务数，超出时拒绝提交（503）
+    GRADING_BATCH_MAX_SIZE: int = 60  # 批量提交单次最多答卷数
+    GRADING_JOB_DEADLINE: float = 180  # 单个批改任务的执行时限（秒），超时取消；0表示不限
+    GRADING_SUPERSEDE_ON_RESUBMIT: bool = True  # 同一clientId对同一试卷重新提交时取消未完成的旧提交
+    GRADING_STREAM_ENABLED: bool = True  # 使用流式接口调用模型，每完成一道小题推进进度并提前展示该小题结果
+    
+    # 批改任务日志配置（单进程部署；配置路径后服务重启时恢复未完成的批改任务）
+    GRADING_JOURNAL_PATH: Optional[str] = None  # 日志文件路径，例如 data/grading-journal.jsonl
+    GRADING_JOURNAL_FSYNC_INTERVAL: float = 0.1  # 批量写入并fsync的间隔（秒）
+    GRADING_JOURNAL_COMPACT_EVERY: int = 5000  # 追加多少条后压缩日志
+    GRADING_JOURNAL_RETENTION: float = 3600  # 已结束提交在日志中的保留时间（秒）
+    
+    # 整卷批改缓存配置
+    GRADING_CACHE_ENABLED: bool = True  # 答卷相同时复用批改结果
+    GRADING_CACHE_MAX_ENTRIES: int = 1000  # 进程内LRU最大条目数
+    GRADING_HYBRID_ENABLED: bool = True  # 选择题/时序题及与标准答案一致的填空题在本地评分，不交给模型
+    GRADING_VERDICT_CACHE_ENABLED: bool = True  # 按小题缓存判定，只把未见过的小题答案发给模型
+    GRADING_VERDICT_CACHE_MAX_ENTRIES: int = 20000  # 逐题判定缓存进程内最大条目数
+    GRADING_CACHE_BACKING: Optional[str] = None  # 后备存储：disk（GRADING_CACHE_DIR）或 redis（REDIS_URL），为空时只用进程内缓存
+    GRADING_CACHE_DIR: str = "cache/grading"  # 磁盘后备存储目录
+    GRADING_CACHE_TTL: int = 604800  # Redis后备存储过期时间（秒）
+    
+    # 安全配置
+    SECRET_KEY: str = "your-secret-key-change-in-production"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    
+    # 数据库配置（批改结果持久化，例如 sqlite:///./results.db；未配置时不持久化）
+    DATABASE_URL: Optional[str] = None
+    RESULTS_DB_FLUSH_INTERVAL: float = 0.5  # 批量写入间隔（秒）
+    RESULTS_DB_BATCH_SIZE: int = 200  # 单批最多写入条数
+    
+    # Redis配置（SUBMISSION_STORE_BACKEND=redis或GRADING_CACHE_BACKING=redis时使用）
+    REDIS_URL: Optional[str] = None
+    
+    # 日志配置
+    LOG_LEVEL: str = "DEBUG"  # 🔥 临时设置为DEBUG以诊断TTS问题
+    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    
+    @field_validator('ALLOWED_ORIGINS', mode='before')
+    @classmethod
+    def parse_cors_origins(cls, v):
+        """解析 CORS 原点配置"""
+        # 默认允许的来源
+        default_origins = [
+            "http://localhost:3000",
+            "http://127.0.0.1:3000",
+            "http://localhost:8080",
+            "http://127.0.0.1:8080"
+        ]
+        
+        # 如果 v 是 None 或未定义，返回默认值
+        if v is None:
+            return default_origins
+            
+        # 如果是字符串类型
+        if isinstance(v, str):
+            if v.strip() == "":
+                # 空字符串，返回默认值
+                return default_origins
+            try:
+                # 尝试解析为 JSON
+                parsed = json.loads(v)
+                if isinstance(parsed, list):
+                    return parsed
+                else:
+                    return [str(parsed)]
+            except json.JSONDecodeError:
+                # 如果不是有效的 JSON，将其视为单个 origin
+                return [v.strip()]
+        
+        # 如果已经是列表，直接返回
+        if isinstance(v, list):
+            return v
+            
+        # 其他情况返回默认值
+        return default_origins
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+        extra = "ignore"  # 忽略额外的环境变量
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # 确保日志目录存在
+        os.makedirs(self.LOGS_DIR, exist_ok=True)
+
+
+# 全局配置实例
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """获取配置实例（单例模式）"""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings 
\ No newline at end of file
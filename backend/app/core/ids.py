@@ -0,0 +1,194 @@
+"""
+ID生成
+
+生成单调递增、按时间排序、跨worker不冲突的ID（ULID格式的变体）：
+
+    | 48位毫秒时间戳 | 16位worker ID | 64位序号 |
+
+128位按Crockford Base32编码为26个字符，字典序与生成时间一致，
+因此按创建时间的范围查询可以直接作用于ID（见id_bounds）。
+
+- 同一毫秒内序号递增，保证同一进程内严格单调
+- 每毫秒的起始序号随机，worker ID来自WORKER_ID配置或主机名+进程号，多worker部署也不会冲突
+- 系统时钟回拨时沿用上一次的时间戳继续递增，不会生成更小的ID
+"""
+
+import hashlib
+import os
+import secrets
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from .config import get_settings
+
+# Crockford Base32字母表（不含I、L、O、U）
+ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+DECODING = {char: index for index, char in enumerate(ENCODING)}
+ENCODED_LENGTH = 26
+
+TIMESTAMP_BITS = 48
+WORKER_BITS = 16
+SEQUENCE_BITS = 64
+
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# 每毫秒的起始序号只取低63位随机数，留出足够的递增空间
+SEQUENCE_SEED_BITS = SEQUENCE_BITS - 1
+
+SUBMISSION_PREFIX = "submission_"
+
+
+def encode(value: int) -> str:
+    """把128位整数编码为26个字符的Crockford Base32"""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        chars.append(ENCODING[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def decode(text: str) -> int:
+    """
+    解码26个字符的Crockford Base32
+
+    Raises:
+        ValueError: 长度或字符不合法
+    """
+    if len(text) != ENCODED_LENGTH:
+        raise ValueError(f"ID长度必须为{ENCODED_LENGTH}: {text}")
+    value = 0
+    for char in text.upper():
+        if char not in DECODING:
+            raise ValueError(f"ID包含非法字符 {char}: {text}")
+        value = (value << 5) | DECODING[char]
+    return value
+
+
+def default_worker_id() -> int:
+    """根据主机名和进程号推导worker ID"""
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode()
+    return int.from_bytes(hashlib.blake2b(seed, digest_size=2).digest(), "big")
+
+
+class IdGenerator:
+    """
+    单调ID生成器（线程安全）
+
+    同一生成器生成的ID严格递增；不同worker的生成器因worker ID和随机序号不同而不会冲突。
+    """
+
+    def __init__(self, prefix: str = "", worker_id: Optional[int] = None):
+        """
+        初始化生成器
+
+        Args:
+            prefix: ID前缀，例如 submission_
+            worker_id: worker ID（0-65535），未提供时根据主机名和进程号推导
+
+        Raises:
+            ValueError: worker ID超出范围
+        """
+        self._derived_worker_id = worker_id is None
+        if worker_id is None:
+            worker_id = default_worker_id()
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker ID必须在0-{MAX_WORKER_ID}之间: {worker_id}")
+
+        self.prefix = prefix
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+        self._pid = os.getpid()
+
+    def _next(self) -> Tuple[int, int]:
+        """返回下一个(毫秒时间戳, 序号)"""
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > self._last_ms:
+            self._last_ms = now_ms
+            self._sequence = secrets.randbits(SEQUENCE_SEED_BITS)
+        elif self._sequence < MAX_SEQUENCE:
+            # 同一毫秒内（或时钟回拨）：沿用上一次的时间戳，序号递增
+            self._sequence += 1
+        else:
+            # 序号耗尽（实际不会发生）：借用下一毫秒
+            self._last_ms += 1
+            self._sequence = secrets.randbits(SEQUENCE_SEED_BITS)
+        return self._last_ms, self._sequence
+
+    def new_id(self) -> str:
+        """生成新ID"""
+        with self._lock:
+            if os.getpid() != self._pid:
+                # fork出的子进程（多worker）重新推导worker ID并重置序号
+                self._pid = os.getpid()
+                self._last_ms = -1
+                if self._derived_worker_id:
+                    self.worker_id = default_worker_id()
+            timestamp_ms, sequence = self._next()
+            worker_id = self.worker_id
+        value = (timestamp_ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | sequence
+        return f"{self.prefix}{encode(value)}"
+
+
+def parse_id(value: str, prefix: str = "") -> Tuple[datetime, int, int]:
+    """
+    解析ID
+
+    Returns:
+        Tuple[datetime, int, int]: (生成时间(UTC), worker ID, 序号)
+
+    Raises:
+        ValueError: 前缀或编码不合法
+    """
+    if not value.startswith(prefix):
+        raise ValueError(f"ID前缀不是{prefix}: {value}")
+    raw = decode(value[len(prefix):])
+    timestamp_ms = raw >> (WORKER_BITS + SEQUENCE_BITS)
+    worker_id = (raw >> SEQUENCE_BITS) & MAX_WORKER_ID
+    sequence = raw & MAX_SEQUENCE
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc), worker_id, sequence
+
+
+def _timestamp_ms(moment: datetime) -> int:
+    # 不带时区的时间按本地时间处理，与datetime.now()一致
+    return int(moment.timestamp() * 1000)
+
+
+def id_bounds(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    prefix: str = ""
+) -> Tuple[str, str]:
+    """
+    计算时间范围对应的ID范围
+
+    [start, end) 内生成的ID满足 lower <= id < upper，可直接用于按ID的范围查询。
+
+    Args:
+        start: 起始时间（含），None表示不限
+        end: 结束时间（不含），None表示不限
+        prefix: ID前缀
+
+    Returns:
+        Tuple[str, str]: (lower, upper)
+    """
+    shift = WORKER_BITS + SEQUENCE_BITS
+    lower = _timestamp_ms(start) << shift if start is not None else 0
+    upper = _timestamp_ms(end) << shift if end is not None else (1 << (TIMESTAMP_BITS + shift)) - 1
+    return f"{prefix}{encode(lower)}", f"{prefix}{encode(upper)}"
+
+
+# 全局提交ID生成器
+_submission_ids: Optional[IdGenerator] = None
+
+
+def new_submission_id() -> str:
+    """生成提交ID（submission_ + 26字符有序ID）"""
+    global _submission_ids
+    if _submission_ids is None:
+        _submission_ids = IdGenerator(SUBMISSION_PREFIX, worker_id=get_settings().WORKER_ID)
+    return _submission_ids.new_id()
@@ -27,9 +27,17 @@ if sys.platform.startswith('win'):
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
 from .core.config import get_settings
-from .routes.dse import router as dse_router
+from .routes.dse import resume_from_journal, router as dse_router
 from .routes.chat import router as chat_router
 from .routes.tts import router as tts_router
+from .services.question_bank import get_question_bank
+from .services.grading_cache import close_grading_caches, get_grading_cache, get_verdict_cache
+from .services.grading_journal import get_grading_journal
+from .services.grading_scheduler import get_grading_scheduler
+from .services.http_client import get_http_client
+from .services.progress_bus import get_progress_bus
+from .services.results_db import get_results_db
+from .services.submission_store import get_submission_store
 from .models.dse_models import ErrorResponse
 
 # 获取配置
@@ -116,7 +124,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             error=True,
             message=exc.detail,
             code=f"HTTP_{exc.status_code}"
-        ).dict()
+        ).dict(),
+        headers=exc.headers
     )
 
 
@@ -236,6 +245,7 @@ async def health_check():
     """
     try:
         # 这里可以添加数据库、Redis等依赖项检查
+        question_bank = get_question_bank()
         health_status = {
             "status": "healthy",
             "service": settings.APP_NAME,
@@ -243,9 +253,18 @@ async def health_check():
             "timestamp": datetime.now().isoformat(),
             "uptime": "运行中",
             "dependencies": {
-                "data_files": "可用",
+                "data_files": "可用" if question_bank.version else "未加载",
                 "ai_service": "可用" if settings.OPENROUTER_API_KEY else "未配置"
-            }
+            },
+            "question_bank": question_bank.status(),
+            "submission_store": get_submission_store().stats(),
+            "grading_scheduler": get_grading_scheduler().stats(),
+            "grading_cache": get_grading_cache().stats() if get_grading_cache() else None,
+            "verdict_cache": get_verdict_cache().stats() if get_verdict_cache() else None,
+            "progress_bus": get_progress_bus().stats(),
+            "grading_journal": get_grading_journal().stats() if get_grading_journal() else None,
+            "http_client": get_http_client().stats(),
+            "results_db": get_results_db().stats() if get_results_db() else None
         }
         
         logger.info("健康检查通过")
@@ -273,6 +292,36 @@ async def startup_event():
         logger.warning("WARNING: OPENROUTER_API_KEY 未配置，AI功能将使用降级模式")
     else:
         logger.info("SUCCESS: OpenRouter API 配置完成")
+    
+    # 预编译题库快照，避免首个请求承担编译开销
+    question_bank = get_question_bank()
+    try:
+        await question_bank.get_snapshot()
+        logger.info(f"题库已就绪: 版本{question_bank.version}")
+    except Exception as e:
+        logger.error(f"题库预编译失败，将在首次请求时重试: {e}")
+    
+    # 监视数据文件，变化时后台重建并原子替换题库
+    if settings.QUESTION_BANK_WATCH:
+        question_bank.start_watcher(settings.QUESTION_BANK_WATCH_INTERVAL)
+    
+    # 创建共享HTTP连接池（聊天和批改复用到OpenRouter的连接）
+    await get_http_client().start()
+    
+    # 启动提交记录存储（过期记录清理任务）
+    await get_submission_store().start()
+    
+    # 打开批改结果数据库（配置了DATABASE_URL时）
+    # 配置了批改任务日志时，重启前未完成的任务由日志重放决定重新排队还是标记失败
+    results_db = get_results_db()
+    if results_db is not None:
+        await results_db.start(mark_interrupted=get_grading_journal() is None)
+    
+    # 启动批改调度器worker
+    await get_grading_scheduler().start()
+    
+    # 重放批改日志：恢复已结束的结果，重启前未完成的批改重新排队（配置了GRADING_JOURNAL_PATH时）
+    await resume_from_journal()
 
 
 # 关闭事件
@@ -280,6 +329,17 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭事件"""
     logger.info(f"{settings.APP_NAME} 正在关闭...")
+    await get_question_bank().stop_watcher()
+    # 先停止批改：被中断的任务没有结束条目，下次启动时重新排队
+    await get_grading_scheduler().close()
+    if get_grading_journal() is not None:
+        await get_grading_journal().close()
+    await close_grading_caches()
+    # 批改已停止，最后释放共享连接池
+    await get_http_client().close()
+    await get_submission_store().close()
+    if get_results_db() is not None:
+        await get_results_db().close()
 
 
 if __name__ == "__main__":
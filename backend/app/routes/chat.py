@@ -25,6 +25,7 @@ from datetime import datetime
 
 from ..core.config import get_settings
 from ..core.multilingual_prompts import get_system_prompt, is_supported_language # 🔥 新增：导入多语言提示词
+from ..services.http_client import get_http_client
 
 # 创建路由器
 router = APIRouter(
@@ -160,30 +161,31 @@ async def stream_openrouter_response(messages: List[Dict[str, str]], language_bo
     }
     
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload
-            ) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data_str = line[6:]  # 移除 "data: " 前缀
-                        
-                        if data_str.strip() == "[DONE]":
-                            break
-                        
-                        try:
-                            data = json.loads(data_str)
-                            if "choices" in data and data["choices"]:
-                                delta = data["choices"][0].get("delta", {})
-                                if "content" in delta:
-                                    yield delta["content"]
-                        except json.JSONDecodeError:
-                            continue
+        # 使用共享连接池，复用到OpenRouter的keep-alive连接
+        async with get_http_client().stream(
+            "POST",
+            "https://openrouter.ai/api/v1/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=60.0
+        ) as response:
+            response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    data_str = line[6:]  # 移除 "data: " 前缀
+                    
+                    if data_str.strip() == "[DONE]":
+                        break
+                    
+                    try:
+                        data = json.loads(data_str)
+                        if "choices" in data and data["choices"]:
+                            delta = data["choices"][0].get("delta", {})
+                            if "content" in delta:
+                                yield delta["content"]
+                    except json.JSONDecodeError:
+                        continue
                             
     except httpx.HTTPStatusError as e:
         logger.error(f"OpenRouter API调用失败: {e.response.status_code}")
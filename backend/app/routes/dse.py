@@ -14,28 +14,61 @@ DSE英文阅读理解API路由
 - 类型安全：使用Pydantic进行数据验证
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, List, Literal, NamedTuple, Optional, Tuple, Union
+from functools import partial
 import logging
 import asyncio
 import json
 from datetime import datetime
-import aiofiles
 
 from ..models.dse_models import (
     DemoQuestionsResponse,
+    DeliveryMode,
+    DSEQuestion,
+    ProjectedQuestionsResponse,
     SubmitAnswersRequest,
     SubmissionResponse,
     GradingStatusResponse,
     AITeacherResponse,
+    BatchSubmitRequest,
     ErrorResponse,
-    DSEPassage,
-    DSEQuestion,
+    PaperSummary,
+    PaperListResponse,
+    ParagraphListResponse,
+    PassageParagraph,
+    QuestionHit,
+    QuestionResult,
+    QuestionQueryResponse,
     QuestionType,
-    SkillType
+    SkillType,
+    SubmissionHistoryResponse,
+    SubmissionListResponse,
+    SubmissionSummary
 )
 from ..services.ai_teacher import AITeacherService
+from ..services.grading_journal import get_grading_journal
+from ..services.grading_scheduler import PRIORITY_LOW, PRIORITY_NORMAL, QueueFullError, get_grading_scheduler
+from ..services.progress_bus import ProgressEvent, build_event, get_progress_bus
+from ..services.response_cache import PreparedResponse, get_response_cache
+from ..services.question_bank import (
+    DEMO_PAPER_ID,
+    PaperSnapshot,
+    QuestionBank,
+    get_question_bank
+)
+from ..services.results_db import get_results_db
+from ..services.submission_store import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    SubmissionRecord,
+    get_submission_store
+)
 from ..core.config import get_settings
+from ..core.ids import new_submission_id
 
 # 创建路由器
 router = APIRouter(
@@ -50,122 +83,31 @@ router = APIRouter(
 # 日志记录器
 logger = logging.getLogger(__name__)
 
-# 全局存储（生产环境应使用Redis或数据库）
-submission_store: Dict[str, Dict[str, Any]] = {}
-
 # 获取配置
 settings = get_settings()
 
+# SSE连接无事件时的心跳间隔（秒），同时用于检查其他worker进程中执行的批改任务
+SSE_HEARTBEAT_SECONDS = 15
 
-async def load_demo_data() -> Dict[str, Any]:
+# 长轮询最长等待时间（秒）
+MAX_LONG_POLL_SECONDS = 60
+
+
+async def load_question_bank() -> QuestionBank:
     """
-    加载Demo数据
+    加载题库
     
-    从data目录读取题目和文章数据，并转换为API模型格式
+    从题库服务获取预编译的题库。题库在启动时编译一次，
+    数据文件变化时才会重新编译，请求路径上只是获取引用。
     
     Returns:
-        Dict[str, Any]: 包含文章和题目的数据字典
+        QuestionBank: 包含全部试卷目录和二级索引的题库
         
     Raises:
         HTTPException: 数据加载失败时抛出
     """
     try:
-        # 获取数据目录的绝对路径
-        import os
-        from pathlib import Path
-        
-        # 获取项目根目录（backend的父目录）
-        # __file__ 是 backend/app/routes/dse.py
-        # parent: backend/app/routes
-        # parent.parent: backend/app  
-        # parent.parent.parent: backend
-        # parent.parent.parent.parent: HKDSE_AI (项目根目录)
-        project_root = Path(__file__).parent.parent.parent.parent
-        data_dir = project_root / "data"
-        
-        logger.info(f"数据目录路径: {data_dir}")
-        logger.info(f"数据目录是否存在: {data_dir.exists()}")
-        
-        # 读取文章数据
-        article_file = data_dir / "article.json"
-        async with aiofiles.open(article_file, "r", encoding="utf-8") as f:
-            article_data = json.loads(await f.read())
-        
-        # 读取题目数据
-        questions_file = data_dir / "questions.json"
-        async with aiofiles.open(questions_file, "r", encoding="utf-8") as f:
-            questions_data = json.loads(await f.read())
-        
-        # 读取答案数据
-        answers_file = data_dir / "answers.json"
-        async with aiofiles.open(answers_file, "r", encoding="utf-8") as f:
-            answers_data = json.loads(await f.read())
-        
-        # 构建完整的HTML内容
-        html_content = "<div class='passage-content'>"
-        for para in article_data["paragraphs"]:
-            if para["type"] == "paragraph":
-                html_content += f'<p id="{para["id"]}">{para["content"]}</p>'
-            elif para["type"] == "heading":
-                level = para["level"]
-                html_content += f'<h{level} id="{para["id"]}">{para["content"]}</h{level}>'
-        html_content += "</div>"
-        
-        # 构建文章模型
-        passage = DSEPassage(
-            id="dse-2023-flash-fiction",
-            title=article_data["title"],
-            content=html_content,
-            wordCount=article_data["wordCount"],
-            difficulty=article_data["difficulty"],
-            year=2023,
-            paper=article_data["reference"]
-        )
-        
-        # 处理题目数据，添加解析信息
-        questions = []
-        for q_data in questions_data:
-            # 从答案数据中获取解析（answers_data是对象，不是数组）
-            question_id = q_data["id"]
-            answer_info = answers_data.get(question_id, {})
-            
-            # 提取解析信息，处理不同的数据格式
-            explanation = ""
-            if answer_info:
-                if "explanation" in answer_info:
-                    explanation = answer_info["explanation"]
-                else:
-                    # 如果没有直接的explanation字段，可能需要从子问题中提取
-                    explanations = []
-                    for key, value in answer_info.items():
-                        if isinstance(value, dict) and "explanation" in value:
-                            explanations.append(value["explanation"])
-                    if explanations:
-                        explanation = " | ".join(explanations)
-            
-            question = DSEQuestion(
-                id=q_data["id"],
-                questionNumber=q_data["questionNumber"],
-                questionText=q_data["questionText"],
-                type=QuestionType(q_data["type"]),
-                options=q_data.get("options"),
-                correctAnswer=q_data.get("correctAnswer"),
-                subQuestions=q_data.get("subQuestions"),
-                timelineEvents=q_data.get("timelineEvents"),
-                availableOptions=q_data.get("availableOptions"),
-                correctAnswers=q_data.get("correctAnswers"),
-                totalMarks=q_data["totalMarks"],
-                explanation=explanation,
-                skillType=SkillType(q_data["skillType"]),
-                referenceParagraphs=q_data.get("referenceParagraphs", [])
-            )
-            questions.append(question)
-        
-        return {
-            "passage": passage,
-            "questions": questions,
-            "answers": answers_data
-        }
+        return await get_question_bank().get_bank()
         
     except FileNotFoundError as e:
         logger.error(f"数据文件未找到: {e}")
@@ -180,21 +122,190 @@ async def load_demo_data() -> Dict[str, Any]:
             detail="题目数据格式错误，请联系管理员"
         )
     except Exception as e:
-        logger.error(f"加载Demo数据失败: {e}")
+        logger.error(f"加载题库失败: {e}")
         raise HTTPException(
             status_code=500,
             detail="加载题目数据时发生未知错误"
         )
 
 
+async def load_paper_data(paper_id: str = DEMO_PAPER_ID) -> PaperSnapshot:
+    """
+    加载试卷数据
+    
+    获取指定试卷的预编译快照，试卷首次访问时才构建模型。
+    
+    Args:
+        paper_id: 试卷ID，默认为Demo试卷
+        
+    Returns:
+        PaperSnapshot: 包含文章、题目和答案的试卷快照
+        
+    Raises:
+        HTTPException: 试卷不存在时返回404，加载失败时返回500
+    """
+    await load_question_bank()
+    
+    try:
+        snapshot = await get_question_bank().get_snapshot(paper_id)
+    except Exception as e:
+        logger.error(f"构建试卷快照失败: {paper_id}, 错误: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="题目数据格式错误，请联系管理员"
+        )
+    
+    if snapshot is None:
+        logger.warning(f"试卷不存在: {paper_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="试卷不存在，请检查试卷ID是否正确"
+        )
+    return snapshot
+
+
+# 题目字段名：同时接受输出别名（question_number）和模型字段名（questionNumber）
+_QUESTION_FIELDS: Dict[str, str] = {
+    **{name: name for name in DSEQuestion.model_fields},
+    **{field.alias: name for name, field in DSEQuestion.model_fields.items() if field.alias}
+}
+
+
+class QuestionProjection(NamedTuple):
+    """
+    题目数据投影参数
+
+    fields为要保留的题目字段（模型字段名，已排序）；exclude为True时表示要去掉的字段。
+    规范化后可直接作为缓存键的一部分。
+    """
+    mode: DeliveryMode = DeliveryMode.FULL
+    fields: Optional[Tuple[str, ...]] = None
+    exclude: bool = False
+    offset: int = 0
+    limit: Optional[int] = None
+
+    @property
+    def is_full(self) -> bool:
+        """是否为默认的完整数据"""
+        return self == QuestionProjection()
+
+
+def question_projection(
+    mode: DeliveryMode = Query(DeliveryMode.FULL, description="返回模式：full（文章和题目）、passage（只返回文章）、questions（只返回题目）"),
+    fields: Optional[str] = Query(
+        None,
+        description="逗号分隔的题目字段，例如id,question_text,options；字段前加'-'表示去掉该字段，例如-explanation,-correct_answer"
+    ),
+    offset: int = Query(0, ge=0, description="题目分页起始位置"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="每页题目数，缺省返回全部")
+) -> QuestionProjection:
+    """解析并规范化题目投影参数"""
+    field_names = None
+    exclude = False
+    if fields:
+        items = [item.strip() for item in fields.split(",") if item.strip()]
+        excluded = [item.startswith("-") for item in items]
+        if any(excluded) and not all(excluded):
+            raise HTTPException(status_code=400, detail="fields不能同时包含保留字段和去除字段")
+        exclude = all(excluded)
+
+        names = set()
+        for item in items:
+            name = _QUESTION_FIELDS.get(item.lstrip("-"))
+            if name is None:
+                raise HTTPException(status_code=400, detail=f"未知的题目字段: {item.lstrip('-')}")
+            names.add(name)
+        if exclude:
+            names.discard("id")
+        else:
+            names.add("id")  # 题目ID总是返回
+        field_names = tuple(sorted(names))
+
+    if mode == DeliveryMode.PASSAGE:
+        # 只返回文章时题目参数无意义，规范化以共享缓存
+        return QuestionProjection(mode=mode)
+    return QuestionProjection(mode=mode, fields=field_names, exclude=exclude, offset=offset, limit=limit)
+
+
+def _build_questions_response(snapshot: PaperSnapshot) -> DemoQuestionsResponse:
+    """根据试卷快照构建题目数据响应"""
+    return DemoQuestionsResponse(
+        passage=snapshot.passage,
+        questions=list(snapshot.questions),
+        total_marks=snapshot.total_marks,
+        estimated_time=30  # 建议30分钟完成
+    )
+
+
+def _serialize_projected_questions(snapshot: PaperSnapshot, projection: QuestionProjection) -> bytes:
+    """按投影参数序列化试卷题目数据"""
+    exclude_sections = set()
+    questions = None
+    if projection.mode == DeliveryMode.PASSAGE:
+        exclude_sections.add("questions")
+    else:
+        end = projection.offset + projection.limit if projection.limit is not None else None
+        page = snapshot.questions[projection.offset:end]
+        if projection.fields is None:
+            field_filter = {}
+        elif projection.exclude:
+            field_filter = {"exclude": set(projection.fields)}
+        else:
+            field_filter = {"include": set(projection.fields)}
+        questions = [
+            question.model_dump(mode="json", by_alias=True, **field_filter)
+            for question in page
+        ]
+    if projection.mode == DeliveryMode.QUESTIONS:
+        exclude_sections.add("passage")
+
+    response = ProjectedQuestionsResponse(
+        passage=snapshot.passage,
+        questions=questions,
+        total_questions=len(snapshot.questions),
+        offset=projection.offset,
+        limit=projection.limit,
+        total_marks=snapshot.total_marks,
+        estimated_time=30
+    )
+    return response.model_dump_json(by_alias=True, exclude=exclude_sections).encode("utf-8")
+
+
+# 题目数据接口的响应：默认返回完整数据，带投影参数时返回投影结果
+QuestionsResponse = Union[DemoQuestionsResponse, ProjectedQuestionsResponse]
+
+
+async def _get_prepared_questions(
+    snapshot: PaperSnapshot,
+    projection: QuestionProjection = QuestionProjection()
+) -> PreparedResponse:
+    """
+    获取试卷题目数据的预序列化响应
+
+    按试卷ID、数据版本和投影参数缓存；默认投影返回完整的DemoQuestionsResponse。
+    """
+    if projection.is_full:
+        return await get_response_cache().get_or_build(
+            ("questions", snapshot.passage.id, snapshot.version),
+            lambda: _build_questions_response(snapshot).model_dump_json(by_alias=True).encode("utf-8")
+        )
+    return await get_response_cache().get_or_build(
+        ("questions", snapshot.passage.id, snapshot.version, projection),
+        lambda: _serialize_projected_questions(snapshot, projection)
+    )
+
+
 @router.get(
     "/demo-questions",
-    response_model=DemoQuestionsResponse,
+    response_model=QuestionsResponse,
     summary="获取Demo题目数据",
     description="获取DSE英文阅读理解Demo的文章内容和题目数据",
-    response_description="包含文章和题目的完整数据"
+    response_description="包含文章和题目的完整数据（DemoQuestionsResponse）；带投影参数时为ProjectedQuestionsResponse"
 )
-async def get_demo_questions() -> DemoQuestionsResponse:
+async def get_demo_questions(
+    request: Request,
+    projection: QuestionProjection = Depends(question_projection)
+) -> Response:
     """
     获取Demo题目数据
     
@@ -203,8 +314,19 @@ async def get_demo_questions() -> DemoQuestionsResponse:
     - 3道真题（词汇题、细节题、时序题）
     - 题目元数据（总分、建议用时等）
     
+    响应体为预序列化、预压缩的缓存结果，携带强ETag；
+    客户端带If-None-Match重新验证时直接返回304。
+    
+    带mode、fields、offset或limit参数时按需投影（ProjectedQuestionsResponse格式），
+    例如答题界面用fields=-explanation,-correct_answer,-correct_answers去掉答案和解析，
+    移动端用mode=questions&limit=1逐题加载。每种投影各自缓存。
+    
+    Args:
+        request: 当前请求
+        projection: 投影参数
+        
     Returns:
-        DemoQuestionsResponse: Demo题目数据响应
+        Response: Demo题目数据响应（默认DemoQuestionsResponse格式，带投影参数时ProjectedQuestionsResponse格式）
         
     Raises:
         HTTPException: 数据加载失败时返回500错误
@@ -212,20 +334,11 @@ async def get_demo_questions() -> DemoQuestionsResponse:
     logger.info("收到获取Demo题目数据请求")
     
     try:
-        data = await load_demo_data()
+        snapshot = await load_paper_data(DEMO_PAPER_ID)
+        prepared = await _get_prepared_questions(snapshot, projection)
         
-        # 计算总分
-        total_marks = sum(q.totalMarks for q in data["questions"])
-        
-        response = DemoQuestionsResponse(
-            passage=data["passage"],
-            questions=data["questions"],
-            total_marks=total_marks,
-            estimated_time=30  # 建议30分钟完成
-        )
-        
-        logger.info(f"成功返回Demo题目数据，包含{len(data['questions'])}道题目")
-        return response
+        logger.info(f"成功返回Demo题目数据，包含{len(snapshot.questions)}道题目")
+        return prepared.to_response(request)
         
     except HTTPException:
         raise
@@ -237,6 +350,178 @@ async def get_demo_questions() -> DemoQuestionsResponse:
         )
 
 
+@router.get(
+    "/papers",
+    response_model=PaperListResponse,
+    summary="获取试卷列表",
+    description="获取题库中全部试卷的概要信息（按年份倒序）",
+    response_description="试卷概要列表"
+)
+async def list_papers() -> PaperListResponse:
+    """
+    获取试卷列表
+    
+    只读取题库目录的元数据，不会构建任何试卷的题目模型。
+    
+    Returns:
+        PaperListResponse: 试卷概要列表
+    """
+    bank = await load_question_bank()
+    
+    papers = [
+        PaperSummary(
+            id=entry.paper_id,
+            title=entry.title,
+            year=entry.year,
+            paper=entry.paper,
+            difficulty=entry.difficulty,
+            question_count=entry.question_count,
+            total_marks=entry.total_marks
+        )
+        for entry in bank.entries
+    ]
+    return PaperListResponse(total=len(papers), papers=papers)
+
+
+@router.get(
+    "/papers/{paper_id}",
+    response_model=QuestionsResponse,
+    summary="获取试卷题目数据",
+    description="根据试卷ID获取文章内容和题目数据",
+    response_description="包含文章和题目的完整数据（DemoQuestionsResponse）；带投影参数时为ProjectedQuestionsResponse"
+)
+async def get_paper(
+    paper_id: str,
+    request: Request,
+    projection: QuestionProjection = Depends(question_projection)
+) -> Response:
+    """
+    获取试卷题目数据
+    
+    与Demo题目接口相同，返回预序列化、预压缩的缓存结果并支持ETag重新验证，
+    同样支持mode、fields、offset和limit投影参数。
+    
+    Args:
+        paper_id: 试卷ID
+        request: 当前请求
+        projection: 投影参数
+        
+    Returns:
+        Response: 试卷题目数据响应（默认DemoQuestionsResponse格式，带投影参数时ProjectedQuestionsResponse格式）
+        
+    Raises:
+        HTTPException: 试卷不存在时返回404错误
+    """
+    logger.info(f"收到获取试卷数据请求: {paper_id}")
+    
+    snapshot = await load_paper_data(paper_id)
+    prepared = await _get_prepared_questions(snapshot, projection)
+    return prepared.to_response(request)
+
+
+@router.get(
+    "/papers/{paper_id}/paragraphs",
+    response_model=ParagraphListResponse,
+    summary="获取文章段落",
+    description="按段落ID获取文章段落的纯文本、字符偏移和估算token数",
+    response_description="段落列表"
+)
+async def get_paper_paragraphs(
+    paper_id: str,
+    ids: Optional[str] = Query(None, description="逗号分隔的段落ID，例如p2,p3；缺省返回全部段落")
+) -> ParagraphListResponse:
+    """
+    获取文章段落
+    
+    直接读取试卷快照中的段落索引，供对话和解析功能按题目的referenceParagraphs取出原文。
+    
+    Args:
+        paper_id: 试卷ID
+        ids: 逗号分隔的段落ID
+        
+    Returns:
+        ParagraphListResponse: 段落列表（按原文顺序）
+    """
+    snapshot = await load_paper_data(paper_id)
+    index = snapshot.paragraph_index
+    
+    if ids:
+        requested = [pid.strip() for pid in ids.split(",") if pid.strip()]
+        spans = index.select(requested)
+        missing = [pid for pid in requested if pid not in index]
+    else:
+        spans = list(index.spans)
+        missing = []
+    
+    return ParagraphListResponse(
+        paper_id=paper_id,
+        total_tokens=index.total_tokens,
+        paragraphs=[PassageParagraph(**span._asdict()) for span in spans],
+        missing=missing
+    )
+
+
+@router.get(
+    "/questions",
+    response_model=QuestionQueryResponse,
+    summary="按条件查询题目",
+    description="按年份范围、试卷编号、技能类型、题目类型和难度组合查询题目",
+    response_description="命中的题目列表（分页）"
+)
+async def query_questions(
+    year_from: Optional[int] = Query(None, description="起始年份（含）"),
+    year_to: Optional[int] = Query(None, description="结束年份（含）"),
+    paper: Optional[str] = Query(None, description="试卷编号"),
+    skill_type: Optional[SkillType] = Query(None, description="考查技能类型"),
+    question_type: Optional[QuestionType] = Query(None, description="题目类型"),
+    difficulty: Optional[str] = Query(None, description="难度等级"),
+    offset: int = Query(0, ge=0, description="分页起始位置"),
+    limit: int = Query(50, ge=1, le=200, description="每页最大条数")
+) -> QuestionQueryResponse:
+    """
+    按条件查询题目
+    
+    查询走题库的二级索引，例如"2018-2023年的全部词汇题"：
+    year_from=2018&year_to=2023&skill_type=vocabulary。
+    只有本页命中的题目才会被构建（打包文件数据源下只解码这些题目的记录）。
+    
+    Returns:
+        QuestionQueryResponse: 命中的题目列表
+    """
+    bank = await load_question_bank()
+    
+    refs = bank.query(
+        year_from=year_from,
+        year_to=year_to,
+        paper=paper,
+        skill_type=skill_type,
+        question_type=question_type,
+        difficulty=difficulty
+    )
+    
+    page = refs[offset:offset + limit]
+    questions = await asyncio.to_thread(bank.get_questions, page)
+    
+    hits = [
+        QuestionHit(
+            paper_id=ref.paper_id,
+            year=ref.year,
+            paper=ref.paper,
+            question=question
+        )
+        for ref, question in zip(page, questions)
+        if question is not None
+    ]
+    
+    logger.info(f"题目查询完成，命中{len(refs)}道题目")
+    return QuestionQueryResponse(
+        total=len(refs),
+        offset=offset,
+        limit=limit,
+        questions=hits
+    )
+
+
 @router.post(
     "/submit",
     response_model=SubmissionResponse,
@@ -244,59 +529,87 @@ async def get_demo_questions() -> DemoQuestionsResponse:
     description="提交用户答案，启动AI老师批改流程",
     response_description="返回提交ID和批改状态"
 )
-async def submit_answers(
-    request: SubmitAnswersRequest,
-    background_tasks: BackgroundTasks
-) -> SubmissionResponse:
+async def submit_answers(request: SubmitAnswersRequest) -> SubmissionResponse:
     """
     提交答案进行批改
     
-    接收用户提交的答案，生成唯一的提交ID，并在后台启动AI老师批改流程。
+    接收用户提交的答案，生成唯一的提交ID，并把批改任务放入批改调度队列。
     批改过程是异步的，客户端需要通过提交ID轮询获取批改结果。
     
+    带clientId且开启GRADING_SUPERSEDE_ON_RESUBMIT时，同一clientId对同一试卷
+    未完成的旧提交会在新提交进入队列后被取消（状态为cancelled）；新提交被拒绝时旧提交不受影响。
+    
     Args:
         request: 提交答案请求，包含用户答案和答题时间
-        background_tasks: FastAPI后台任务管理器
         
     Returns:
-        SubmissionResponse: 包含提交ID和状态信息
+        SubmissionResponse: 包含提交ID、排队位置和预计完成时间
         
     Raises:
-        HTTPException: 请求验证失败时返回400错误
+        HTTPException: 批改队列已满时返回503错误（附Retry-After）
     """
     logger.info(f"收到答案提交请求，包含{len(request.answers)}个答案")
     
+    # 获取试卷快照引用；批改任务使用提交时的快照，不受之后的题库热重载影响
+    snapshot = await load_paper_data(request.paper_id or DEMO_PAPER_ID)
+    
     try:
+        scheduler = get_grading_scheduler()
+        
+        # 同一客户端对同一试卷重新提交：记下未完成的旧提交，新提交入队后再取消
+        owner = None
+        previous_id = None
+        if request.client_id:
+            owner = f"{request.client_id}:{snapshot.passage.id}"
+            previous_id = scheduler.owned_by(owner)
+        
         # 生成提交ID
-        submission_id = f"submission_{int(datetime.now().timestamp())}"
+        submission_id = new_submission_id()
         
         # 初始化提交记录
-        submission_store[submission_id] = {
-            "status": "processing",
-            "progress": 0,
-            "message": "AI老师正在批改中...",
-            "request": request.dict(),
-            "created_at": datetime.now(),
-            "result": None,
-            "error_detail": None
-        }
-        
-        # 启动后台批改任务
-        background_tasks.add_task(
-            process_grading,
-            submission_id,
-            request
+        record = SubmissionRecord(
+            submission_id=submission_id,
+            message="排队等待批改...",
+            request=request.model_dump(mode="json")
         )
+        store = get_submission_store()
+        await store.create(record)
         
-        logger.info(f"答案提交成功，提交ID: {submission_id}")
+        # 放入批改队列；队列已满时撤销提交记录
+        try:
+            position = scheduler.submit(
+                submission_id,
+                partial(process_grading, submission_id, request, snapshot),
+                owner=owner
+            )
+        except QueueFullError as e:
+            await store.delete(submission_id)
+            logger.warning(f"拒绝答案提交: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail="当前提交人数较多，请稍后重新提交",
+                headers={"Retry-After": "30"}
+            )
+        
+        _record_submitted(record, PRIORITY_NORMAL)
+        
+        if previous_id is not None and settings.GRADING_SUPERSEDE_ON_RESUBMIT:
+            logger.info(f"新提交取代未完成的旧提交: {previous_id}")
+            await _cancel_submission(previous_id, "已被同一客户端的新提交取代")
+            # 旧提交排在新提交之前时，新提交的排队位置随之前移
+            position = scheduler.position(submission_id) or position
+        
+        logger.info(f"答案提交成功，提交ID: {submission_id}，排队位置: {position}")
         
         return SubmissionResponse(
             submission_id=submission_id,
             status="processing",
-            message="答案已提交，AI老师正在批改中...",
-            estimated_completion_time=60  # 预计60秒完成
+            message=f"答案已提交，排队第{position}位，AI老师将依次批改",
+            estimated_completion_time=scheduler.estimate_wait_seconds(position)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"提交答案失败: {e}")
         raise HTTPException(
@@ -305,6 +618,133 @@ async def submit_answers(
         )
 
 
+@router.post(
+    "/submit/batch",
+    summary="批量提交班级答卷",
+    description="一次提交同一试卷的多份学生答卷，以NDJSON逐行返回每位学生的批改结果",
+    response_description="application/x-ndjson结果流"
+)
+async def submit_batch(request: BatchSubmitRequest) -> StreamingResponse:
+    """
+    批量提交班级答卷
+    
+    所有答卷共享同一份试卷快照和文章上下文，批改任务以低优先级进入批改队列，
+    与单份提交共用GRADING_CONCURRENCY的并发额度。响应为NDJSON流：
+    
+    - 第一行 type=accepted：每份答卷的序号、学生标识和提交ID
+    - 每份答卷批改结束时一行 type=result：批改状态和结果（结构同 /results/{submission_id}）
+    - 最后一行 type=done：完成/失败/取消数量
+    
+    断开连接不会取消批改，结果仍可通过 /results/{submission_id} 查询；
+    单份答卷可通过 DELETE /results/{submission_id} 取消。
+    
+    Raises:
+        HTTPException: 答卷数超过上限或答卷试卷不一致时返回400错误；批改队列容纳不下整批答卷时返回503错误
+    """
+    items = request.submissions
+    if len(items) > settings.GRADING_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多提交{settings.GRADING_BATCH_MAX_SIZE}份答卷"
+        )
+    paper_id = request.paper_id or DEMO_PAPER_ID
+    mismatched = [index for index, item in enumerate(items) if item.paper_id not in (None, paper_id)]
+    if mismatched:
+        raise HTTPException(
+            status_code=400,
+            detail=f"批量提交的答卷必须属于同一试卷，第{mismatched}份答卷的paperId不一致"
+        )
+    
+    scheduler = get_grading_scheduler()
+    if scheduler.available < len(items):
+        # 整批接受或整批拒绝，避免一个班只批改了一部分
+        raise HTTPException(
+            status_code=503,
+            detail="当前批改队列繁忙，请稍后重新提交",
+            headers={"Retry-After": "60"}
+        )
+    
+    logger.info(f"收到批量提交请求: 试卷{paper_id}，{len(items)}份答卷")
+    snapshot = await load_paper_data(paper_id)
+    # 文章上下文只取决于试卷，整批构建一次
+    passage_context = AITeacherService().build_passage_context(
+        snapshot.passage, list(snapshot.questions), snapshot.paragraph_index
+    )
+    
+    store = get_submission_store()
+    finished: "asyncio.Queue[int]" = asyncio.Queue()
+    prepared = []
+    
+    # 先创建全部提交记录（期间会让出事件循环），再一次性入队
+    for item in items:
+        item = item.model_copy(update={"paper_id": paper_id})
+        record = SubmissionRecord(
+            submission_id=new_submission_id(),
+            message="排队等待批改...",
+            request=item.model_dump(mode="json", exclude={"student_id"})
+        )
+        await store.create(record)
+        prepared.append((item, record))
+    
+    if scheduler.available < len(prepared):
+        # 创建记录期间其他提交占满了队列：删除已创建的记录，整批拒绝
+        for _, record in prepared:
+            await store.delete(record.submission_id)
+        raise HTTPException(
+            status_code=503,
+            detail="当前批改队列繁忙，请稍后重新提交",
+            headers={"Retry-After": "60"}
+        )
+    
+    # 检查容量到全部入队之间没有await，其他请求无法插入，整批一定能入队
+    accepted = []
+    for index, (item, record) in enumerate(prepared):
+        scheduler.submit(
+            record.submission_id,
+            partial(process_grading, record.submission_id, item, snapshot, passage_context),
+            priority=PRIORITY_LOW,
+            on_done=partial(finished.put_nowait, index)
+        )
+        _record_submitted(record, PRIORITY_LOW)
+        accepted.append({"index": index, "student_id": item.student_id, "submission_id": record.submission_id})
+    
+    async def result_stream():
+        yield json.dumps({"type": "accepted", "paper_id": paper_id, "submissions": accepted}, ensure_ascii=False) + "\n"
+        counts = {STATUS_COMPLETED: 0, STATUS_FAILED: 0, STATUS_CANCELLED: 0}
+        for _ in accepted:
+            index = await finished.get()
+            entry = accepted[index]
+            submission = await _load_submission(entry["submission_id"])
+            if submission is None:
+                continue
+            counts[submission.status] = counts.get(submission.status, 0) + 1
+            grading = GradingStatusResponse(
+                submission_id=submission.submission_id,
+                status=submission.status,
+                progress=submission.progress,
+                message=submission.message,
+                result=submission.result,
+                error_detail=submission.error_detail,
+                partial_results=submission.partial_results
+            )
+            yield json.dumps(
+                {"type": "result", **entry, "grading": grading.model_dump(mode="json", by_alias=True)},
+                ensure_ascii=False
+            ) + "\n"
+        yield json.dumps({
+            "type": "done",
+            "completed": counts[STATUS_COMPLETED],
+            "failed": counts[STATUS_FAILED],
+            "cancelled": counts[STATUS_CANCELLED]
+        }) + "\n"
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     "/results/{submission_id}",
     response_model=GradingStatusResponse,
@@ -312,17 +752,27 @@ async def submit_answers(
     description="根据提交ID查询批改进度和结果",
     response_description="批改状态和结果数据"
 )
-async def get_grading_results(submission_id: str) -> GradingStatusResponse:
+async def get_grading_results(
+    submission_id: str,
+    wait: float = Query(0, ge=0, le=MAX_LONG_POLL_SECONDS, description="长轮询：进度未变化时最多等待的秒数"),
+    since_progress: Optional[int] = Query(None, ge=0, le=100, description="长轮询：客户端已知的进度，默认为当前进度")
+) -> GradingStatusResponse:
     """
     查询批改结果
     
-    根据提交ID查询AI老师批改的进度和结果。支持三种状态：
+    根据提交ID查询AI老师批改的进度和结果。支持四种状态：
     - processing: 批改进行中
     - completed: 批改完成，返回详细结果
     - failed: 批改失败，返回错误信息
+    - cancelled: 批改已取消（主动取消、被新提交取代或超过执行时限），error_detail为取消原因
+    
+    传入wait时为长轮询：批改进行中且进度仍等于since_progress时，
+    请求在进度总线上等待，进度变化或批改结束立即返回，超时则返回当前状态。
     
     Args:
         submission_id: 答案提交时返回的唯一ID
+        wait: 最长等待秒数，0表示立即返回
+        since_progress: 客户端已知的进度
         
     Returns:
         GradingStatusResponse: 批改状态和结果
@@ -332,29 +782,303 @@ async def get_grading_results(submission_id: str) -> GradingStatusResponse:
     """
     logger.info(f"查询批改结果，提交ID: {submission_id}")
     
-    if submission_id not in submission_store:
+    if wait > 0:
+        # 先登记等待，再读取当前状态，两者之间发布的进度不会遗漏
+        async with get_progress_bus().watch(submission_id) as watch:
+            submission = await _load_submission(submission_id)
+            if submission is not None and not submission.is_finished:
+                known_progress = submission.progress if since_progress is None else since_progress
+                if submission.progress == known_progress:
+                    await watch.wait(known_progress, wait)
+                    # 唤醒或超时后都返回存储中的最新状态（批改任务可能在其他worker进程中执行）
+                    submission = await _load_submission(submission_id) or submission
+    else:
+        submission = await _load_submission(submission_id)
+    
+    if submission is None:
         logger.warning(f"提交ID不存在: {submission_id}")
         raise HTTPException(
             status_code=404,
             detail="提交记录不存在，请检查提交ID是否正确"
         )
     
-    submission = submission_store[submission_id]
-    
     response = GradingStatusResponse(
         submission_id=submission_id,
-        status=submission["status"],
-        progress=submission["progress"],
-        message=submission["message"],
-        result=submission.get("result"),
-        error_detail=submission.get("error_detail")
+        status=submission.status,
+        progress=submission.progress,
+        message=_status_message(submission),
+        result=submission.result,
+        error_detail=submission.error_detail,
+        partial_results=submission.partial_results
     )
     
-    logger.info(f"返回批改状态: {submission['status']}")
+    logger.info(f"返回批改状态: {submission.status}")
     return response
 
 
-async def process_grading(submission_id: str, request: SubmitAnswersRequest):
+@router.delete(
+    "/results/{submission_id}",
+    response_model=GradingStatusResponse,
+    summary="取消批改",
+    description="取消排队中或批改中的提交，正在进行的AI请求会被中断",
+    response_description="取消后的批改状态"
+)
+async def cancel_grading(submission_id: str) -> GradingStatusResponse:
+    """
+    取消批改
+    
+    排队中的任务直接出队；批改中的任务被中断（包括正在进行的AI请求），
+    worker立即转去批改下一份答卷。提交记录保留，状态为cancelled。
+    
+    Raises:
+        HTTPException: 提交ID不存在时返回404错误，批改已结束时返回409错误
+    """
+    submission = await _load_submission(submission_id)
+    if submission is None:
+        raise HTTPException(
+            status_code=404,
+            detail="提交记录不存在，请检查提交ID是否正确"
+        )
+    if submission.is_finished:
+        raise HTTPException(
+            status_code=409,
+            detail=f"批改已结束（{submission.status}），无法取消"
+        )
+    
+    await _cancel_submission(submission_id, "用户取消")
+    submission = await _load_submission(submission_id) or submission
+    return GradingStatusResponse(
+        submission_id=submission_id,
+        status=submission.status,
+        progress=submission.progress,
+        message=submission.message,
+        result=submission.result,
+        error_detail=submission.error_detail,
+        partial_results=submission.partial_results
+    )
+
+
+@router.get(
+    "/results/{submission_id}/events",
+    summary="订阅批改进度",
+    description="以Server-Sent Events推送批改进度，批改结束时推送完整结果后关闭连接",
+    response_description="text/event-stream事件流"
+)
+async def stream_grading_progress(submission_id: str, request: Request) -> StreamingResponse:
+    """
+    订阅批改进度
+    
+    每个事件的data与 /results/{submission_id} 的响应结构相同，event为批改状态
+    （processing / completed / failed / cancelled），id为进度百分比。
+    批改结束时推送一次包含完整结果的事件，然后关闭连接。
+    
+    Raises:
+        HTTPException: 提交ID不存在时返回404错误
+    """
+    submission = await _load_submission(submission_id)
+    if submission is None:
+        raise HTTPException(
+            status_code=404,
+            detail="提交记录不存在，请检查提交ID是否正确"
+        )
+    
+    async def event_stream():
+        async with get_progress_bus().subscribe(submission_id) as subscription:
+            # 订阅之后再读取一次当前状态，避免遗漏订阅前发布的事件
+            current = await _load_submission(submission_id) or submission
+            event = _submission_event(current)
+            yield _sse_frame(event)
+            
+            while not event.is_finished:
+                next_event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if next_event is None:
+                    if await request.is_disconnected():
+                        return
+                    # 兜底：批改任务可能在其他worker进程中执行，直接检查存储中的状态
+                    current = await _load_submission(submission_id)
+                    if current is None:
+                        return
+                    next_event = _submission_event(current)
+                    if next_event.data == event.data:
+                        yield ": keep-alive\n\n"
+                        continue
+                if next_event.data == event.data:
+                    continue
+                event = next_event
+                yield _sse_frame(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+async def _load_submission(submission_id: str) -> Optional[SubmissionRecord]:
+    """读取提交记录；提交记录存储中已过期、被淘汰或服务已重启时从结果数据库读取"""
+    submission = await get_submission_store().get(submission_id)
+    if submission is None and get_results_db() is not None:
+        submission = await get_results_db().get(submission_id)
+    return submission
+
+
+def _status_message(submission: SubmissionRecord) -> str:
+    """状态消息；排队中的任务返回实时排队位置（随队列推进变化，不写回提交记录）"""
+    position = get_grading_scheduler().position(submission.submission_id)
+    if position is not None:
+        return f"排队等待批改，当前第{position}位"
+    return submission.message
+
+
+def _submission_event(submission: SubmissionRecord) -> ProgressEvent:
+    return build_event(
+        submission.submission_id,
+        submission.status,
+        submission.progress,
+        _status_message(submission),
+        submission.result,
+        submission.error_detail,
+        submission.partial_results
+    )
+
+
+def _sse_frame(event: ProgressEvent) -> str:
+    return f"id: {event.progress}\nevent: {event.status}\ndata: {event.data}\n\n"
+
+
+async def _update_submission(submission_id: str, **changes: Any) -> bool:
+    """更新提交记录，并向该提交的SSE订阅者和长轮询等待者发布进度事件"""
+    updated = await get_submission_store().update(submission_id, **changes)
+    bus = get_progress_bus()
+    if bus.has_listeners(submission_id):
+        await bus.publish(submission_id, build_event(
+            submission_id,
+            changes.get("status", STATUS_PROCESSING),
+            changes["progress"],
+            changes["message"],
+            changes.get("result"),
+            changes.get("error_detail"),
+            changes.get("partial_results")
+        ))
+    return updated
+
+
+async def _cancel_submission(submission_id: str, reason: str) -> None:
+    """
+    取消提交：中断本进程中排队或执行中的批改任务，并把记录标记为cancelled
+    
+    任务在其他worker进程中执行时只更新记录，该进程的批改结束后不会覆盖取消状态。
+    """
+    get_grading_scheduler().cancel(submission_id, reason)
+    await _update_submission(
+        submission_id,
+        status=STATUS_CANCELLED,
+        progress=0,
+        message="批改已取消",
+        error_detail=reason,
+        partial_results=None
+    )
+    await _persist_submission(submission_id)
+
+
+async def _is_cancelled(submission_id: str) -> bool:
+    record = await get_submission_store().get(submission_id)
+    return record is not None and record.status == STATUS_CANCELLED
+
+
+def _record_submitted(record: SubmissionRecord, priority: int) -> None:
+    """把新提交写入结果数据库和批改日志（未配置时跳过）"""
+    results_db = get_results_db()
+    if results_db is not None:
+        results_db.save(record)
+    journal = get_grading_journal()
+    if journal is not None:
+        journal.record_submitted(record, priority)
+
+
+async def _persist_submission(submission_id: str) -> None:
+    """把提交记录的当前状态写入结果数据库，已结束的提交同时写入批改日志（未配置时跳过）"""
+    results_db = get_results_db()
+    journal = get_grading_journal()
+    if results_db is None and journal is None:
+        return
+    record = await get_submission_store().get(submission_id)
+    if record is None:
+        return
+    if results_db is not None:
+        results_db.save(record)
+    if journal is not None and record.is_finished:
+        journal.record_finished(record)
+
+
+async def resume_from_journal() -> None:
+    """
+    重放批改日志（应用启动时调用，未配置GRADING_JOURNAL_PATH时跳过）
+    
+    已结束的提交恢复到提交记录存储，查询结果不受重启影响；
+    未结束的提交（重启前排队中或批改中）按原优先级重新进入批改队列；
+    结果数据库中其余未完成的记录（日志中没有或无法恢复）最后标记为失败。
+    """
+    journal = get_grading_journal()
+    if journal is None:
+        return
+    entries = await journal.start()
+    
+    store = get_submission_store()
+    scheduler = get_grading_scheduler()
+    results_db = get_results_db()
+    restored = 0
+    resumed: List[str] = []
+    for entry in entries.values():
+        if entry.is_finished:
+            if await store.get(entry.submission_id) is None:
+                await store.create(entry.to_record())
+                restored += 1
+            continue
+        
+        record = entry.to_record()
+        record.message = "服务重启，重新排队批改..."
+        await store.create(record)
+        try:
+            request = SubmitAnswersRequest.model_validate(entry.request)
+            snapshot = await load_paper_data(request.paper_id or DEMO_PAPER_ID)
+            scheduler.submit(
+                entry.submission_id,
+                partial(process_grading, entry.submission_id, request, snapshot),
+                priority=entry.priority
+            )
+        except (HTTPException, QueueFullError, ValueError) as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"恢复批改任务失败: {entry.submission_id}, 错误: {detail}")
+            await store.update(
+                entry.submission_id,
+                status=STATUS_FAILED,
+                progress=0,
+                message="批改失败",
+                error_detail=f"服务重启后无法恢复批改，请重新提交（{detail}）"
+            )
+            await _persist_submission(entry.submission_id)
+            continue
+        if results_db is not None:
+            results_db.save(record)
+        resumed.append(entry.submission_id)
+    
+    if results_db is not None:
+        await results_db.mark_interrupted(resumed)
+    
+    if restored or resumed:
+        logger.info(f"批改日志重放完成: 恢复{restored}个已结束提交，重新排队{len(resumed)}个未完成提交")
+
+
+async def process_grading(
+    submission_id: str,
+    request: SubmitAnswersRequest,
+    snapshot: PaperSnapshot,
+    passage_context: Optional[Dict[str, Any]] = None
+):
     """
     后台批改处理函数
     
@@ -364,59 +1088,161 @@ async def process_grading(submission_id: str, request: SubmitAnswersRequest):
     3. 处理批改结果
     4. 更新最终状态
     
+    执行时间超过GRADING_JOB_DEADLINE时取消批改（中断AI请求），记录状态为cancelled。
+    任务被取消（DELETE /results 或新提交取代）时CancelledError直接向上传播，
+    状态由取消方记录。
+    
     Args:
         submission_id: 提交ID
         request: 用户提交的答案请求
+        snapshot: 提交时的试卷快照（整个批改过程使用同一份）
+        passage_context: 批量提交时共享的文章上下文
     """
     logger.info(f"开始处理批改任务: {submission_id}")
+    journal = get_grading_journal()
+    if journal is not None:
+        journal.record_started(submission_id)
     
     try:
         # 更新进度: 开始批改
-        submission_store[submission_id].update({
-            "progress": 10,
-            "message": "正在分析用户答案..."
-        })
-        
-        # 加载Demo数据
-        data = await load_demo_data()
+        await _update_submission(
+            submission_id,
+            progress=10,
+            message="正在分析用户答案..."
+        )
         
         # 更新进度: 数据准备完成
-        submission_store[submission_id].update({
-            "progress": 30,
-            "message": "正在调用AI老师..."
-        })
+        await _update_submission(
+            submission_id,
+            progress=30,
+            message="正在调用AI老师..."
+        )
         
         # 创建AI Teacher服务实例
         ai_teacher = AITeacherService()
         
-        # 执行批改
-        result = await ai_teacher.grade_answers(
-            passage=data["passage"],
-            questions=data["questions"],
-            user_answers=request.answers,
-            time_spent=(request.end_time - request.start_time).total_seconds()
+        # 已序列化的小题结果：题号 -> (结果对象, 序列化结果)，结果对象不变时复用，存储也不必重新估算其大小
+        dumped: Dict[int, Tuple[QuestionResult, Dict[str, Any]]] = {}
+
+        def dump_result(item: QuestionResult) -> Dict[str, Any]:
+            cached = dumped.get(item.question_number)
+            if cached is None or cached[0] is not item:
+                cached = (item, item.model_dump(mode="json", by_alias=True))
+                dumped[item.question_number] = cached
+            return cached[1]
+
+        async def report_progress(results: List[QuestionResult], total: int) -> None:
+            # 每完成一道小题推进进度（30% → 95%），已完成的小题结果立即可查询
+            if await _is_cancelled(submission_id):
+                return
+            await _update_submission(
+                submission_id,
+                progress=30 + 65 * len(results) // max(total, 1),
+                message=f"AI老师已批改{len(results)}/{total}道小题...",
+                partial_results=[dump_result(item) for item in results]
+            )
+        
+        # 执行批改（超过执行时限时取消）
+        result = await asyncio.wait_for(
+            ai_teacher.grade_answers(
+                passage=snapshot.passage,
+                questions=list(snapshot.questions),
+                user_answers=request.answers,
+                time_spent=(request.end_time - request.start_time).total_seconds(),
+                paragraph_index=snapshot.paragraph_index,
+                passage_context=passage_context,
+                paper_version=snapshot.version,
+                on_progress=report_progress
+            ),
+            timeout=settings.GRADING_JOB_DEADLINE or None
         )
         
+        if await _is_cancelled(submission_id):
+            logger.info(f"批改任务已被取消，丢弃结果: {submission_id}")
+            return
+        
         # 更新进度: 批改完成
-        submission_store[submission_id].update({
-            "status": "completed",
-            "progress": 100,
-            "message": "批改完成",
-            "result": result
-        })
+        await _update_submission(
+            submission_id,
+            status=STATUS_COMPLETED,
+            progress=100,
+            message="批改完成",
+            result=result,
+            partial_results=None
+        )
         
+        await _persist_submission(submission_id)
         logger.info(f"批改任务完成: {submission_id}")
         
+    except asyncio.TimeoutError:
+        logger.warning(f"批改任务超过执行时限，已取消: {submission_id}")
+        await _update_submission(
+            submission_id,
+            status=STATUS_CANCELLED,
+            progress=0,
+            message="批改已取消",
+            error_detail=f"批改超过{settings.GRADING_JOB_DEADLINE:g}秒执行时限",
+            partial_results=None
+        )
+        await _persist_submission(submission_id)
+        
     except Exception as e:
         logger.error(f"批改任务失败: {submission_id}, 错误: {e}")
+        if await _is_cancelled(submission_id):
+            return
         
         # 更新错误状态
-        submission_store[submission_id].update({
-            "status": "failed",
-            "progress": 0,
-            "message": "批改失败",
-            "error_detail": str(e)
-        })
+        await _update_submission(
+            submission_id,
+            status=STATUS_FAILED,
+            progress=0,
+            message="批改失败",
+            error_detail=str(e),
+            partial_results=None
+        )
+        await _persist_submission(submission_id)
+
+
+@router.get(
+    "/history",
+    response_model=SubmissionHistoryResponse,
+    summary="查询历史提交",
+    description="从结果数据库按状态、试卷和提交时间查询历史提交概要（需配置DATABASE_URL）",
+    response_description="历史提交概要（分页）"
+)
+async def get_submission_history(
+    status: Optional[str] = Query(None, description="批改状态"),
+    paper_id: Optional[str] = Query(None, description="试卷ID"),
+    created_from: Optional[datetime] = Query(None, description="提交时间下界（含）"),
+    created_to: Optional[datetime] = Query(None, description="提交时间上界（不含）"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor）"),
+    limit: int = Query(50, ge=1, le=200, description="每页条数")
+) -> SubmissionHistoryResponse:
+    """
+    查询历史提交
+    
+    查询走数据库索引并按游标分页，只返回概要，不读取答案和批改结果；
+    单条完整结果通过 /results/{submission_id} 获取。
+    
+    Raises:
+        HTTPException: 未配置结果数据库时返回503错误
+    """
+    results_db = get_results_db()
+    if results_db is None:
+        raise HTTPException(status_code=503, detail="未配置结果数据库（DATABASE_URL）")
+    
+    rows = await results_db.query_history(
+        status=status,
+        paper_id=paper_id,
+        created_from=created_from,
+        created_to=created_to,
+        before=cursor,
+        limit=limit
+    )
+    return SubmissionHistoryResponse(
+        submissions=[SubmissionSummary(**row) for row in rows],
+        next_cursor=rows[-1]["submission_id"] if len(rows) == limit else None
+    )
 
 
 # ===== 健康检查和其他工具接口 =====
@@ -439,20 +1265,47 @@ async def health_check():
 
 @router.get(
     "/submissions",
+    response_model=SubmissionListResponse,
     summary="获取提交记录列表",
-    description="获取所有提交记录（调试用）",
+    description="按状态和提交时间分页查询提交记录存储中的记录（调试用）",
     tags=["Debug"]
 )
-async def get_submissions():
-    """获取所有提交记录（仅用于调试）"""
-    return {
-        "total": len(submission_store),
-        "submissions": {
-            sid: {
-                "status": data["status"],
-                "progress": data["progress"],
-                "created_at": data["created_at"].isoformat()
-            }
-            for sid, data in submission_store.items()
-        }
-    }
\ No newline at end of file
+async def get_submissions(
+    status: Optional[Literal["processing", "completed", "failed", "cancelled"]] = Query(None, description="批改状态"),
+    created_after: Optional[datetime] = Query(None, description="提交时间下界（含）"),
+    created_before: Optional[datetime] = Query(None, description="提交时间上界（不含）"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor）"),
+    limit: int = Query(50, ge=1, le=200, description="每页条数")
+) -> SubmissionListResponse:
+    """
+    获取提交记录列表（仅用于调试）
+    
+    查询走存储写入时维护的二级索引并按游标分页，各状态记录数来自索引计数，不扫描全部记录；
+    只返回概要，完整结果通过 /results/{submission_id} 获取。
+    """
+    store = get_submission_store()
+    records, next_cursor = await store.query(
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        cursor=cursor,
+        limit=limit
+    )
+    return SubmissionListResponse(
+        total=await store.count(),
+        status_counts=await store.status_counts(),
+        submissions=[
+            SubmissionSummary(
+                submission_id=record.submission_id,
+                paper_id=record.request.get("paper_id") or DEMO_PAPER_ID,
+                status=record.status,
+                progress=record.progress,
+                final_score=record.result.final_score if record.result else None,
+                created_at=record.created_at,
+                updated_at=record.updated_at
+            )
+            for record in records
+        ],
+        next_cursor=next_cursor,
+        store=store.stats()
+    )
\ No newline at end of file
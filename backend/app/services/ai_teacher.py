@@ -18,7 +18,7 @@ AI老师具备以下能力：
 import json
 import logging
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import re
 from datetime import datetime
 
@@ -35,9 +35,38 @@ from ..models.dse_models import (
     WeaknessDetail,
 )
 from ..core.config import get_settings
+from .grading_cache import (
+    get_grading_cache,
+    get_verdict_cache,
+    make_cache_key,
+    make_verdict_key,
+    normalize_sub_answer,
+)
+from .grading_stream import ResultsStreamParser, parse_sse_line
+from .http_client import get_http_client
+from .passage_index import PassageIndex
 
 logger = logging.getLogger(__name__)
 
+# 批改进度回调：(已完成的小题结果, 小题总数)
+ProgressCallback = Callable[[List[QuestionResult], int], Awaitable[None]]
+
+# 批改Prompt版本，修改Prompt或结果解析逻辑时递增，使整卷批改缓存失效
+PROMPT_VERSION = "3"
+
+# 批改解析的输出语言（逐题判定缓存键的一部分）
+GRADING_LANGUAGE = "zh-HK"
+
+# 本地精确评分的客观小题类型（混合批改模式）
+OBJECTIVE_SUB_TYPES = frozenset({"multiple-choice", "timeline-sequencing-sub"})
+
+# 本地评分解析的技巧提醒
+LOCAL_GRADING_TIPS = {
+    "multiple-choice": "選擇題要先定位原文，再逐個選項同原文比對，排除同原文意思唔符嘅選項。",
+    "timeline-sequencing-sub": "時序題要留意時間標誌詞（例如before、after、then），先畫出時間線再排序。",
+    "fill-in-blank-sub": "填空題要留意同義詞替換，同埋檢查詞性同語法形式。",
+}
+
 
 class AITeacherService:
     """
@@ -50,7 +79,8 @@ class AITeacherService:
     def __init__(self):
         """初始化AI Teacher服务"""
         self.settings = get_settings()
-        self.client = httpx.AsyncClient()
+        # 共享连接池（应用生命周期内复用连接，不随服务实例关闭）
+        self.client = get_http_client()
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
         
         # AI模型配置
@@ -63,16 +93,20 @@ class AITeacherService:
         passage: DSEPassage,
         questions: List[DSEQuestion],
         user_answers: List[UserAnswer],
-        time_spent: float
+        time_spent: float,
+        paragraph_index: Optional[PassageIndex] = None,
+        passage_context: Optional[Dict[str, Any]] = None,
+        paper_version: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None
     ) -> AITeacherResponse:
         """
         批改用户答案
         
         这是AI Teacher的核心方法，执行完整的批改流程：
         1. 构建批改上下文
-        2. 生成专业Prompt
-        3. 调用AI模型
-        4. 解析批改结果
+        2. 客观题在本地评分，其余小题查询逐题判定缓存
+        3. 只为仍未判定的填空题生成专业Prompt并调用AI模型
+        4. 解析批改结果，与本地评分和缓存判定合并
         5. 生成教学分析
         
         Args:
@@ -80,6 +114,12 @@ class AITeacherService:
             questions: 题目列表
             user_answers: 用户答案
             time_spent: 答题用时（秒）
+            paragraph_index: 文章段落索引，提供时只向模型发送题目参考段落
+            passage_context: 预先构建的文章上下文（见build_passage_context），
+                批量批改同一试卷时共享，不再逐份构建
+            paper_version: 试卷快照版本，提供时启用整卷批改缓存和逐题判定缓存
+            on_progress: 批改进度回调，本地评分和缓存判定完成后、以及模型流式输出中
+                每完成一道小题时，以(已完成的小题结果, 小题总数)调用
             
         Returns:
             AITeacherResponse: 完整的批改结果和教学分析
@@ -89,18 +129,75 @@ class AITeacherService:
         """
         logger.info("开始AI批改流程")
         
+        cache = get_grading_cache() if paper_version else None
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(paper_version, self.model, PROMPT_VERSION, questions, user_answers)
+            cached = await cache.get(cache_key, time_spent)
+            if cached is not None:
+                logger.info("整卷批改缓存命中，跳过AI调用")
+                return cached
+        
         try:
             # 1. 构建批改上下文
-            context = self._build_grading_context(passage, questions, user_answers, time_spent)
-            
-            # 2. 生成专业Prompt
-            prompt = self._create_grading_prompt(context)
-            
-            # 3. 调用AI模型
-            ai_response = await self._call_ai_model(prompt)
+            context = self._build_grading_context(
+                passage, questions, user_answers, time_spent, paragraph_index, passage_context
+            )
             
-            # 4. 解析批改结果
-            result = self._parse_ai_response(ai_response, questions, user_answers, context, time_spent)
+            # 2. 客观题本地评分，其余小题查询逐题判定缓存
+            resolved: Dict[int, Dict[str, Any]] = {}
+            if self.settings.GRADING_HYBRID_ENABLED:
+                for sub_q in context['sub_questions']:
+                    fragment = self._grade_locally(sub_q)
+                    if fragment is not None:
+                        resolved[sub_q['sub_question_number']] = fragment
+            local_count = len(resolved)
+            
+            verdicts = get_verdict_cache() if paper_version else None
+            verdict_keys: Dict[int, str] = {}
+            if verdicts is not None:
+                verdict_keys = {
+                    sub_q['sub_question_number']: make_verdict_key(paper_version, PROMPT_VERSION, sub_q, GRADING_LANGUAGE)
+                    for sub_q in context['sub_questions'] if sub_q['sub_question_number'] not in resolved
+                }
+                if verdict_keys:
+                    found = await verdicts.get_many(list(verdict_keys.values()))
+                    resolved.update({number: found[key] for number, key in verdict_keys.items() if key in found})
+            
+            total_sub_questions = len(context['sub_questions'])
+            if resolved and len(resolved) == total_sub_questions:
+                # 全部小题已判定：不调用AI模型
+                logger.info(f"全部{total_sub_questions}道小题已判定（本地评分{local_count}道，判定缓存{len(resolved) - local_count}道），跳过AI调用")
+                result = self._merge_verdicts(context, resolved, time_spent)
+            else:
+                if resolved:
+                    logger.info(f"本地评分{local_count}道、判定缓存命中{len(resolved) - local_count}道，其余{total_sub_questions - len(resolved)}道小题交给AI批改")
+                grading_context = self._narrow_grading_context(context, resolved) if resolved else context
+                
+                on_result = None
+                if on_progress is not None:
+                    on_result = self._progress_reporter(context, resolved, on_progress)
+                    if resolved:
+                        await on_result(None)
+                
+                # 3. 生成专业Prompt并调用AI模型（流式输出中每完成一道小题报告一次进度）
+                prompt = self._create_grading_prompt(grading_context)
+                ai_response = await self._call_ai_model(prompt, on_result)
+                
+                # 4. 解析批改结果，与缓存判定合并
+                result = self._parse_ai_response(ai_response, questions, user_answers, grading_context, time_spent)
+                if verdicts is not None:
+                    await verdicts.put_many({
+                        verdict_keys[item.question_number]: item.model_dump()
+                        for item in result.results
+                        if item.question_number in verdict_keys and item.question_number not in resolved
+                    })
+                if resolved:
+                    result = self._merge_verdicts(context, resolved, time_spent, result)
+            
+            # 只缓存模型成功批改的结果，降级结果不进入缓存
+            if cache is not None:
+                await cache.put(cache_key, result)
             
             logger.info("AI批改完成")
             return result
@@ -115,7 +212,9 @@ class AITeacherService:
         passage: DSEPassage,
         questions: List[DSEQuestion],
         user_answers: List[UserAnswer],
-        time_spent: float
+        time_spent: float,
+        paragraph_index: Optional[PassageIndex] = None,
+        passage_context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         构建批改上下文
@@ -129,6 +228,8 @@ class AITeacherService:
             questions: 题目列表  
             user_answers: 用户答案
             time_spent: 答题用时
+            paragraph_index: 文章段落索引（可选）
+            passage_context: 预先构建的文章上下文（可选）
             
         Returns:
             Dict[str, Any]: 结构化的批改上下文
@@ -215,13 +316,16 @@ class AITeacherService:
                     sub_data = {
                         "sub_question_number": sub_question_counter,
                         "parent_question_number": question.questionNumber,
+                        "question_id": question.id,
+                        "sub_id": sub_question.id,
                         "question_text": sub_question.questionText,
                         "type": "fill-in-blank-sub",
                         "skill_type": question.skillType.value,
                         "marks": sub_question.marks,
                         "correct_answer": sub_question.correctAnswer,
                         "user_answer": user_sub_answer,
-                        "reference_paragraphs": question.referenceParagraphs or []
+                        "reference_paragraphs": question.referenceParagraphs or [],
+                        "explanation": question.explanation or ""
                     }
                     sub_questions_data.append(sub_data)
                     
@@ -257,13 +361,16 @@ class AITeacherService:
                     sub_data = {
                         "sub_question_number": sub_question_counter,
                         "parent_question_number": question.questionNumber,
+                        "question_id": question.id,
+                        "sub_id": position,
                         "question_text": f"位置({position}) - 时序排列",
                         "type": "timeline-sequencing-sub",
                         "skill_type": question.skillType.value,
                         "marks": 1,  # 每个位置1分
                         "correct_answer": correct_answer,
                         "user_answer": user_pos_answer,
-                        "reference_paragraphs": question.referenceParagraphs or []
+                        "reference_paragraphs": question.referenceParagraphs or [],
+                        "explanation": question.explanation or ""
                     }
                     sub_questions_data.append(sub_data)
                     
@@ -299,13 +406,16 @@ class AITeacherService:
                 sub_data = {
                     "sub_question_number": sub_question_counter,
                     "parent_question_number": question.questionNumber,
+                    "question_id": question.id,
+                    "sub_id": "",
                     "question_text": question.questionText,
                     "type": question.type.value,
                     "skill_type": question.skillType.value,
                     "marks": question.totalMarks,
                     "correct_answer": correct_answer_text,
                     "user_answer": actual_user_answer,
-                    "reference_paragraphs": question.referenceParagraphs or []
+                    "reference_paragraphs": question.referenceParagraphs or [],
+                    "explanation": question.explanation or ""
                 }
                 sub_questions_data.append(sub_data)
                 
@@ -314,11 +424,7 @@ class AITeacherService:
                 sub_question_counter += 1
         
         return {
-            "passage": {
-                "title": passage.title,
-                "content": passage.content,
-                "word_count": passage.wordCount
-            },
+            "passage": passage_context or self.build_passage_context(passage, questions, paragraph_index),
             "questions": questions_data,
             "sub_questions": sub_questions_data,
             "time_spent_minutes": round(time_spent / 60, 1),
@@ -327,6 +433,235 @@ class AITeacherService:
             "total_marks": sum(q.totalMarks for q in questions)
         }
     
+    def _narrow_grading_context(
+        self,
+        context: Dict[str, Any],
+        resolved: Dict[int, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        构建只包含未命中小题的批改上下文
+        
+        小题保留原编号；已判定（本地评分或缓存）的小题放入graded_sub_questions，只作为能力分析的参考。
+        """
+        narrowed = dict(context)
+        narrowed['sub_questions'] = [
+            sub_q for sub_q in context['sub_questions'] if sub_q['sub_question_number'] not in resolved
+        ]
+        narrowed['graded_sub_questions'] = [
+            {**sub_q, 'is_correct': resolved[sub_q['sub_question_number']]['is_correct']}
+            for sub_q in context['sub_questions'] if sub_q['sub_question_number'] in resolved
+        ]
+        narrowed['total_sub_questions'] = len(narrowed['sub_questions'])
+        return narrowed
+    
+    def _grade_locally(self, sub_q: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        本地评分（混合批改模式）
+        
+        选择题和时序题按字母精确比较；填空题只在未作答或与标准答案一致
+        （忽略大小写、空白和首尾标点）时本地评分，其余开放答案返回None，交给AI模型判断。
+        
+        Returns:
+            Optional[Dict[str, Any]]: 判定片段（与逐题判定缓存的片段结构相同）
+        """
+        sub_type = sub_q['type']
+        user_answer = sub_q['user_answer']
+        unanswered = user_answer == "未作答"
+        
+        if sub_type in OBJECTIVE_SUB_TYPES:
+            is_correct = not unanswered and (
+                normalize_sub_answer(sub_type, user_answer) == normalize_sub_answer(sub_type, sub_q['correct_answer'])
+            )
+        elif sub_type == "fill-in-blank-sub":
+            if unanswered:
+                is_correct = False
+            elif self._normalize_fill_in(user_answer) == self._normalize_fill_in(sub_q['correct_answer']):
+                is_correct = True
+            else:
+                return None
+        else:
+            return None
+        
+        skill_name = self._get_skill_description(sub_q['skill_type'])
+        return {
+            "is_correct": is_correct,
+            "explanation": self._create_local_explanation(sub_q, is_correct, unanswered),
+            "skill_analysis": f"{skill_name}：{'答對，掌握到相關技巧' if is_correct else '答錯，需要加強練習'}",
+            "reference_text": None,
+        }
+    
+    @staticmethod
+    def _normalize_fill_in(answer: str) -> str:
+        """规范化填空题答案：合并空白、忽略大小写和首尾标点"""
+        return normalize_sub_answer("fill-in-blank-sub", answer).strip(" .,;:!?'\"")
+    
+    def _create_local_explanation(self, sub_q: Dict[str, Any], is_correct: bool, unanswered: bool) -> str:
+        """生成本地评分小题的解析（格式与AI解析一致，各部分用<br><br>分隔）"""
+        paragraphs = "、".join(sub_q['reference_paragraphs']) if sub_q['reference_paragraphs'] else "全文"
+        sections = [
+            f"【原文定位】參考段落：{paragraphs}。",
+            f"【解題思路】標準答案係{sub_q['correct_answer']}。{sub_q.get('explanation') or ''}".strip(),
+        ]
+        if unanswered:
+            sections.append("【錯誤分析】呢題未作答。就算唔肯定，都應該根據原文作出最合理嘅判斷。")
+        elif not is_correct:
+            sections.append(f"【錯誤分析】你嘅答案係{sub_q['user_answer']}，同標準答案{sub_q['correct_answer']}唔一致，請返去原文再核對一次。")
+        sections.append(f"【技巧提醒】{LOCAL_GRADING_TIPS.get(sub_q['type'], '答題前先定位原文，再核對答案。')}")
+        return "<br><br>".join(sections)
+    
+    def _merge_verdicts(
+        self,
+        context: Dict[str, Any],
+        resolved: Dict[int, Dict[str, Any]],
+        time_spent: float,
+        response: Optional[AITeacherResponse] = None
+    ) -> AITeacherResponse:
+        """
+        把已判定的小题（本地评分或缓存）并入批改结果
+        
+        得分按整卷重新计算；模型只看到部分小题（或完全没有调用模型），
+        技能分析按整卷的实际答题情况重新生成。
+        
+        Args:
+            context: 完整的批改上下文
+            resolved: 小题编号 -> 判定片段
+            time_spent: 答题用时（秒）
+            response: 模型对其余小题的批改结果，全部命中时为None
+        """
+        if response is None:
+            response = AITeacherResponse(
+                results=[], final_score=0, correct_count=0, total_questions=0, ability_analysis="",
+                skill_breakdown=[], strengths_detailed=[], weaknesses_detailed=[],
+                strengths=[], weaknesses=[], recommendations=[], time_spent=int(time_spent)
+            )
+        
+        results = [item for item in response.results if item.question_number not in resolved]
+        results.extend(self._resolved_results(context, resolved))
+        results.sort(key=lambda item: item.question_number)
+        
+        correct_count = sum(1 for item in results if item.is_correct)
+        response.results = results
+        response.correct_count = correct_count
+        response.total_questions = len(results)
+        response.final_score = correct_count / len(results) if results else 0
+        
+        response.skill_breakdown = []
+        self._validate_and_fix_skill_analysis(response, context)
+        if not response.recommendations:
+            response.recommendations = [
+                suggestion
+                for weakness in response.weaknesses_detailed
+                for suggestion in weakness.improvement_suggestions[:2]
+            ][:5] or [
+                "保持每日閱讀英文文章嘅習慣，鞏固已掌握嘅技能",
+                "做練習時先定位原文段落，再核對答案",
+                "挑戰難度較高嘅文章，進一步提升閱讀能力",
+            ]
+        return response
+    
+    def _resolved_results(
+        self,
+        context: Dict[str, Any],
+        resolved: Dict[int, Dict[str, Any]]
+    ) -> List[QuestionResult]:
+        """把已判定的小题片段还原为单题批改结果（按小题编号排序）"""
+        return [
+            QuestionResult(
+                question_number=sub_q['sub_question_number'],
+                user_answer=sub_q['user_answer'],
+                correct_answer=str(sub_q['correct_answer']),
+                **resolved[sub_q['sub_question_number']]
+            )
+            for sub_q in context['sub_questions']
+            if sub_q['sub_question_number'] in resolved
+        ]
+    
+    def _progress_reporter(
+        self,
+        context: Dict[str, Any],
+        resolved: Dict[int, Dict[str, Any]],
+        on_progress: ProgressCallback
+    ) -> Callable[[Optional[Dict[str, Any]]], Awaitable[None]]:
+        """
+        生成流式输出的逐题回调
+        
+        模型输出的results元素一闭合即转换为单题批改结果（学生答案和标准答案取自上下文，
+        不依赖模型的复述），与已判定的小题一起报告给on_progress。
+        传入None时只报告已判定的小题。回调异常只记录日志，不影响批改。
+        """
+        sub_questions = {sub_q['sub_question_number']: sub_q for sub_q in context['sub_questions']}
+        completed: Dict[int, QuestionResult] = {
+            item.question_number: item for item in self._resolved_results(context, resolved)
+        }
+        
+        async def on_result(element: Optional[Dict[str, Any]]) -> None:
+            if element is not None:
+                try:
+                    number = int(element.get('question_number'))
+                except (TypeError, ValueError):
+                    return
+                sub_q = sub_questions.get(number)
+                if sub_q is None or number in resolved:
+                    return
+                explanation = element.get('explanation') or ""
+                if isinstance(explanation, dict):
+                    explanation = self._format_structured_explanation(explanation)
+                completed[number] = QuestionResult(
+                    question_number=number,
+                    is_correct=bool(element.get('is_correct')),
+                    user_answer=sub_q['user_answer'],
+                    correct_answer=str(sub_q['correct_answer']),
+                    explanation=str(explanation),
+                    skill_analysis=str(element.get('skill_analysis') or ""),
+                    reference_text=element.get('reference_text')
+                )
+            try:
+                await on_progress(sorted(completed.values(), key=lambda item: item.question_number), len(sub_questions))
+            except Exception as e:
+                logger.warning(f"批改进度回调失败: {e}")
+        
+        return on_result
+    
+    def build_passage_context(
+        self,
+        passage: DSEPassage,
+        questions: List[DSEQuestion],
+        paragraph_index: Optional[PassageIndex]
+    ) -> Dict[str, Any]:
+        """
+        构建批改上下文中的文章部分
+        
+        结果只取决于试卷本身，批量批改同一试卷时构建一次即可共享。
+        有段落索引且每道题都标注了可解析的参考段落时，只取这些段落的纯文本；
+        否则发送全文纯文本。没有段落索引时沿用文章HTML。
+        """
+        passage_context = {
+            "title": passage.title,
+            "content": passage.content,
+            "word_count": passage.wordCount,
+            "excerpted": False
+        }
+        if paragraph_index is None:
+            return passage_context
+        
+        referenced_ids = []
+        for question in questions:
+            ids = question.referenceParagraphs or []
+            if not ids or not all(pid in paragraph_index for pid in ids):
+                # 有题目需要参考全文
+                passage_context["content"] = paragraph_index.full_text
+                return passage_context
+            referenced_ids.extend(ids)
+        
+        spans = paragraph_index.select(referenced_ids)
+        passage_context["content"] = paragraph_index.excerpt(referenced_ids)
+        passage_context["excerpted"] = True
+        logger.info(
+            f"批改上下文使用{len(spans)}个参考段落，"
+            f"约{sum(span.token_count for span in spans)}/{paragraph_index.total_tokens} tokens"
+        )
+        return passage_context
+    
     def _format_user_answer(self, question: DSEQuestion, user_answer: Optional[UserAnswer]) -> str:
         """格式化用户答案为文本形式"""
         if not user_answer:
@@ -432,13 +767,18 @@ class AITeacherService:
             str: 完整的批改Prompt
         """
         
+        if context['passage']['excerpted']:
+            passage_heading = "**文章節錄**（只列出各題參考段落，每段開頭標明段落ID；請仔細閱讀，呢個係批改嘅核心依據）"
+        else:
+            passage_heading = "**文章內容**（請仔細閱讀，呢個係批改嘅核心依據）"
+        
         prompt = f"""你係蘭老師，一位擁有15年以上教學經驗嘅香港DSE英語閱讀理解名師。你用正宗嘅香港粵語同繁體中文為學生提供專業嘅批改同指導。
 
 ## 📚 閱讀文章資訊
 **標題**: {context['passage']['title']}
 **字數**: {context['passage']['word_count']}字
 
-**文章內容**（請仔細閱讀，呢個係批改嘅核心依據）:
+{passage_heading}:
 {context['passage']['content']}
 
 ## 📝 題目同答案分析
@@ -446,6 +786,14 @@ class AITeacherService:
 
 """
         
+        graded_sub_questions = context.get('graded_sub_questions') or []
+        if graded_sub_questions:
+            prompt += "\n## ✅ 已批改小題（毋須再批改，亦唔好喺results入面返回，只供能力分析參考）\n"
+            for sub_q in graded_sub_questions:
+                verdict = "答啱" if sub_q['is_correct'] else "答錯"
+                prompt += f"- 小題{sub_q['sub_question_number']}（第{sub_q['parent_question_number']}題，{self._get_skill_description(sub_q['skill_type'])}）：學生答案 {sub_q['user_answer']}，{verdict}\n"
+            prompt += "\n## 📝 需要批改嘅小題\n"
+        
         # 添加每道子题目的详细信息
         for sub_q in context['sub_questions']:
             prompt += f"""
@@ -640,7 +988,7 @@ class AITeacherService:
 ```
 
 **📋 執行指令**: 
-1. 為每道小題(question_number從1到{context['total_sub_questions']})提供批改結果
+1. {self._format_number_instruction(context)}
 2. 確保is_correct字段與explanation內容完全一致
 3. 為每個出現的技能提供skill_breakdown條目
 4. 為掌握度≥0.7的技能提供strengths_detailed條目
@@ -655,6 +1003,13 @@ class AITeacherService:
 
         return prompt
     
+    def _format_number_instruction(self, context: Dict[str, Any]) -> str:
+        """批改范围指令：整卷批改时为连续编号，部分批改时列出需要批改的小题编号"""
+        if context.get('graded_sub_questions'):
+            numbers = ", ".join(str(sub_q['sub_question_number']) for sub_q in context['sub_questions'])
+            return f"只為以下小題提供批改結果（question_number保持上面嘅編號）: {numbers}"
+        return f"為每道小題(question_number從1到{context['total_sub_questions']})提供批改結果"
+    
     def _get_type_description(self, question_type: str) -> str:
         """获取题目类型的中文描述"""
         type_map = {
@@ -676,15 +1031,21 @@ class AITeacherService:
         }
         return skill_map.get(skill_type, skill_type)
     
-    async def _call_ai_model(self, prompt: str) -> str:
+    async def _call_ai_model(
+        self,
+        prompt: str,
+        on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> str:
         """
         调用AI模型进行批改
         
         使用OpenRouter API调用Claude 3.5 Sonnet模型。
         配置了适当的参数以确保批改质量和稳定性。
+        GRADING_STREAM_ENABLED时使用流式接口，输出中results数组的每个元素一完成就交给on_result。
         
         Args:
             prompt: 批改Prompt
+            on_result: 流式输出中每完成一道小题时调用，参数为该小题的结果字典
             
         Returns:
             str: AI模型的响应文本
@@ -717,20 +1078,23 @@ class AITeacherService:
         logger.info(f"调用AI模型: {self.model}")
         
         try:
-            response = await self.client.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=120  # 2分钟超时
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            if "choices" not in data or not data["choices"]:
-                raise Exception("AI响应格式错误：缺少choices字段")
-            
-            content = data["choices"][0]["message"]["content"]
+            if self.settings.GRADING_STREAM_ENABLED:
+                content = await self._stream_ai_model(headers, payload, on_result)
+            else:
+                response = await self.client.post(
+                    self.api_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=120  # 2分钟超时
+                )
+                
+                response.raise_for_status()
+                data = response.json()
+                
+                if "choices" not in data or not data["choices"]:
+                    raise Exception("AI响应格式错误：缺少choices字段")
+                
+                content = data["choices"][0]["message"]["content"]
             logger.info("AI模型调用成功")
             
             return content
@@ -747,6 +1111,43 @@ class AITeacherService:
             logger.error(f"AI API调用异常: {e}")
             raise Exception(f"AI服务异常: {str(e)}")
     
+    async def _stream_ai_model(
+        self,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> str:
+        """
+        以流式接口调用AI模型，返回完整的响应文本
+        
+        超时作用于每次读取（2分钟内没有新的输出才算超时），长输出不会因总时长超时。
+        """
+        parser = ResultsStreamParser()
+        async with self.client.stream(
+            "POST",
+            self.api_url,
+            headers=headers,
+            json={**payload, "stream": True},
+            timeout=120
+        ) as response:
+            if response.is_error:
+                # 读取错误响应体，供HTTPStatusError处理时记录
+                await response.aread()
+            response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                delta = parse_sse_line(line)
+                if delta is None:
+                    continue
+                for element in parser.feed(delta):
+                    if on_result is not None:
+                        await on_result(element)
+        
+        if not parser.text:
+            raise Exception("AI响应格式错误：流式响应没有内容")
+        logger.info(f"流式输出完成: {len(parser.text)}字符，逐题结果{parser.emitted}道")
+        return parser.text
+    
     def _parse_ai_response(
         self,
         ai_response: str,
@@ -2001,8 +2402,7 @@ class AITeacherService:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        await self.client.aclose()
+        """异步上下文管理器出口（共享连接池由应用关闭时释放）"""
     
     def _validate_and_fix_skill_analysis(self, ai_response: 'AITeacherResponse', context: Dict[str, Any]) -> None:
         """
@@ -0,0 +1,149 @@
+"""
+题库打包文件格式
+
+本模块定义题库编译产物的二进制格式，以及对应的写入器和读取器。
+服务进程以只读方式mmap打包文件，启动时只解析索引，
+文章和题目记录在被访问时才解码；多个uvicorn worker共享同一份页缓存。
+
+文件布局：
+- 文件头（32字节）：魔数 | 格式版本 | 保留 | 索引偏移 | 索引长度
+- 记录区：逐条紧凑JSON（UTF-8）记录
+- 索引区：紧凑JSON，记录各条记录的(偏移, 长度)及分面元数据
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# 文件头：8字节魔数、u32格式版本、u32保留、u64索引偏移、u64索引长度
+PACK_MAGIC = b"DSEBANK\x00"
+PACK_FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct("<8sIIQQ")
+
+# 记录位置 (偏移, 长度)
+RecordLocation = Tuple[int, int]
+
+
+class PackFormatError(Exception):
+    """打包文件格式错误"""
+
+
+def _encode(obj: Any) -> bytes:
+    """把对象编码为紧凑JSON字节"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class PackWriter:
+    """
+    打包文件写入器
+
+    先写入临时文件，完成后fsync并原子替换目标文件。
+    已经mmap旧文件的进程继续读取旧inode，不会读到半写入的数据。
+    """
+
+    def __init__(self, path: Path):
+        """创建临时文件并预留文件头"""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(b"\x00" * HEADER_STRUCT.size)
+        self._offset = HEADER_STRUCT.size
+
+    def add_record(self, obj: Any) -> RecordLocation:
+        """写入一条记录，返回其位置"""
+        data = _encode(obj)
+        location = (self._offset, len(data))
+        self._file.write(data)
+        self._offset += len(data)
+        return location
+
+    def finish(self, index: Dict[str, Any]) -> Path:
+        """写入索引和文件头，并原子替换目标文件"""
+        try:
+            index_data = _encode(index)
+            index_offset = self._offset
+            self._file.write(index_data)
+            self._file.seek(0)
+            self._file.write(HEADER_STRUCT.pack(
+                PACK_MAGIC, PACK_FORMAT_VERSION, 0, index_offset, len(index_data)
+            ))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+            return self.path
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """放弃写入并删除临时文件"""
+        if not self._file.closed:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class PackFile:
+    """
+    打包文件读取器
+
+    只读mmap整个文件，打开时只解析文件头和索引。
+    """
+
+    def __init__(self, path: Path):
+        """
+        打开并校验打包文件
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            PackFormatError: 文件头或索引不合法
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < HEADER_STRUCT.size:
+                raise PackFormatError(f"打包文件过小: {self.path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+
+        magic, format_version, _, index_offset, index_length = HEADER_STRUCT.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            self.close()
+            raise PackFormatError(f"不是题库打包文件: {self.path}")
+        if format_version != PACK_FORMAT_VERSION:
+            self.close()
+            raise PackFormatError(f"不支持的打包格式版本: {format_version}")
+        if index_offset + index_length > len(self._mmap):
+            self.close()
+            raise PackFormatError(f"打包文件索引越界: {self.path}")
+
+        self.index: Dict[str, Any] = json.loads(self._mmap[index_offset:index_offset + index_length])
+
+    def read(self, location: Sequence[int]) -> Any:
+        """解码指定位置的记录"""
+        offset, length = location
+        return json.loads(self._mmap[offset:offset + length])
+
+    def close(self) -> None:
+        """关闭mmap"""
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap.closed
+
+
+def pack_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """获取打包文件的(mtime_ns, size)签名，文件不存在时返回None"""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
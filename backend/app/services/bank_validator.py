@@ -0,0 +1,173 @@
+"""
+题库数据校验
+
+本模块交叉校验一份试卷的article.json、questions.json和answers.json：
+题目ID与答案键是否一一对应、分值是否自洽、题目中的正确答案是否与答案键一致、
+参考段落是否存在于文章中。
+
+编译命令在输出打包文件前对全部试卷执行校验，任何不一致都会导致编译失败；
+服务端构建JSON试卷快照时执行同样的校验，热重载时校验失败的试卷保留旧版本。
+"""
+
+from typing import Any, Dict, List, Mapping, Sequence
+
+
+class BankValidationError(Exception):
+    """试卷数据校验失败，issues为全部问题的描述"""
+
+    def __init__(self, paper_id: str, issues: Sequence[str]):
+        self.paper_id = paper_id
+        self.issues = list(issues)
+        super().__init__(f"试卷{paper_id}校验失败: " + "; ".join(self.issues))
+
+
+def _normalize(value: Any) -> str:
+    """答案比较前的规范化：去首尾空白、忽略大小写"""
+    return str(value).strip().lower()
+
+
+def _option_letters(options: Sequence[str]) -> List[str]:
+    """从"A. xxx"形式的选项中提取字母"""
+    return [option.split(".", 1)[0].strip() for option in options]
+
+
+def _check_multiple_choice(q_data: Mapping[str, Any], answer: Any, issues: List[str]) -> None:
+    qid = q_data["id"]
+    correct = q_data.get("correctAnswer")
+    options = q_data.get("options") or []
+    if not options:
+        issues.append(f"{qid}: 选择题缺少options")
+    if not correct:
+        issues.append(f"{qid}: 选择题缺少correctAnswer")
+        return
+    if options and correct not in _option_letters(options):
+        issues.append(f"{qid}: correctAnswer {correct} 不在选项 {_option_letters(options)} 中")
+    if not isinstance(answer, Mapping) or "answer" not in answer:
+        issues.append(f"{qid}: 答案键缺少answer")
+    elif _normalize(answer["answer"]) != _normalize(correct):
+        issues.append(f"{qid}: correctAnswer {correct} 与答案键 {answer['answer']} 不一致")
+
+
+def _check_fill_in_blank(q_data: Mapping[str, Any], answer: Any, issues: List[str]) -> None:
+    qid = q_data["id"]
+    sub_questions = q_data.get("subQuestions") or []
+    if not sub_questions:
+        issues.append(f"{qid}: 填空题缺少subQuestions")
+        return
+    if not isinstance(answer, Mapping):
+        answer = {}
+
+    sub_ids = [sub["id"] for sub in sub_questions]
+    if len(set(sub_ids)) != len(sub_ids):
+        issues.append(f"{qid}: 子题目ID重复")
+
+    for sub in sub_questions:
+        sub_answer = answer.get(sub["id"])
+        if not isinstance(sub_answer, Mapping) or "answer" not in sub_answer:
+            issues.append(f"{sub['id']}: 答案键缺少该子题目")
+        elif _normalize(sub_answer["answer"]) != _normalize(sub.get("correctAnswer", "")):
+            issues.append(
+                f"{sub['id']}: correctAnswer {sub.get('correctAnswer')} 与答案键 {sub_answer['answer']} 不一致"
+            )
+
+    orphans = [key for key, value in answer.items() if isinstance(value, Mapping) and key not in sub_ids]
+    if orphans:
+        issues.append(f"{qid}: 答案键包含未知子题目 {orphans}")
+
+    sub_marks = sum(sub.get("marks", 0) for sub in sub_questions)
+    if sub_marks != q_data["totalMarks"]:
+        issues.append(f"{qid}: 子题目分值合计{sub_marks}与totalMarks {q_data['totalMarks']}不一致")
+
+
+def _check_timeline(q_data: Mapping[str, Any], answer: Any, issues: List[str]) -> None:
+    qid = q_data["id"]
+    correct_answers = q_data.get("correctAnswers") or {}
+    events = q_data.get("timelineEvents") or []
+    letters = [option["letter"] for option in q_data.get("availableOptions") or []]
+
+    blanks = [event["position"] for event in events if event.get("position") != "fixed"]
+    if set(correct_answers) != set(blanks):
+        issues.append(f"{qid}: correctAnswers位置 {sorted(correct_answers)} 与时间线空格 {blanks} 不一致")
+    unknown = [letter for letter in correct_answers.values() if letter not in letters]
+    if unknown:
+        issues.append(f"{qid}: correctAnswers包含不存在的选项 {unknown}")
+    if len(set(correct_answers.values())) != len(correct_answers):
+        issues.append(f"{qid}: correctAnswers中的选项重复使用")
+
+    if not isinstance(answer, Mapping):
+        answer = {}
+    for position, letter in correct_answers.items():
+        if position not in answer:
+            issues.append(f"{qid}: 答案键缺少位置{position}")
+        elif _normalize(answer[position]) != _normalize(letter):
+            issues.append(f"{qid}: 位置{position}的correctAnswers {letter} 与答案键 {answer[position]} 不一致")
+
+
+_TYPE_CHECKS = {
+    "multiple-choice": _check_multiple_choice,
+    "fill-in-blank": _check_fill_in_blank,
+    "timeline-sequencing": _check_timeline,
+}
+
+
+def validate_paper(
+    article: Mapping[str, Any],
+    questions: Sequence[Mapping[str, Any]],
+    answers: Mapping[str, Any]
+) -> List[str]:
+    """
+    交叉校验一份试卷的数据文件
+
+    Args:
+        article: article.json内容
+        questions: questions.json内容
+        answers: answers.json内容（答案键）
+
+    Returns:
+        List[str]: 问题描述列表，为空表示校验通过
+    """
+    issues: List[str] = []
+
+    paragraph_ids = [para.get("id") for para in article.get("paragraphs", [])]
+    if len(set(paragraph_ids)) != len(paragraph_ids):
+        issues.append("文章段落ID重复")
+    known_paragraphs = set(paragraph_ids)
+
+    question_ids: Dict[str, int] = {}
+    question_numbers: Dict[int, str] = {}
+    for q_data in questions:
+        qid = q_data.get("id")
+        if not qid:
+            issues.append(f"第{len(question_ids) + 1}道题目缺少id")
+            continue
+        if qid in question_ids:
+            issues.append(f"{qid}: 题目ID重复")
+        question_ids[qid] = q_data.get("questionNumber")
+
+        number = q_data.get("questionNumber")
+        if number in question_numbers:
+            issues.append(f"{qid}: 题号{number}与{question_numbers[number]}重复")
+        question_numbers[number] = qid
+
+        marks = q_data.get("totalMarks")
+        if not isinstance(marks, int) or marks <= 0:
+            issues.append(f"{qid}: totalMarks必须为正整数")
+            continue
+
+        missing_paragraphs = [pid for pid in q_data.get("referenceParagraphs") or [] if pid not in known_paragraphs]
+        if missing_paragraphs:
+            issues.append(f"{qid}: 参考段落不存在 {missing_paragraphs}")
+
+        if qid not in answers:
+            issues.append(f"{qid}: 答案键缺少该题目")
+        check = _TYPE_CHECKS.get(q_data.get("type"))
+        if check is None:
+            issues.append(f"{qid}: 未知题目类型 {q_data.get('type')}")
+        else:
+            check(q_data, answers.get(qid), issues)
+
+    orphans = [key for key in answers if key not in question_ids]
+    if orphans:
+        issues.append(f"答案键包含未知题目 {orphans}")
+
+    return issues
@@ -0,0 +1,482 @@
+"""
+批改缓存
+
+只有一份Demo试卷时，大量学生提交的答卷完全相同，每份仍要完整调用一次大模型；
+即使整卷不同，单个小题的答案也高度重复。本模块提供两级按内容寻址的缓存：
+
+- 整卷缓存（GradingCache）：答卷相同时直接返回已有的批改结果
+- 逐题判定缓存（VerdictCache）：按小题缓存判定和解析片段，
+  批改时只把未见过的小题答案发给模型，其余小题由缓存片段拼装
+
+缓存键 = SHA-256(试卷版本, 模型, Prompt版本, 规范化后的答案)：
+- 试卷版本为题库快照的内容校验和，题目或答案键变化后自动失效
+- 模型或批改Prompt变化后同样失效
+- 答案规范化：按题目顺序排列，去除首尾空白，选择题/时序题字母统一大写，
+  未作答（空串、undefined、null）统一表示，题目之外的答案忽略
+
+设计原则：
+- 进程内LRU：命中时不涉及IO
+- 可选后备存储：磁盘（单机重启后仍有效）或Redis（多worker共享）
+- 只缓存模型成功批改的结果，降级结果不进入缓存
+- 命中时只重新计算答题用时字段
+
+逐题判定缓存键 = SHA-256(试卷版本, Prompt版本, 题目ID, 子题目ID, 规范化答案, 输出语言)。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from pydantic import ValidationError
+
+from ..core.config import get_settings
+from ..models.dse_models import AITeacherResponse, DSEQuestion, UserAnswer
+
+logger = logging.getLogger(__name__)
+
+# 视为未作答的答案
+UNANSWERED_VALUES = frozenset({"", "undefined", "null"})
+
+
+def _clean(value: Any, upper: bool = False) -> Optional[str]:
+    """规范化单个答案，未作答返回None"""
+    if value is None:
+        return None
+    text = " ".join(str(value).split())
+    if text in UNANSWERED_VALUES:
+        return None
+    return text.upper() if upper else text
+
+
+def normalize_answers(questions: Sequence[DSEQuestion], user_answers: Sequence[UserAnswer]) -> List[Any]:
+    """
+    把答卷规范化为与批改结果一一对应的结构
+
+    Returns:
+        List[Any]: 按题目顺序排列的 [题目ID, 规范化答案]
+    """
+    answer_map = {answer.question_id: answer for answer in user_answers}
+    normalized = []
+    for question in questions:
+        answer = answer_map.get(question.id)
+        if question.type.value == "fill-in-blank" and question.subQuestions:
+            given = (answer.fill_in_answers or {}) if answer else {}
+            value = [[sub.id, _clean(given.get(sub.id))] for sub in question.subQuestions]
+        elif question.type.value == "timeline-sequencing" and question.correctAnswers:
+            given = (answer.timeline_answers or {}) if answer else {}
+            value = [[position, _clean(given.get(position), upper=True)] for position in question.correctAnswers]
+        else:
+            value = _clean(answer.selected_option, upper=True) if answer else None
+        normalized.append([question.id, value])
+    return normalized
+
+
+def make_cache_key(
+    paper_version: str,
+    model: str,
+    prompt_version: str,
+    questions: Sequence[DSEQuestion],
+    user_answers: Sequence[UserAnswer]
+) -> str:
+    """计算答卷的缓存键"""
+    canonical = json.dumps(
+        {
+            "paper": paper_version,
+            "model": model,
+            "prompt": prompt_version,
+            "answers": normalize_answers(questions, user_answers),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def normalize_sub_answer(sub_type: str, answer: str) -> str:
+    """
+    规范化单个小题答案（逐题判定缓存使用）
+
+    选择题/时序题字母统一大写；填空题合并空白并忽略大小写。
+    """
+    text = " ".join(str(answer).split())
+    if sub_type == "fill-in-blank-sub":
+        return text.casefold()
+    return text.upper()
+
+
+def make_verdict_key(
+    paper_version: str,
+    prompt_version: str,
+    sub_question: Mapping[str, Any],
+    language: str
+) -> str:
+    """计算小题判定的缓存键（sub_question为批改上下文中的小题数据）"""
+    canonical = json.dumps(
+        [
+            paper_version,
+            prompt_version,
+            sub_question["question_id"],
+            sub_question["sub_id"],
+            normalize_sub_answer(sub_question["type"], sub_question["user_answer"]),
+            language,
+        ],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheBacking(ABC):
+    """缓存后备存储（值为AITeacherResponse的JSON）"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """读取缓存值，不存在时返回None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """写入缓存值"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """删除缓存值（无法解析的条目）"""
+
+    async def close(self) -> None:
+        """释放资源"""
+
+
+class DiskCacheBacking(CacheBacking):
+    """磁盘后备存储：每个键一个JSON文件，按键前两位分目录"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    async def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            return await asyncio.to_thread(path.read_text, encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._write, self._path(key), value)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    @staticmethod
+    def _write(path: Path, value: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写同目录下的唯一临时文件再替换：读取方不会看到写了一半的文件，并发写入同一键也不会共用临时文件
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(value)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+class RedisCacheBacking(CacheBacking):
+    """Redis后备存储：多worker共享，键带过期时间"""
+
+    def __init__(self, url: Optional[str] = None, client: Any = None, ttl: int = 7 * 86400,
+                 key_prefix: str = "dse:grading-cache:"):
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:
+                raise RuntimeError("使用Redis批改缓存需要安装redis包")
+            if not url:
+                raise RuntimeError("使用Redis批改缓存需要配置REDIS_URL")
+            client = redis_asyncio.from_url(url, decode_responses=True)
+            self._owns_client = True
+        else:
+            self._owns_client = False
+        self.client = client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(f"{self.key_prefix}{key}")
+
+    async def set(self, key: str, value: str) -> None:
+        await self.client.set(f"{self.key_prefix}{key}", value, ex=self.ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(f"{self.key_prefix}{key}")
+
+    async def close(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+
+async def _discard(backing: CacheBacking, key: str) -> None:
+    """删除后备存储中无法解析的条目，失败只记录日志"""
+    try:
+        await backing.delete(key)
+    except Exception as e:
+        logger.warning(f"删除批改缓存条目失败: {key}, 错误: {e}")
+
+
+class GradingCache:
+    """
+    整卷批改缓存
+
+    进程内LRU在前，后备存储在后；后备存储命中时回填LRU。
+    后备存储读写失败只记录日志，不影响批改；无法解析的条目（损坏或旧版本结构）视为未命中并删除。
+    """
+
+    def __init__(self, max_entries: int = 1000, backing: Optional[CacheBacking] = None):
+        self.max_entries = max_entries
+        self.backing = backing
+        self._entries: "OrderedDict[str, AITeacherResponse]" = OrderedDict()
+
+        # 统计计数
+        self.hits = 0
+        self.backing_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.backing_errors = 0
+
+    async def get(self, key: str, time_spent: float) -> Optional[AITeacherResponse]:
+        """
+        读取缓存的批改结果
+
+        Args:
+            key: 缓存键（make_cache_key）
+            time_spent: 本次答题用时（秒），覆盖缓存结果中的用时
+
+        Returns:
+            Optional[AITeacherResponse]: 缓存结果的副本，未命中时返回None
+        """
+        response = self._entries.get(key)
+        if response is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        elif self.backing is not None:
+            try:
+                raw = await self.backing.get(key)
+            except Exception as e:
+                self.backing_errors += 1
+                logger.warning(f"读取批改缓存后备存储失败: {e}")
+                raw = None
+            if raw is not None:
+                try:
+                    response = AITeacherResponse.model_validate_json(raw)
+                except ValidationError as e:
+                    self.backing_errors += 1
+                    logger.warning(f"批改缓存条目无法解析，已删除: {key}, 错误: {e.error_count()}处")
+                    await _discard(self.backing, key)
+                else:
+                    self._remember(key, response)
+                    self.backing_hits += 1
+
+        if response is None:
+            self.misses += 1
+            return None
+        return response.model_copy(update={"time_spent": int(time_spent)})
+
+    async def put(self, key: str, response: AITeacherResponse) -> None:
+        """缓存批改结果（只应传入模型成功批改的结果）"""
+        self._remember(key, response)
+        self.stores += 1
+        if self.backing is not None:
+            try:
+                await self.backing.set(key, response.model_dump_json(by_alias=True))
+            except Exception as e:
+                self.backing_errors += 1
+                logger.warning(f"写入批改缓存后备存储失败: {e}")
+
+    def _remember(self, key: str, response: AITeacherResponse) -> None:
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计（用于健康检查）"""
+        lookups = self.hits + self.backing_hits + self.misses
+        return {
+            "backing": type(self.backing).__name__ if self.backing else None,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "backing_hits": self.backing_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "backing_errors": self.backing_errors,
+            "hit_rate": round((self.hits + self.backing_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# 逐题判定缓存保存的片段字段
+VERDICT_FIELDS = ("is_correct", "explanation", "skill_analysis", "reference_text")
+VERDICT_KEY_PREFIX = "verdict:"
+
+
+class VerdictCache:
+    """
+    逐题判定缓存
+
+    值为小题的判定片段（VERDICT_FIELDS），与整卷缓存共用后备存储（键加verdict:前缀）。
+    后备存储中无法解析或字段不符的片段视为未命中并删除。
+    """
+
+    def __init__(self, max_entries: int = 20000, backing: Optional[CacheBacking] = None):
+        self.max_entries = max_entries
+        self.backing = backing
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        # 统计计数
+        self.hits = 0
+        self.backing_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.backing_errors = 0
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """批量读取判定片段，返回命中的 键->片段"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for key in keys:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                found[key] = fragment
+                self.hits += 1
+            else:
+                missing.append(key)
+
+        if missing and self.backing is not None:
+            try:
+                values = await asyncio.gather(*(self.backing.get(VERDICT_KEY_PREFIX + key) for key in missing))
+            except Exception as e:
+                self.backing_errors += 1
+                logger.warning(f"读取判定缓存后备存储失败: {e}")
+                values = [None] * len(missing)
+            for key, raw in zip(missing, values):
+                if raw is None:
+                    continue
+                try:
+                    fragment = json.loads(raw)
+                except ValueError:
+                    fragment = None
+                if not isinstance(fragment, dict) or fragment.keys() != set(VERDICT_FIELDS):
+                    self.backing_errors += 1
+                    logger.warning(f"判定缓存片段无法解析，已删除: {key}")
+                    await _discard(self.backing, VERDICT_KEY_PREFIX + key)
+                    continue
+                self._remember(key, fragment)
+                found[key] = fragment
+                self.backing_hits += 1
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def put_many(self, fragments: Mapping[str, Mapping[str, Any]]) -> None:
+        """批量写入判定片段"""
+        values = {key: {name: fragment.get(name) for name in VERDICT_FIELDS} for key, fragment in fragments.items()}
+        for key, fragment in values.items():
+            self._remember(key, fragment)
+        self.stores += len(values)
+        if self.backing is not None and values:
+            try:
+                await asyncio.gather(*(
+                    self.backing.set(VERDICT_KEY_PREFIX + key, json.dumps(fragment, ensure_ascii=False))
+                    for key, fragment in values.items()
+                ))
+            except Exception as e:
+                self.backing_errors += 1
+                logger.warning(f"写入判定缓存后备存储失败: {e}")
+
+    def _remember(self, key: str, fragment: Dict[str, Any]) -> None:
+        self._entries[key] = fragment
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计（用于健康检查）"""
+        lookups = self.hits + self.backing_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "backing_hits": self.backing_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "backing_errors": self.backing_errors,
+            "hit_rate": round((self.hits + self.backing_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# 全局缓存实例
+_cache_backing: Optional[CacheBacking] = None
+_grading_cache: Optional[GradingCache] = None
+_verdict_cache: Optional[VerdictCache] = None
+
+
+def get_cache_backing() -> Optional[CacheBacking]:
+    """
+    根据配置获取缓存后备存储（整卷缓存和逐题判定缓存共用）
+
+    GRADING_CACHE_BACKING为disk时使用GRADING_CACHE_DIR，为redis时使用REDIS_URL，为空时不使用后备存储。
+    """
+    global _cache_backing
+    settings = get_settings()
+    backing_type = (settings.GRADING_CACHE_BACKING or "").lower()
+    if _cache_backing is None and backing_type:
+        if backing_type == "disk":
+            _cache_backing = DiskCacheBacking(Path(settings.GRADING_CACHE_DIR))
+        elif backing_type == "redis":
+            _cache_backing = RedisCacheBacking(url=settings.REDIS_URL, ttl=settings.GRADING_CACHE_TTL)
+        else:
+            raise ValueError(f"未知的批改缓存后备存储类型: {settings.GRADING_CACHE_BACKING}")
+    return _cache_backing
+
+
+def create_grading_cache() -> Optional[GradingCache]:
+    """根据配置创建整卷批改缓存；GRADING_CACHE_ENABLED为False时不缓存"""
+    settings = get_settings()
+    if not settings.GRADING_CACHE_ENABLED:
+        return None
+    return GradingCache(max_entries=settings.GRADING_CACHE_MAX_ENTRIES, backing=get_cache_backing())
+
+
+def get_grading_cache() -> Optional[GradingCache]:
+    """获取整卷批改缓存实例（单例模式），未启用时返回None"""
+    global _grading_cache
+    if _grading_cache is None:
+        _grading_cache = create_grading_cache()
+    return _grading_cache
+
+
+def get_verdict_cache() -> Optional[VerdictCache]:
+    """获取逐题判定缓存实例（单例模式），GRADING_VERDICT_CACHE_ENABLED为False时返回None"""
+    global _verdict_cache
+    settings = get_settings()
+    if _verdict_cache is None and settings.GRADING_VERDICT_CACHE_ENABLED:
+        _verdict_cache = VerdictCache(
+            max_entries=settings.GRADING_VERDICT_CACHE_MAX_ENTRIES,
+            backing=get_cache_backing()
+        )
+    return _verdict_cache
+
+
+async def close_grading_caches() -> None:
+    """关闭缓存后备存储（应用关闭时调用）"""
+    if _cache_backing is not None:
+        await _cache_backing.close()
@@ -0,0 +1,341 @@
+"""
+批改任务日志
+
+提交记录只存在于提交记录存储中时，进程重启（例如重新部署）会让批改中的提交永远停留在processing。
+本模块把批改任务的状态变化追加写入本地磁盘上的日志文件（每行一条JSON），
+启动时重放日志：未结束的任务重新进入批改队列，已结束的任务恢复批改结果。
+
+日志条目：
+- submitted：提交（包含请求内容和优先级）
+- started：开始批改
+- finished：批改结束（completed / failed / cancelled，包含结果或错误信息）
+
+设计原则：
+- 只追加：写入不修改已有内容，进程在任意时刻崩溃最多留下最后一行不完整的记录，重放时跳过
+- 批量fsync：条目先进入内存缓冲区，后台任务每GRADING_JOURNAL_FSYNC_INTERVAL秒写入并fsync一次
+- 定期压缩：追加条目数达到阈值时重写日志，每个提交只保留提交条目和结束条目，
+  结束超过保留时间的提交被丢弃，重放时间不随运行时间增长
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .submission_store import SubmissionRecord
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+OP_SUBMITTED = "submitted"
+OP_STARTED = "started"
+OP_FINISHED = "finished"
+
+# 结束条目中保存的提交记录字段
+FINISHED_FIELDS = ("status", "progress", "message", "result", "error_detail")
+
+
+@dataclass
+class JournalEntry:
+    """重放得到的单个提交的状态"""
+    submission_id: str
+    submitted: Dict[str, Any]
+    started: bool = False
+    finished: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def priority(self) -> int:
+        return self.submitted["priority"]
+
+    @property
+    def request(self) -> Dict[str, Any]:
+        return self.submitted["request"]
+
+    def to_record(self) -> SubmissionRecord:
+        """还原为提交记录"""
+        data = {
+            "submission_id": self.submission_id,
+            "request": self.request,
+            "created_at": self.submitted["created_at"],
+        }
+        if self.finished is not None:
+            data.update({key: self.finished.get(key) for key in FINISHED_FIELDS})
+            data["updated_at"] = datetime.fromtimestamp(self.finished["ts"])
+        return SubmissionRecord.from_dict(data)
+
+
+def replay_lines(lines, retention: Optional[float] = None, now: Optional[float] = None) -> Dict[str, JournalEntry]:
+    """
+    重放日志行
+
+    Args:
+        lines: 日志行（bytes或str）
+        retention: 已结束提交的保留时间（秒），结束时间更早的提交被丢弃；None表示全部保留
+        now: 当前时间戳（测试用）
+
+    Returns:
+        Dict[str, JournalEntry]: 提交ID -> 状态（按首次提交顺序）
+    """
+    entries: Dict[str, JournalEntry] = {}
+    skipped = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            op = item["op"]
+            submission_id = item["id"]
+        except (ValueError, KeyError, TypeError):
+            # 崩溃时写了一半的行
+            skipped += 1
+            continue
+        if op == OP_SUBMITTED:
+            entries[submission_id] = JournalEntry(submission_id, item)
+            continue
+        entry = entries.get(submission_id)
+        if entry is None:
+            continue
+        if op == OP_STARTED:
+            entry.started = True
+        elif op == OP_FINISHED:
+            entry.finished = item
+    if skipped:
+        logger.warning(f"批改日志中有{skipped}行无法解析，已跳过")
+
+    if retention is not None:
+        cutoff = (now or time.time()) - retention
+        entries = {
+            submission_id: entry for submission_id, entry in entries.items()
+            if entry.finished is None or entry.finished["ts"] >= cutoff
+        }
+    return entries
+
+
+class GradingJournal:
+    """
+    批改任务日志
+
+    写入方法只把条目放入缓冲区，不阻塞事件循环；文件读写在线程中执行，由锁串行化。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_interval: float = 0.1,
+        compact_every: int = 5000,
+        retention: float = 3600
+    ):
+        """
+        初始化日志
+
+        Args:
+            path: 日志文件路径
+            fsync_interval: 批量写入并fsync的间隔（秒）
+            compact_every: 追加多少条后压缩日志
+            retention: 已结束提交在日志中的保留时间（秒）
+        """
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._buffer: List[bytes] = []
+        self._appended_since_compaction = 0
+        self._flusher: Optional[asyncio.Task] = None
+
+        # 统计计数
+        self.appended = 0
+        self.fsyncs = 0
+        self.compactions = 0
+        self.replayed = 0
+        self.write_errors = 0
+
+    # ===== 生命周期 =====
+
+    async def start(self) -> Dict[str, JournalEntry]:
+        """
+        重放并压缩日志，然后启动后台写入任务
+
+        Returns:
+            Dict[str, JournalEntry]: 重放得到的提交状态
+        """
+        entries = await asyncio.to_thread(self._replay_and_compact)
+        self.replayed = len(entries)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"批改日志已就绪: {self.path}，重放{len(entries)}个提交")
+        return entries
+
+    async def close(self) -> None:
+        """写入缓冲区中的剩余条目并关闭文件"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ===== 写入 =====
+
+    def record_submitted(self, record: SubmissionRecord, priority: int) -> None:
+        """记录提交"""
+        self._append({
+            "op": OP_SUBMITTED,
+            "id": record.submission_id,
+            "priority": priority,
+            "request": record.request,
+            "created_at": record.created_at.isoformat(),
+        })
+
+    def record_started(self, submission_id: str) -> None:
+        """记录开始批改"""
+        self._append({"op": OP_STARTED, "id": submission_id})
+
+    def record_finished(self, record: SubmissionRecord) -> None:
+        """记录批改结束（完成、失败或取消）"""
+        data = record.to_dict()
+        self._append({
+            "op": OP_FINISHED,
+            "id": record.submission_id,
+            **{key: data[key] for key in FINISHED_FIELDS},
+        })
+
+    def _append(self, item: Dict[str, Any]) -> None:
+        item["ts"] = time.time()
+        self._buffer.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.appended += 1
+
+    async def flush(self) -> None:
+        """立即写入缓冲区并fsync；追加条目数达到阈值时压缩日志"""
+        if self._buffer:
+            lines, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"批改日志写入失败（{len(lines)}条）: {e}")
+                # 放回缓冲区，下次重试
+                self._buffer[:0] = lines
+                return
+        if self._appended_since_compaction >= self.compact_every:
+            await asyncio.to_thread(self._replay_and_compact)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            await self.flush()
+
+    def _open_file(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _write(self, lines: List[bytes]) -> None:
+        with self._lock:
+            file = self._open_file()
+            file.write(b"".join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+            self._appended_since_compaction += len(lines)
+            self.fsyncs += 1
+
+    # ===== 重放与压缩 =====
+
+    def _replay_and_compact(self) -> Dict[str, JournalEntry]:
+        """
+        重放日志并重写为压缩后的内容
+
+        压缩后的日志先写入临时文件并fsync，再原子替换原文件；任何时刻崩溃都留下完整的旧日志或新日志。
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            try:
+                with open(self.path, "rb") as file:
+                    entries = replay_lines(file, retention=self.retention)
+            except FileNotFoundError:
+                entries = {}
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "wb") as file:
+                for entry in entries.values():
+                    file.write(json.dumps(entry.submitted, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+                    if entry.finished is not None:
+                        file.write(json.dumps(entry.finished, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+            self._fsync_directory()
+
+            self._appended_since_compaction = 0
+            self.compactions += 1
+        logger.info(f"批改日志压缩完成: 保留{len(entries)}个提交")
+        return entries
+
+    def _fsync_directory(self) -> None:
+        """fsync所在目录，确保替换后的文件名持久化（Windows不支持时跳过）"""
+        try:
+            fd = os.open(self.path.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def stats(self) -> Dict[str, Any]:
+        """日志统计（用于健康检查）"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        return {
+            "path": str(self.path),
+            "size_bytes": size,
+            "buffered": len(self._buffer),
+            "appended": self.appended,
+            "fsyncs": self.fsyncs,
+            "compactions": self.compactions,
+            "replayed": self.replayed,
+            "write_errors": self.write_errors,
+        }
+
+
+# 全局批改日志实例
+_grading_journal: Optional[GradingJournal] = None
+
+
+def get_grading_journal() -> Optional[GradingJournal]:
+    """获取批改日志实例（单例模式），未配置GRADING_JOURNAL_PATH时返回None"""
+    global _grading_journal
+    settings = get_settings()
+    if _grading_journal is None and settings.GRADING_JOURNAL_PATH:
+        _grading_journal = GradingJournal(
+            Path(settings.GRADING_JOURNAL_PATH),
+            fsync_interval=settings.GRADING_JOURNAL_FSYNC_INTERVAL,
+            compact_every=settings.GRADING_JOURNAL_COMPACT_EVERY,
+            retention=settings.GRADING_JOURNAL_RETENTION
+        )
+    return _grading_journal
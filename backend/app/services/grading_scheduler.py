@@ -0,0 +1,318 @@
+"""
+批改任务调度
+
+批改任务不再作为请求的BackgroundTasks直接执行，而是进入调度器的优先级队列，
+由固定数量的worker协程依次取出执行，限制同时进行的大模型调用数量，
+避免提交高峰时批改请求挤占聊天和语音合成。
+
+设计原则：
+- 有界并发：同时执行的批改任务数由GRADING_CONCURRENCY控制
+- 背压：排队任务数达到GRADING_MAX_QUEUE_DEPTH时拒绝新任务，由接口返回503
+- 可观测：每个排队任务的实际位置可查询，队列统计通过stats()暴露
+- 可取消：排队中的任务直接出队；执行中的任务在独立的asyncio任务中运行，
+  取消时中断其中正在进行的大模型请求并立即释放worker
+"""
+
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 任务优先级（数值越小越先执行）
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class QueueFullError(Exception):
+    """批改队列已满"""
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        super().__init__(f"批改队列已满（{depth}个任务排队中）")
+
+
+@dataclass(order=True)
+class GradingJob:
+    """排队中的批改任务，按(优先级, 入队序号)排序"""
+    priority: int
+    sequence: int
+    submission_id: str = field(compare=False)
+    run: Callable[[], Awaitable[Any]] = field(compare=False, repr=False)
+    owner: Optional[str] = field(compare=False, default=None)
+    on_done: Optional[Callable[[], Any]] = field(compare=False, default=None, repr=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.priority, self.sequence
+
+
+class GradingScheduler:
+    """
+    批改任务调度器
+
+    asyncio.PriorityQueue负责分发任务；另外维护一份按排序键有序的排队列表，
+    用于在O(log n)时间内计算任务的排队位置。
+    """
+
+    def __init__(self, concurrency: int = 4, max_queue_depth: int = 200):
+        """
+        初始化调度器
+
+        Args:
+            concurrency: worker数量（同时执行的批改任务数）
+            max_queue_depth: 最大排队任务数，达到后拒绝新任务
+        """
+        self.concurrency = max(1, concurrency)
+        self.max_queue_depth = max_queue_depth
+
+        self._queue: Optional["asyncio.PriorityQueue[GradingJob]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        # 排队中任务的排序键（有序）和提交ID到排序键的映射
+        self._waiting: List[Tuple[int, int]] = []
+        self._waiting_keys: Dict[str, Tuple[int, int]] = {}
+        self._running: Dict[str, float] = {}
+        # 排队中和执行中的任务，用于取消
+        self._jobs: Dict[str, GradingJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 已取消但仍留在PriorityQueue中的任务，worker取出后直接丢弃
+        self._cancelled_keys: Set[Tuple[int, int]] = set()
+        # 任务所属者（例如学生+试卷）到其当前任务的映射
+        self._owners: Dict[str, str] = {}
+
+        # 统计计数
+        self.accepted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.total_wait_seconds = 0.0
+
+    # ===== 生命周期 =====
+
+    async def start(self) -> None:
+        """启动worker协程"""
+        self._ensure_workers()
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker_loop(index))
+                for index in range(self.concurrency)
+            ]
+            logger.info(f"批改调度器已启动: {self.concurrency}个worker，最大排队{self.max_queue_depth}")
+
+    async def close(self) -> None:
+        """停止worker；仍在排队的任务被丢弃（结果数据库在下次启动时将其标记为失败）"""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        if self._waiting:
+            logger.warning(f"服务关闭，丢弃{len(self._waiting)}个排队中的批改任务")
+        self._queue = None
+        self._waiting.clear()
+        self._waiting_keys.clear()
+        self._jobs.clear()
+        self._cancelled_keys.clear()
+        self._owners.clear()
+
+    # ===== 入队与查询 =====
+
+    def submit(
+        self,
+        submission_id: str,
+        run: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_NORMAL,
+        owner: Optional[str] = None,
+        on_done: Optional[Callable[[], Any]] = None
+    ) -> int:
+        """
+        提交批改任务
+
+        Args:
+            submission_id: 提交ID
+            run: 执行批改的协程函数（无参数）
+            priority: 优先级，数值越小越先执行
+            owner: 任务所属者，同一所属者的当前任务可通过owned_by()查到（用于新提交取代旧提交）
+            on_done: 任务离开调度器（完成、失败或取消）时调用的回调
+
+        Returns:
+            int: 入队后的排队位置（从1开始）
+
+        Raises:
+            QueueFullError: 排队任务数已达上限
+        """
+        if len(self._waiting) >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(len(self._waiting))
+
+        self._ensure_workers()
+        job = GradingJob(priority, next(self._sequence), submission_id, run, owner, on_done)
+        bisect.insort(self._waiting, job.key)
+        self._waiting_keys[submission_id] = job.key
+        self._jobs[submission_id] = job
+        if owner is not None:
+            self._owners[owner] = submission_id
+        self._queue.put_nowait(job)
+        self.accepted += 1
+        return self.position(submission_id)
+
+    def position(self, submission_id: str) -> Optional[int]:
+        """任务的排队位置（从1开始）；任务不在队列中（执行中、已结束或不属于本进程）时返回None"""
+        key = self._waiting_keys.get(submission_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._waiting, key) + 1
+
+    def is_running(self, submission_id: str) -> bool:
+        """任务是否正在执行"""
+        return submission_id in self._running
+
+    def owned_by(self, owner: str) -> Optional[str]:
+        """所属者当前排队中或执行中的任务的提交ID"""
+        return self._owners.get(owner)
+
+    def cancel(self, submission_id: str, reason: Optional[str] = None) -> bool:
+        """
+        取消任务
+
+        排队中的任务直接出队；执行中的任务被取消（CancelledError中断正在进行的大模型请求），
+        worker立即转去执行下一个任务。
+
+        Args:
+            submission_id: 提交ID
+            reason: 取消原因（作为CancelledError的消息）
+
+        Returns:
+            bool: 任务是否由本调度器取消；任务已结束或不属于本进程时返回False
+        """
+        task = self._tasks.get(submission_id)
+        if task is not None:
+            return task.cancel(reason)
+
+        key = self._waiting_keys.get(submission_id)
+        if key is None:
+            return False
+        job = self._jobs[submission_id]
+        self._dequeue(job)
+        self._cancelled_keys.add(key)
+        self.cancelled += 1
+        self._finish(job)
+        return True
+
+    @property
+    def depth(self) -> int:
+        """排队中的任务数"""
+        return len(self._waiting)
+
+    @property
+    def available(self) -> int:
+        """还能接受的排队任务数"""
+        return max(0, self.max_queue_depth - len(self._waiting))
+
+    def estimate_wait_seconds(self, position: int, seconds_per_job: float = 60) -> int:
+        """按排队位置估算完成时间（秒）"""
+        rounds = (position + len(self._running) - 1) // self.concurrency + 1
+        return int(rounds * seconds_per_job)
+
+    def stats(self) -> Dict[str, Any]:
+        """调度器统计（用于健康检查）"""
+        started = self.completed + self.failed + len(self._running)
+        return {
+            "concurrency": self.concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": len(self._waiting),
+            "running": len(self._running),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "avg_wait_seconds": round(self.total_wait_seconds / started, 3) if started else 0.0,
+        }
+
+    # ===== 执行 =====
+
+    async def _worker_loop(self, index: int) -> None:
+        """worker协程：依次取出并执行任务"""
+        while True:
+            job = await self._queue.get()
+            if job.key in self._cancelled_keys:
+                # 排队期间已取消
+                self._cancelled_keys.discard(job.key)
+                self._queue.task_done()
+                continue
+            self._dequeue(job)
+            self._running[job.submission_id] = time.monotonic()
+            self.total_wait_seconds += time.monotonic() - job.enqueued_at
+            # 在独立任务中执行，取消任务不会取消worker本身
+            task = asyncio.create_task(job.run())
+            self._tasks[job.submission_id] = task
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                self._tasks.pop(job.submission_id, None)
+                self._running.pop(job.submission_id, None)
+                self._queue.task_done()
+            if task.cancelled():
+                self.cancelled += 1
+                logger.info(f"批改任务已取消: {job.submission_id}")
+            elif task.exception() is not None:
+                self.failed += 1
+                logger.error(f"批改任务执行异常: {job.submission_id}, 错误: {task.exception()}")
+            else:
+                self.completed += 1
+            self._finish(job)
+
+    def _finish(self, job: GradingJob) -> None:
+        """任务离开调度器：释放所属者并调用回调"""
+        self._jobs.pop(job.submission_id, None)
+        if job.owner is not None and self._owners.get(job.owner) == job.submission_id:
+            del self._owners[job.owner]
+        if job.on_done is not None:
+            try:
+                job.on_done()
+            except Exception as e:
+                logger.error(f"批改任务回调异常: {job.submission_id}, 错误: {e}")
+
+    def _dequeue(self, job: GradingJob) -> None:
+        index = bisect.bisect_left(self._waiting, job.key)
+        if index < len(self._waiting) and self._waiting[index] == job.key:
+            del self._waiting[index]
+        if self._waiting_keys.get(job.submission_id) == job.key:
+            del self._waiting_keys[job.submission_id]
+
+
+# 全局调度器实例
+_grading_scheduler: Optional[GradingScheduler] = None
+
+
+def get_grading_scheduler() -> GradingScheduler:
+    """获取批改调度器实例（单例模式）"""
+    global _grading_scheduler
+    if _grading_scheduler is None:
+        settings = get_settings()
+        _grading_scheduler = GradingScheduler(
+            concurrency=settings.GRADING_CONCURRENCY,
+            max_queue_depth=settings.GRADING_MAX_QUEUE_DEPTH
+        )
+    return _grading_scheduler
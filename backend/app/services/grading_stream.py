@@ -0,0 +1,167 @@
+"""
+流式批改输出解析
+
+批改请求使用流式chat completions接口（stream=true），模型输出逐段到达。
+本模块负责两件事：
+- 解析OpenRouter的SSE响应行，取出每个增量的文本内容
+- 在不完整的JSON文本上增量扫描，顶层 "results" 数组中的某个元素一闭合就立即交出，
+  调用方据此推进批改进度并提前展示已完成的小题
+
+扫描只跟踪字符串、转义和括号深度，每个字符只处理一次；
+模型在JSON前后输出的说明文字或```json代码块标记不影响扫描。
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESULTS_KEY = "results"
+SSE_DATA_PREFIX = "data:"
+SSE_DONE = "[DONE]"
+
+
+class StreamError(Exception):
+    """流式响应中返回的错误"""
+
+
+def parse_sse_line(line: str) -> Optional[str]:
+    """
+    解析一行SSE响应，返回其中的增量文本
+
+    Args:
+        line: 响应行（不含换行符）
+
+    Returns:
+        Optional[str]: 增量文本；注释行、空行、结束标记和不含文本的增量返回None
+
+    Raises:
+        StreamError: 响应中包含错误信息
+    """
+    if not line.startswith(SSE_DATA_PREFIX):
+        # 空行和注释行（例如 ": OPENROUTER PROCESSING"）
+        return None
+    data = line[len(SSE_DATA_PREFIX):].strip()
+    if not data or data == SSE_DONE:
+        return None
+    try:
+        chunk = json.loads(data)
+    except ValueError:
+        logger.warning(f"无法解析的流式响应行: {data[:200]}")
+        return None
+    if chunk.get("error"):
+        error = chunk["error"]
+        raise StreamError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+    choices = chunk.get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content") or None
+
+
+class ResultsStreamParser:
+    """
+    增量提取顶层 "results" 数组中已完成的元素
+
+    用法：每收到一段文本调用feed()，返回这段文本中新闭合的元素（已解析为字典）；
+    text属性保存全部文本，流结束后交给完整的响应解析流程。
+    """
+
+    def __init__(self):
+        # 收到的文本段，读取text时才拼接，避免每段都复制全部文本
+        self._chunks: List[str] = []
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # 顶层对象中正在读取的字符串（跨段时保存已读取的部分）和最近一个字符串（紧跟 [ 时即为键名）
+        self._key_parts: Optional[List[str]] = None
+        self._last_key: Optional[str] = None
+        # results数组内部的深度，未进入或已离开数组时为None
+        self._results_depth: Optional[int] = None
+        # 正在读取的results元素（跨段时保存已读取的部分）
+        self._element_parts: Optional[List[str]] = None
+
+        self.emitted = 0
+        self.skipped = 0
+
+    @property
+    def text(self) -> str:
+        """到目前为止收到的全部文本"""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        输入一段文本（只扫描这段新文本）
+
+        Returns:
+            List[Dict[str, Any]]: 这段文本中新闭合的results元素
+        """
+        self._chunks.append(chunk)
+        return list(self._scan(chunk))
+
+    def _scan(self, chunk: str) -> Iterator[Dict[str, Any]]:
+        # 上一段中未结束的键名和元素从本段开头继续
+        key_start = 0 if self._key_parts is not None else None
+        element_start = 0 if self._element_parts is not None else None
+
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if key_start is not None:
+                        self._key_parts.append(chunk[key_start:index])
+                        self._last_key = "".join(self._key_parts)
+                        self._key_parts = None
+                        key_start = None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._key_parts = []
+                    key_start = index + 1
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key == RESULTS_KEY:
+                    self._results_depth = self._depth + 1
+                elif char == "{" and self._results_depth is not None and self._depth == self._results_depth:
+                    self._element_parts = []
+                    element_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth = max(0, self._depth - 1)
+                if self._results_depth is None:
+                    continue
+                if char == "}" and self._depth == self._results_depth and element_start is not None:
+                    self._element_parts.append(chunk[element_start:index + 1])
+                    element = self._decode("".join(self._element_parts))
+                    self._element_parts = None
+                    element_start = None
+                    if element is not None:
+                        yield element
+                elif self._depth < self._results_depth:
+                    self._results_depth = None
+
+        # 跨段的键名和元素：保存本段中已读取的部分
+        if key_start is not None:
+            self._key_parts.append(chunk[key_start:])
+        if element_start is not None:
+            self._element_parts.append(chunk[element_start:])
+
+    def _decode(self, fragment: str) -> Optional[Dict[str, Any]]:
+        try:
+            element = json.loads(fragment)
+        except ValueError:
+            # 单个元素不合法时跳过，完整响应仍由常规解析流程（含修复逻辑）处理
+            self.skipped += 1
+            return None
+        if not isinstance(element, dict):
+            return None
+        self.emitted += 1
+        return element
@@ -0,0 +1,216 @@
+"""
+共享HTTP客户端
+
+聊天和批改原先每次调用都新建httpx.AsyncClient（批改服务的客户端甚至从不关闭），
+每个请求都要重新做DNS解析、TCP和TLS握手，泄漏的客户端还一直占用socket。
+本模块提供整个应用共享的连接池：应用启动时创建，关闭时释放，聊天和批改都通过它访问OpenRouter。
+
+设计原则：
+- 连接复用：keep-alive连接在HTTP_KEEPALIVE_EXPIRY秒内复用，连接数上限可调
+- 可选HTTP/2：HTTP2_ENABLED时在一个连接上多路复用并发请求（需要安装h2，未安装时退回HTTP/1.1）
+- 可观测：通过httpx的trace扩展统计新建/复用连接数、等待空闲连接的时间和连接池饱和次数，
+  统计见stats()（/health 的 http_client）
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from ..core.config import get_settings
+
+try:
+    import h2  # noqa: F401  HTTP/2为可选依赖，仅在HTTP2_ENABLED时需要
+except ImportError:
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+# 等待空闲连接超过该时间（秒）的请求计为排队
+POOL_WAIT_THRESHOLD = 0.01
+
+
+class _RequestTrace:
+    """单个请求的trace回调：记录从发出请求到开始建立连接或发送请求头之间的等待时间"""
+
+    def __init__(self, pool: "HttpClientPool"):
+        self.pool = pool
+        self.started_at = time.monotonic()
+        self.acquired = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.pool.connections_opened += 1
+        if self.acquired:
+            return
+        if event_name == "connection.connect_tcp.started" or event_name.endswith(".send_request_headers.started"):
+            self.acquired = True
+            self.pool._record_wait(time.monotonic() - self.started_at)
+
+
+class HttpClientPool:
+    """
+    共享HTTP连接池
+
+    post()和stream()与httpx.AsyncClient的同名方法用法相同，额外记录连接池统计。
+    start()之前调用时按需创建客户端（脚本和测试中直接使用服务类的情况）。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30,
+        connect_timeout: float = 10,
+        http2: bool = False
+    ):
+        """
+        初始化连接池
+
+        Args:
+            max_connections: 最大连接数（HTTP/2下为最大连接数，每个连接可多路复用）
+            max_keepalive_connections: 最多保留的空闲keep-alive连接数
+            keepalive_expiry: 空闲连接的保留时间（秒）
+            connect_timeout: 建立连接的超时时间（秒）
+            http2: 是否启用HTTP/2（需要安装h2）
+        """
+        if http2 and h2 is None:
+            logger.warning("HTTP2_ENABLED已开启但未安装h2（pip install -r requirements-http2.txt），使用HTTP/1.1")
+            http2 = False
+
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.http2 = http2
+
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # 统计计数
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+        self.connections_opened = 0
+        self.pool_waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.errors = 0
+
+    # ===== 生命周期 =====
+
+    async def start(self) -> None:
+        """创建客户端（应用启动时调用）"""
+        self._ensure_client()
+        logger.info(
+            f"HTTP连接池已就绪: 最大连接{self.max_connections}，keep-alive {self.max_keepalive_connections}个/"
+            f"{self.keepalive_expiry:g}秒，{'HTTP/2' if self.http2 else 'HTTP/1.1'}"
+        )
+
+    async def close(self) -> None:
+        """关闭客户端并释放全部连接（应用关闭时调用）"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """底层httpx客户端（按需创建）"""
+        return self._ensure_client()
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(60, connect=self.connect_timeout),
+                http2=self.http2
+            )
+        return self._client
+
+    # ===== 请求 =====
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """发送POST请求（参数同httpx.AsyncClient.post）"""
+        trace = self._begin()
+        try:
+            return await self.client.post(url, extensions={"trace": trace}, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self._end()
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """发送流式请求（参数同httpx.AsyncClient.stream），连接在退出上下文时归还连接池"""
+        trace = self._begin()
+        try:
+            async with self.client.stream(method, url, extensions={"trace": trace}, **kwargs) as response:
+                yield response
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self._end()
+
+    def _begin(self) -> _RequestTrace:
+        self.requests += 1
+        if not self.http2 and self.in_flight >= self.max_connections:
+            # HTTP/1.1下所有连接都被占用，新请求要等待空闲连接（HTTP/2在已有连接上多路复用）
+            self.saturated += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return _RequestTrace(self)
+
+    def _end(self) -> None:
+        self.in_flight -= 1
+
+    def _record_wait(self, seconds: float) -> None:
+        self.total_wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        if seconds >= POOL_WAIT_THRESHOLD:
+            self.pool_waits += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """连接池统计（用于健康检查）"""
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturated": self.saturated,
+            "connections_opened": self.connections_opened,
+            "connections_reused": max(0, self.requests - self.errors - self.connections_opened),
+            "pool_waits": self.pool_waits,
+            "avg_wait_ms": round(self.total_wait_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "errors": self.errors,
+        }
+
+
+# 全局HTTP连接池实例
+_http_client: Optional[HttpClientPool] = None
+
+
+def get_http_client() -> HttpClientPool:
+    """获取共享HTTP连接池（单例模式）"""
+    global _http_client
+    if _http_client is None:
+        settings = get_settings()
+        _http_client = HttpClientPool(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            http2=settings.HTTP2_ENABLED
+        )
+    return _http_client
@@ -0,0 +1,101 @@
+"""
+文章段落索引
+
+本模块把article.json中的段落列表编译成按段落ID索引的纯文本表，
+记录每个段落在全文纯文本中的字符偏移和估算token数。
+批改、对话和解析功能可以按题目的referenceParagraphs直接取出相关段落，
+不需要重新解析文章HTML，也不必每次都把全文发给模型。
+"""
+
+import html
+import re
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# 段落之间的分隔符（全文纯文本中）
+PARAGRAPH_SEPARATOR = "\n\n"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+# 粗略的token估算：单词、数字和标点各算一个
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def to_plain_text(content: str) -> str:
+    """去除HTML标签和实体，折叠空白"""
+    text = html.unescape(_TAG_RE.sub("", content))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的token数"""
+    return len(_TOKEN_RE.findall(text))
+
+
+class ParagraphSpan(NamedTuple):
+    """段落索引项，start/end为在全文纯文本中的字符偏移"""
+    id: str
+    type: str
+    text: str
+    start: int
+    end: int
+    token_count: int
+
+
+class PassageIndex:
+    """
+    段落索引
+
+    构建后不可变，按段落ID查找为O(1)。
+    """
+
+    __slots__ = ("spans", "full_text", "total_tokens", "_by_id")
+
+    def __init__(self, spans: Sequence[ParagraphSpan], full_text: str):
+        self.spans: Tuple[ParagraphSpan, ...] = tuple(spans)
+        self.full_text = full_text
+        self.total_tokens = sum(span.token_count for span in self.spans)
+        self._by_id: Dict[str, int] = {span.id: position for position, span in enumerate(self.spans)}
+
+    @classmethod
+    def build(cls, paragraphs: Iterable[Mapping[str, Any]]) -> "PassageIndex":
+        """根据article.json的段落列表构建索引"""
+        spans: List[ParagraphSpan] = []
+        parts: List[str] = []
+        offset = 0
+        for para in paragraphs:
+            if parts:
+                offset += len(PARAGRAPH_SEPARATOR)
+            text = to_plain_text(para["content"])
+            spans.append(ParagraphSpan(
+                id=para["id"],
+                type=para.get("type", "paragraph"),
+                text=text,
+                start=offset,
+                end=offset + len(text),
+                token_count=estimate_tokens(text)
+            ))
+            parts.append(text)
+            offset += len(text)
+        return cls(spans, PARAGRAPH_SEPARATOR.join(parts))
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __contains__(self, paragraph_id: object) -> bool:
+        return paragraph_id in self._by_id
+
+    def get(self, paragraph_id: str) -> Optional[ParagraphSpan]:
+        """按ID查找段落"""
+        position = self._by_id.get(paragraph_id)
+        return self.spans[position] if position is not None else None
+
+    def select(self, paragraph_ids: Iterable[str]) -> List[ParagraphSpan]:
+        """取出指定段落（去重，按原文顺序排列），忽略不存在的ID"""
+        positions = {self._by_id[pid] for pid in paragraph_ids if pid in self._by_id}
+        return [self.spans[position] for position in sorted(positions)]
+
+    def excerpt(self, paragraph_ids: Iterable[str]) -> str:
+        """拼接指定段落的纯文本，每段前标注段落ID"""
+        return PARAGRAPH_SEPARATOR.join(
+            f"[{span.id}] {span.text}" for span in self.select(paragraph_ids)
+        )
@@ -0,0 +1,241 @@
+"""
+批改进度发布/订阅
+
+批改任务每推进一个阶段就向进度总线发布一次事件，SSE连接订阅对应提交的事件，
+长轮询请求（/results/{submission_id}?wait=N）在asyncio.Condition上等待进度变化，
+客户端不必每秒轮询 /results/{submission_id}。
+
+设计原则：
+- 进程内：每个订阅者一个有界队列，发布只是把事件放入队列，不涉及网络和数据库
+- 序列化一次：事件的JSON在发布时生成一次，所有订阅者共享同一个字符串
+- 只保留最新进度：订阅者队列满时丢弃最旧的进度事件，结束事件总是最后一个，不会丢失
+- 无监听者不保留状态：迟到的订阅者从提交记录存储读取当前状态
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from ..models.dse_models import AITeacherResponse, GradingStatusResponse
+from .submission_store import FINISHED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# 每个订阅者最多缓存的事件数
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+class ProgressEvent(NamedTuple):
+    """一次进度事件"""
+    status: str
+    progress: int
+    data: str  # GradingStatusResponse的JSON
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+def build_event(
+    submission_id: str,
+    status: str,
+    progress: int,
+    message: str,
+    result: Optional[AITeacherResponse] = None,
+    error_detail: Optional[str] = None,
+    partial_results: Optional[List[Dict[str, Any]]] = None
+) -> ProgressEvent:
+    """构建进度事件（与 /results 一样按别名序列化，结构相同）"""
+    data = GradingStatusResponse(
+        submission_id=submission_id,
+        status=status,
+        progress=progress,
+        message=message,
+        result=result,
+        error_detail=error_detail,
+        partial_results=partial_results
+    ).model_dump_json(by_alias=True)
+    return ProgressEvent(status, progress, data)
+
+
+class _Topic:
+    """一个提交的监听者：SSE订阅者和长轮询等待者"""
+
+    def __init__(self):
+        self.subscribers: Set["Subscription"] = set()
+        self.condition = asyncio.Condition()
+        self.watchers = 0
+        # 有等待者期间最近一次发布的事件
+        self.latest: Optional[ProgressEvent] = None
+
+    @property
+    def idle(self) -> bool:
+        return not self.subscribers and self.watchers == 0
+
+
+class Subscription:
+    """单个SSE订阅者，通过async with使用，退出时自动取消订阅"""
+
+    def __init__(self, bus: "ProgressBus", submission_id: str):
+        self.bus = bus
+        self.submission_id = submission_id
+        self.queue: "asyncio.Queue[ProgressEvent]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def __aenter__(self) -> "Subscription":
+        self.bus._topic(self.submission_id).subscribers.add(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        topic = self.bus._topics.get(self.submission_id)
+        if topic is not None:
+            topic.subscribers.discard(self)
+            self.bus._release(self.submission_id)
+
+    def deliver(self, event: ProgressEvent) -> None:
+        if self.queue.full():
+            # 只关心最新进度，丢弃最旧的事件
+            self.queue.get_nowait()
+            self.bus.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ProgressEvent]:
+        """等待下一个事件，超时返回None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Watch:
+    """
+    单个长轮询等待者，通过async with使用
+
+    进入时即登记为监听者，之后发布的事件都会被记录，
+    因此先登记、再读取当前状态、最后等待，不会遗漏两者之间发布的事件。
+    """
+
+    def __init__(self, bus: "ProgressBus", submission_id: str):
+        self.bus = bus
+        self.submission_id = submission_id
+        self.topic: Optional[_Topic] = None
+
+    async def __aenter__(self) -> "Watch":
+        self.topic = self.bus._topic(self.submission_id)
+        self.topic.watchers += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.topic.watchers -= 1
+        self.bus._release(self.submission_id)
+
+    async def wait(self, since_progress: int, timeout: float) -> Optional[ProgressEvent]:
+        """
+        等待进度不同于since_progress或批改结束
+
+        Args:
+            since_progress: 客户端已知的进度
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            Optional[ProgressEvent]: 触发唤醒的事件，超时返回None
+        """
+        topic = self.topic
+
+        def changed() -> bool:
+            event = topic.latest
+            return event is not None and (event.progress != since_progress or event.is_finished)
+
+        deadline = time.monotonic() + timeout
+        async with topic.condition:
+            while not changed():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(topic.condition.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return topic.latest if changed() else None
+            return topic.latest
+
+
+class ProgressBus:
+    """进程内批改进度总线"""
+
+    def __init__(self):
+        self._topics: Dict[str, _Topic] = {}
+
+        # 统计计数
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.wakeups = 0
+
+    def subscribe(self, submission_id: str) -> Subscription:
+        """订阅一个提交的进度事件（SSE）"""
+        return Subscription(self, submission_id)
+
+    def watch(self, submission_id: str) -> Watch:
+        """等待一个提交的进度变化（长轮询）"""
+        return Watch(self, submission_id)
+
+    def _topic(self, submission_id: str) -> _Topic:
+        topic = self._topics.get(submission_id)
+        if topic is None:
+            topic = self._topics[submission_id] = _Topic()
+        return topic
+
+    def _release(self, submission_id: str) -> None:
+        topic = self._topics.get(submission_id)
+        if topic is not None and topic.idle:
+            del self._topics[submission_id]
+
+    def has_listeners(self, submission_id: str) -> bool:
+        return submission_id in self._topics
+
+    async def publish(self, submission_id: str, event: ProgressEvent) -> int:
+        """
+        发布进度事件
+
+        Returns:
+            int: 收到事件的监听者数
+        """
+        self.published += 1
+        topic = self._topics.get(submission_id)
+        if topic is None:
+            return 0
+        for subscription in topic.subscribers:
+            subscription.deliver(event)
+        self.delivered += len(topic.subscribers)
+
+        watchers = topic.watchers
+        if watchers:
+            async with topic.condition:
+                topic.latest = event
+                topic.condition.notify_all()
+            self.wakeups += watchers
+        return len(topic.subscribers) + watchers
+
+    def stats(self) -> Dict[str, Any]:
+        """总线统计（用于健康检查）"""
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(topic.subscribers) for topic in self._topics.values()),
+            "watchers": sum(topic.watchers for topic in self._topics.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "wakeups": self.wakeups,
+        }
+
+
+# 全局进度总线实例
+_progress_bus: Optional[ProgressBus] = None
+
+
+def get_progress_bus() -> ProgressBus:
+    """获取进度总线实例（单例模式）"""
+    global _progress_bus
+    if _progress_bus is None:
+        _progress_bus = ProgressBus()
+    return _progress_bus
@@ -0,0 +1,877 @@
+"""
+题库服务
+
+本模块负责把data目录下的题目数据编译成内存中的题库，
+供题目接口和批改任务直接引用，避免每次请求重复读取文件和校验模型。
+
+数据布局：
+- data/article.json、questions.json、answers.json：Demo试卷
+- data/papers/<试卷目录>/ 下的同名三个文件：其他DSE试卷
+
+设计原则：
+- 一次编译：启动时读取全部试卷目录，建立目录和二级索引
+- 按需构建：试卷的Pydantic模型和文章HTML在首次访问时才构建
+- 热重载：后台监视数据文件，新题库校验通过后原子替换
+- 引用共享：路由只获取快照引用，不再重复构建Pydantic模型
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .bank_pack import PackFile, PackWriter, pack_signature
+from .bank_validator import BankValidationError, validate_paper
+from .passage_index import PassageIndex
+from ..core.config import get_settings
+from ..models.dse_models import (
+    DSEPassage,
+    DSEQuestion,
+    QuestionType,
+    SkillType
+)
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录下的data目录（backend的父目录）
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
+
+# 多试卷目录（相对于data目录）
+PAPERS_DIR_NAME = "papers"
+
+# Demo试卷的固定标识
+DEMO_PAPER_ID = "dse-2023-flash-fiction"
+
+# 打包文件的默认文件名（位于data目录）
+DEFAULT_PACK_NAME = "bank.pack"
+
+# 组成一份试卷的数据文件
+ARTICLE_FILE = "article.json"
+QUESTIONS_FILE = "questions.json"
+ANSWERS_FILE = "answers.json"
+BANK_FILES = (ARTICLE_FILE, QUESTIONS_FILE, ANSWERS_FILE)
+
+
+class QuestionRef(NamedTuple):
+    """题目索引项，携带全部分面字段以便在候选集上直接过滤"""
+    paper_id: str
+    question_id: str
+    year: int
+    paper: str
+    skill_type: SkillType
+    question_type: QuestionType
+    difficulty: str
+
+
+@dataclass(frozen=True)
+class PaperSnapshot:
+    """
+    试卷快照
+
+    一份试卷编译得到的不可变数据，路由和批改任务共享同一个引用。
+    version为该试卷数据文件内容的校验和，数据不变则版本不变。
+    paragraph_index为段落纯文本索引，用于按referenceParagraphs取出相关段落。
+    """
+    version: str
+    passage: DSEPassage
+    paragraphs: Tuple[Mapping[str, Any], ...]
+    paragraph_index: PassageIndex
+    questions: Tuple[DSEQuestion, ...]
+    answers: Mapping[str, Any]
+    total_marks: int
+    built_at: datetime
+
+    def get_question(self, question_id: str) -> Optional[DSEQuestion]:
+        """按ID查找题目"""
+        for question in self.questions:
+            if question.id == question_id:
+                return question
+        return None
+
+
+def build_passage_html(paragraphs: List[Dict[str, Any]]) -> str:
+    """把article.json中的段落列表拼接成文章HTML"""
+    parts = ["<div class='passage-content'>"]
+    for para in paragraphs:
+        if para["type"] == "paragraph":
+            parts.append(f'<p id="{para["id"]}">{para["content"]}</p>')
+        elif para["type"] == "heading":
+            level = para["level"]
+            parts.append(f'<h{level} id="{para["id"]}">{para["content"]}</h{level}>')
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def build_question_explanation(answer_info: Dict[str, Any]) -> str:
+    """
+    从答案数据中提取题目解析
+
+    answers.json中的解析有两种格式：直接的explanation字段，
+    或者按子题目分开存放（填空题），后者用" | "拼接。
+    """
+    if not answer_info:
+        return ""
+    if "explanation" in answer_info:
+        return answer_info["explanation"]
+
+    explanations = [
+        value["explanation"]
+        for value in answer_info.values()
+        if isinstance(value, dict) and "explanation" in value
+    ]
+    return " | ".join(explanations)
+
+
+def build_question(q_data: Dict[str, Any], answers_data: Mapping[str, Any]) -> DSEQuestion:
+    """根据题目数据和答案数据构建题目模型"""
+    return DSEQuestion(
+        id=q_data["id"],
+        questionNumber=q_data["questionNumber"],
+        questionText=q_data["questionText"],
+        type=QuestionType(q_data["type"]),
+        options=q_data.get("options"),
+        correctAnswer=q_data.get("correctAnswer"),
+        subQuestions=q_data.get("subQuestions"),
+        timelineEvents=q_data.get("timelineEvents"),
+        availableOptions=q_data.get("availableOptions"),
+        correctAnswers=q_data.get("correctAnswers"),
+        totalMarks=q_data["totalMarks"],
+        explanation=build_question_explanation(answers_data.get(q_data["id"], {})),
+        skillType=SkillType(q_data["skillType"]),
+        referenceParagraphs=q_data.get("referenceParagraphs", [])
+    )
+
+
+def _checksum(raw_files: Dict[str, bytes]) -> str:
+    """计算一组数据文件的内容校验和"""
+    checksum = hashlib.sha256()
+    for name in sorted(raw_files):
+        checksum.update(name.encode("utf-8"))
+        checksum.update(raw_files[name])
+    return checksum.hexdigest()[:16]
+
+
+class PaperEntry(ABC):
+    """
+    试卷目录项基类
+
+    保存一份试卷的分面元数据。完整的PaperSnapshot在首次访问时才构建，
+    之后缓存复用；子类负责从具体数据源构建快照。
+    """
+
+    def __init__(
+        self,
+        paper_id: str,
+        version: str,
+        title: str,
+        year: int,
+        paper: str,
+        difficulty: str,
+        total_marks: int,
+        question_facets: Iterable[Tuple[str, str, str]]
+    ):
+        """
+        初始化分面元数据
+
+        Args:
+            question_facets: (题目ID, 题目类型, 技能类型) 序列
+        """
+        self.paper_id = paper_id
+        self.version = version
+        self.title = title
+        self.year = year
+        self.paper = paper
+        self.difficulty = difficulty
+        self.total_marks = total_marks
+
+        self.refs: Tuple[QuestionRef, ...] = tuple(
+            QuestionRef(
+                paper_id=paper_id,
+                question_id=question_id,
+                year=year,
+                paper=paper,
+                skill_type=SkillType(skill_type),
+                question_type=QuestionType(question_type),
+                difficulty=difficulty
+            )
+            for question_id, question_type, skill_type in question_facets
+        )
+
+        self._snapshot: Optional[PaperSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        """数据来源描述（用于日志）"""
+        return self.paper_id
+
+    @property
+    def question_count(self) -> int:
+        """题目数量"""
+        return len(self.refs)
+
+    @property
+    def is_built(self) -> bool:
+        """试卷快照是否已构建"""
+        return self._snapshot is not None
+
+    def snapshot(self) -> PaperSnapshot:
+        """获取试卷快照，首次访问时构建"""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build_snapshot()
+                    logger.info(f"试卷快照构建完成: {self.paper_id}，包含{len(self._snapshot.questions)}道题目")
+        return self._snapshot
+
+    def get_question(self, question_id: str) -> Optional[DSEQuestion]:
+        """获取单道题目"""
+        return self.snapshot().get_question(question_id)
+
+    @abstractmethod
+    def _build_snapshot(self) -> PaperSnapshot:
+        """构建文章和全部题目模型"""
+
+
+class JsonPaperEntry(PaperEntry):
+    """
+    JSON试卷目录项
+
+    保存从试卷目录读取并解析的原始数据。
+    """
+
+    def __init__(
+        self,
+        paper_id: str,
+        source_dir: Path,
+        signature: Tuple[Tuple[int, int], ...],
+        raw_files: Dict[str, bytes]
+    ):
+        """
+        解析试卷数据并提取分面元数据
+
+        Raises:
+            json.JSONDecodeError: 数据文件不是合法JSON
+            KeyError / ValueError: 数据字段缺失或不合法
+        """
+        self.source_dir = source_dir
+        self.signature = signature
+
+        self._article = json.loads(raw_files[ARTICLE_FILE])
+        self._questions = json.loads(raw_files[QUESTIONS_FILE])
+        self._answers = json.loads(raw_files[ANSWERS_FILE])
+
+        super().__init__(
+            paper_id=self._article.get("id") or paper_id,
+            version=_checksum(raw_files),
+            title=self._article["title"],
+            year=int(self._article.get("year") or self._article["publicationDate"]),
+            paper=self._article["reference"],
+            difficulty=self._article["difficulty"],
+            total_marks=sum(q["totalMarks"] for q in self._questions),
+            question_facets=[(q["id"], q["type"], q["skillType"]) for q in self._questions]
+        )
+
+    @property
+    def source(self) -> str:
+        return str(self.source_dir)
+
+    @property
+    def article(self) -> Mapping[str, Any]:
+        """原始文章数据"""
+        return self._article
+
+    def _build_snapshot(self) -> PaperSnapshot:
+        """
+        交叉校验数据文件后构建文章HTML和全部题目模型
+
+        Raises:
+            BankValidationError: 题目与答案键不一致
+        """
+        issues = validate_paper(self._article, self._questions, self._answers)
+        if issues:
+            raise BankValidationError(self.paper_id, issues)
+
+        passage = DSEPassage(
+            id=self.paper_id,
+            title=self.title,
+            content=build_passage_html(self._article["paragraphs"]),
+            wordCount=self._article["wordCount"],
+            difficulty=self.difficulty,
+            year=self.year,
+            paper=self.paper
+        )
+        questions = tuple(build_question(q_data, self._answers) for q_data in self._questions)
+
+        return PaperSnapshot(
+            version=self.version,
+            passage=passage,
+            paragraphs=tuple(MappingProxyType(para) for para in self._article["paragraphs"]),
+            paragraph_index=PassageIndex.build(self._article["paragraphs"]),
+            questions=questions,
+            answers=MappingProxyType(self._answers),
+            total_marks=self.total_marks,
+            built_at=datetime.now()
+        )
+
+
+class PackedPaperEntry(PaperEntry):
+    """
+    打包文件试卷目录项
+
+    元数据来自打包文件索引；文章和题目记录在访问时才从mmap中解码。
+    单独访问某道题目时只解码该题目的记录。
+    """
+
+    def __init__(self, pack: PackFile, paper_index: Dict[str, Any]):
+        """根据打包文件索引项初始化"""
+        self._pack = pack
+        self._index = paper_index
+        self._question_locations = {q["id"]: q["loc"] for q in paper_index["questions"]}
+        self._question_cache: Dict[str, DSEQuestion] = {}
+
+        super().__init__(
+            paper_id=paper_index["paper_id"],
+            version=paper_index["version"],
+            title=paper_index["title"],
+            year=paper_index["year"],
+            paper=paper_index["paper"],
+            difficulty=paper_index["difficulty"],
+            total_marks=paper_index["total_marks"],
+            question_facets=[(q["id"], q["type"], q["skill_type"]) for q in paper_index["questions"]]
+        )
+
+    @property
+    def source(self) -> str:
+        return f"{self._pack.path}#{self.paper_id}"
+
+    def get_question(self, question_id: str) -> Optional[DSEQuestion]:
+        """只解码单道题目的记录"""
+        if self._snapshot is not None:
+            return self._snapshot.get_question(question_id)
+        question = self._question_cache.get(question_id)
+        if question is None:
+            location = self._question_locations.get(question_id)
+            if location is None:
+                return None
+            question = DSEQuestion.model_validate(self._pack.read(location))
+            self._question_cache[question_id] = question
+        return question
+
+    def _build_snapshot(self) -> PaperSnapshot:
+        """解码文章、题目和答案记录"""
+        passage_record = self._pack.read(self._index["passage"])
+        questions = tuple(
+            self.get_question(q["id"]) for q in self._index["questions"]
+        )
+        answers = self._pack.read(self._index["answers"])
+
+        return PaperSnapshot(
+            version=self.version,
+            passage=DSEPassage.model_validate(passage_record["passage"]),
+            paragraphs=tuple(MappingProxyType(para) for para in passage_record["paragraphs"]),
+            paragraph_index=PassageIndex.build(passage_record["paragraphs"]),
+            questions=questions,
+            answers=MappingProxyType(answers),
+            total_marks=self.total_marks,
+            built_at=datetime.now()
+        )
+
+
+class QuestionBank:
+    """
+    题库
+
+    由全部试卷目录项组成的不可变集合，并维护按年份、试卷编号、
+    技能类型、题目类型和难度划分的二级索引。
+    组合查询只遍历最短的候选列表，代价与结果规模同阶，而不是全量扫描。
+    """
+
+    def __init__(self, entries: Iterable[PaperEntry]):
+        """建立目录和二级索引"""
+        self._entries: Dict[str, PaperEntry] = {}
+        self._by_year: Dict[int, List[QuestionRef]] = {}
+        self._by_paper: Dict[str, List[QuestionRef]] = {}
+        self._by_skill: Dict[SkillType, List[QuestionRef]] = {}
+        self._by_type: Dict[QuestionType, List[QuestionRef]] = {}
+        self._by_difficulty: Dict[str, List[QuestionRef]] = {}
+        self._all_refs: List[QuestionRef] = []
+
+        for entry in sorted(entries, key=lambda e: (-e.year, e.paper_id)):
+            if entry.paper_id in self._entries:
+                logger.warning(f"试卷ID重复，忽略: {entry.paper_id} ({entry.source})")
+                continue
+            self._entries[entry.paper_id] = entry
+            for ref in entry.refs:
+                self._all_refs.append(ref)
+                self._by_year.setdefault(ref.year, []).append(ref)
+                self._by_paper.setdefault(ref.paper, []).append(ref)
+                self._by_skill.setdefault(ref.skill_type, []).append(ref)
+                self._by_type.setdefault(ref.question_type, []).append(ref)
+                self._by_difficulty.setdefault(ref.difficulty, []).append(ref)
+
+        self._years = sorted(self._by_year)
+        self.version = _checksum({
+            paper_id: entry.version.encode("utf-8")
+            for paper_id, entry in self._entries.items()
+        })
+
+    @property
+    def entries(self) -> List[PaperEntry]:
+        """全部试卷目录项（按年份倒序）"""
+        return list(self._entries.values())
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, paper_id: str) -> Optional[PaperEntry]:
+        """获取试卷目录项"""
+        return self._entries.get(paper_id)
+
+    def get_paper(self, paper_id: str) -> Optional[PaperSnapshot]:
+        """获取试卷快照，不存在时返回None"""
+        entry = self._entries.get(paper_id)
+        return entry.snapshot() if entry else None
+
+    def get_questions(self, refs: Iterable[QuestionRef]) -> List[Optional[DSEQuestion]]:
+        """按索引项获取题目，只解码被访问的题目"""
+        questions = []
+        for ref in refs:
+            entry = self._entries.get(ref.paper_id)
+            questions.append(entry.get_question(ref.question_id) if entry else None)
+        return questions
+
+    def query(
+        self,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        paper: Optional[str] = None,
+        skill_type: Optional[SkillType] = None,
+        question_type: Optional[QuestionType] = None,
+        difficulty: Optional[str] = None
+    ) -> List[QuestionRef]:
+        """
+        按分面查询题目
+
+        每个给定的分面对应一个候选列表，选出最短的一个，
+        再用索引项自带的字段过滤其余条件。
+
+        Returns:
+            List[QuestionRef]: 满足全部条件的题目索引项
+        """
+        candidates: List[List[QuestionRef]] = []
+
+        if year_from is not None or year_to is not None:
+            lo = bisect.bisect_left(self._years, year_from) if year_from is not None else 0
+            hi = bisect.bisect_right(self._years, year_to) if year_to is not None else len(self._years)
+            year_refs: List[QuestionRef] = []
+            for year in self._years[lo:hi]:
+                year_refs.extend(self._by_year[year])
+            candidates.append(year_refs)
+        if paper is not None:
+            candidates.append(self._by_paper.get(paper, []))
+        if skill_type is not None:
+            candidates.append(self._by_skill.get(skill_type, []))
+        if question_type is not None:
+            candidates.append(self._by_type.get(question_type, []))
+        if difficulty is not None:
+            candidates.append(self._by_difficulty.get(difficulty, []))
+
+        if not candidates:
+            return list(self._all_refs)
+
+        shortest = min(candidates, key=len)
+        return [
+            ref for ref in shortest
+            if (year_from is None or ref.year >= year_from)
+            and (year_to is None or ref.year <= year_to)
+            and (paper is None or ref.paper == paper)
+            and (skill_type is None or ref.skill_type == skill_type)
+            and (question_type is None or ref.question_type == question_type)
+            and (difficulty is None or ref.difficulty == difficulty)
+        ]
+
+
+def write_bank_pack(bank: QuestionBank, path: Path) -> Path:
+    """
+    把题库编译为打包文件
+
+    每份试卷写入一条文章记录（含段落列表）、一条答案记录，
+    以及每道题目一条记录（解析已合并）；索引中保存分面元数据。
+
+    Args:
+        bank: 要编译的题库
+        path: 输出文件路径
+
+    Returns:
+        Path: 输出文件路径
+    """
+    writer = PackWriter(path)
+    try:
+        papers = []
+        for entry in bank.entries:
+            snapshot = entry.snapshot()
+            passage_location = writer.add_record({
+                "passage": snapshot.passage.model_dump(mode="json"),
+                "paragraphs": [dict(para) for para in snapshot.paragraphs]
+            })
+            questions = [
+                {
+                    "id": question.id,
+                    "type": question.type.value,
+                    "skill_type": question.skillType.value,
+                    "loc": writer.add_record(question.model_dump(mode="json"))
+                }
+                for question in snapshot.questions
+            ]
+            answers_location = writer.add_record(dict(snapshot.answers))
+            papers.append({
+                "paper_id": entry.paper_id,
+                "version": entry.version,
+                "title": entry.title,
+                "year": entry.year,
+                "paper": entry.paper,
+                "difficulty": entry.difficulty,
+                "total_marks": entry.total_marks,
+                "passage": passage_location,
+                "answers": answers_location,
+                "questions": questions
+            })
+    except BaseException:
+        writer.abort()
+        raise
+
+    return writer.finish({
+        "bank_version": bank.version,
+        "built_at": datetime.now().isoformat(),
+        "papers": papers
+    })
+
+
+class QuestionBankService:
+    """
+    题库服务类
+
+    持有当前的题库，数据源有两种：
+    - JSON目录（默认）：有变化的试卷才重新读取；内容校验和未变的试卷
+      沿用原目录项及其已构建的快照
+    - 打包文件（配置QUESTION_BANK_PACK时）：只读mmap，启动只解析索引，
+      打包文件被替换后重新打开
+
+    请求路径只读取当前题库引用。后台监视任务定期比较数据文件签名，
+    在线程中重建并校验新题库，通过校验后一次性替换引用；
+    已经拿到旧快照的批改任务不受影响。
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, pack_path: Optional[Path] = None, strict: bool = False):
+        """
+        初始化题库服务
+
+        Args:
+            data_dir: 题库数据目录
+            pack_path: 打包文件路径，提供时从打包文件加载
+            strict: 严格模式（编译命令使用），加载时立即构建并校验全部试卷，任何错误都会抛出
+        """
+        self.data_dir = Path(data_dir)
+        self.pack_path = Path(pack_path) if pack_path else None
+        self.strict = strict
+        self._bank: Optional[QuestionBank] = None
+        self._signature: Optional[Dict[Path, Any]] = None
+        self._lock = threading.Lock()
+
+        # 热重载状态
+        self._pending_signature: Optional[Dict[Path, Any]] = None
+        self._failed_signature: Optional[Dict[Path, Any]] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[datetime] = None
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def version(self) -> Optional[str]:
+        """当前题库版本，尚未加载时为None"""
+        return self._bank.version if self._bank else None
+
+    def _source_dirs(self) -> List[Tuple[str, Path]]:
+        """列出全部试卷目录：Demo试卷在前，其余按目录名排序"""
+        sources = [(DEMO_PAPER_ID, self.data_dir)]
+        papers_dir = self.data_dir / PAPERS_DIR_NAME
+        if papers_dir.is_dir():
+            for child in sorted(papers_dir.iterdir()):
+                if child.is_dir() and (child / ARTICLE_FILE).exists():
+                    sources.append((child.name, child))
+        return sources
+
+    @staticmethod
+    def _dir_signature(source_dir: Path) -> Tuple[Tuple[int, int], ...]:
+        """获取试卷数据文件的(mtime_ns, size)签名"""
+        signature = []
+        for name in BANK_FILES:
+            stat = (source_dir / name).stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _scan_signature(self) -> Dict[Path, Any]:
+        """扫描数据源的文件签名"""
+        if self.pack_path is not None:
+            return {self.pack_path: pack_signature(self.pack_path)}
+
+        signature = {}
+        for _, source_dir in self._source_dirs():
+            try:
+                signature[source_dir] = self._dir_signature(source_dir)
+            except FileNotFoundError:
+                continue
+        return signature
+
+    def reload(self) -> QuestionBank:
+        """
+        重新扫描数据源，构建并校验新题库，通过后替换当前题库
+
+        Raises:
+            FileNotFoundError: Demo试卷数据文件或打包文件不存在
+            json.JSONDecodeError: Demo试卷数据文件格式错误
+            PackFormatError: 打包文件格式错误
+        """
+        with self._lock:
+            self.last_error = None
+            if self.pack_path is not None:
+                bank, signature = self._load_pack()
+            else:
+                bank, signature = self._load_json()
+
+            if self._bank is None or bank.version != self._bank.version:
+                logger.info(f"题库编译完成: 版本{bank.version}，包含{len(bank)}份试卷")
+                self.loaded_at = datetime.now()
+                if self._bank is not None:
+                    self.reload_count += 1
+            # 引用赋值是原子的：并发请求要么拿到旧题库，要么拿到新题库
+            self._bank = bank
+            self._signature = signature
+            return bank
+
+    def _load_pack(self) -> Tuple[QuestionBank, Dict[Path, Any]]:
+        """
+        从打包文件加载题库，文件未变化时沿用当前题库
+
+        打包文件由编译命令生成并已校验，这里只校验文件头和索引。
+        """
+        signature = {self.pack_path: pack_signature(self.pack_path)}
+        if self._bank is not None and signature == self._signature:
+            return self._bank, signature
+
+        pack = PackFile(self.pack_path)
+        entries = [PackedPaperEntry(pack, paper_index) for paper_index in pack.index["papers"]]
+        logger.info(f"已映射题库打包文件: {self.pack_path}，{len(entries)}份试卷")
+        return QuestionBank(entries), {self.pack_path: pack.signature}
+
+    def _load_json(self) -> Tuple[QuestionBank, Dict[Path, Any]]:
+        """
+        从JSON试卷目录加载题库
+
+        首次加载时试卷按需构建；重新加载时，内容有变化的试卷会立即构建以完成校验，
+        校验失败则保留该试卷的旧版本（新增试卷则跳过），不会让错误数据上线。
+        首次加载时Demo试卷数据有误会抛出异常；其他试卷有误时记录日志并跳过。
+        严格模式下全部试卷立即构建，汇总所有错误后抛出BankValidationError。
+        """
+        previous = {
+            entry.source_dir: entry
+            for entry in (self._bank.entries if self._bank else [])
+            if isinstance(entry, JsonPaperEntry)
+        }
+        is_reload = self._bank is not None
+        signature: Dict[Path, Any] = {}
+        entries: List[PaperEntry] = []
+        strict_issues: List[str] = []
+
+        for default_id, source_dir in self._source_dirs():
+            old_entry = previous.get(source_dir)
+            dir_signature = None
+            try:
+                dir_signature = self._dir_signature(source_dir)
+                if old_entry is not None and old_entry.signature == dir_signature:
+                    entry = old_entry
+                else:
+                    raw_files = {name: (source_dir / name).read_bytes() for name in BANK_FILES}
+                    if old_entry is not None and old_entry.version == _checksum(raw_files):
+                        # 只是mtime变化，内容未变
+                        entry = old_entry
+                        entry.signature = dir_signature
+                    else:
+                        entry = JsonPaperEntry(default_id, source_dir, dir_signature, raw_files)
+                        if is_reload:
+                            entry.snapshot()
+                if self.strict:
+                    entry.snapshot()
+            except Exception as e:
+                if self.strict:
+                    if isinstance(e, BankValidationError):
+                        strict_issues.extend(f"{source_dir}: {issue}" for issue in e.issues)
+                    else:
+                        strict_issues.append(f"{source_dir}: {type(e).__name__}: {e}")
+                    continue
+                if old_entry is not None:
+                    logger.error(f"试卷数据校验失败，保留旧版本: {source_dir} - {e}")
+                    self.last_error = f"{source_dir}: {e}"
+                    # 记录新签名，文件再次变化前不再重试
+                    signature[source_dir] = dir_signature or old_entry.signature
+                    entries.append(old_entry)
+                    continue
+                if source_dir == self.data_dir:
+                    raise
+                logger.error(f"试卷数据加载失败，已跳过: {source_dir} - {e}")
+                continue
+            signature[source_dir] = dir_signature
+            entries.append(entry)
+
+        if strict_issues:
+            raise BankValidationError(str(self.data_dir), strict_issues)
+        return QuestionBank(entries), signature
+
+    async def get_bank(self) -> QuestionBank:
+        """
+        获取当前题库，尚未加载时在线程中加载
+
+        未启动后台监视任务（QUESTION_BANK_WATCH=False）时，每次调用比较数据文件签名（只stat文件），
+        签名变化即重建题库，修改数据文件仍然无需重启服务。
+        """
+        bank = self._bank
+        if bank is None:
+            return await asyncio.to_thread(self.reload)
+        if self._watcher is None:
+            await self._reload_if_stale()
+            bank = self._bank
+        return bank
+
+    async def _reload_if_stale(self) -> None:
+        """数据文件签名变化时重建题库，失败时继续使用当前版本"""
+        try:
+            signature = await asyncio.to_thread(self._scan_signature)
+        except OSError:
+            # 文件暂时不可用时继续使用当前题库
+            return
+        if signature == self._signature or signature == self._failed_signature:
+            return
+
+        previous_version = self.version
+        try:
+            await asyncio.to_thread(self.reload)
+        except Exception as e:
+            self._failed_signature = signature
+            self.last_error = str(e)
+            logger.error(f"题库重新加载失败，继续使用版本{previous_version}: {e}")
+
+    async def get_snapshot(self, paper_id: str = DEMO_PAPER_ID) -> Optional[PaperSnapshot]:
+        """获取指定试卷的快照，首次访问时在线程中构建"""
+        bank = await self.get_bank()
+        entry = bank.get_entry(paper_id)
+        if entry is None:
+            return None
+        if entry.is_built:
+            return entry.snapshot()
+        return await asyncio.to_thread(entry.snapshot)
+
+    async def check_for_changes(self) -> bool:
+        """
+        检查数据源是否变化，变化时重建并替换题库
+
+        签名需要在连续两次检查中保持一致才会重建，避免读到正在写入的文件；
+        重建失败的签名不会重复尝试，直到文件再次变化。
+
+        Returns:
+            bool: 是否替换了题库
+        """
+        signature = await asyncio.to_thread(self._scan_signature)
+        if signature == self._signature:
+            self._pending_signature = None
+            return False
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return False
+        if signature == self._failed_signature:
+            return False
+
+        previous_version = self.version
+        try:
+            bank = await asyncio.to_thread(self.reload)
+        except Exception as e:
+            self._failed_signature = signature
+            self.last_error = str(e)
+            logger.error(f"题库热重载失败，继续使用版本{previous_version}: {e}")
+            return False
+
+        self._pending_signature = None
+        if bank.version != previous_version:
+            logger.info(f"题库热重载完成: {previous_version} -> {bank.version}")
+            return True
+        return False
+
+    async def _watch(self, interval: float) -> None:
+        """后台监视循环"""
+        logger.info(f"题库监视已启动，检查间隔{interval}s")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check_for_changes()
+            except Exception as e:
+                logger.error(f"题库监视检查失败: {e}")
+
+    def start_watcher(self, interval: float) -> None:
+        """启动后台监视任务"""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def stop_watcher(self) -> None:
+        """停止后台监视任务"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        """题库状态（用于健康检查）"""
+        return {
+            "version": self.version,
+            "papers": len(self._bank) if self._bank else 0,
+            "source": str(self.pack_path) if self.pack_path else "json",
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "reload_count": self.reload_count,
+            "last_error": self.last_error,
+        }
+
+
+# 全局题库服务实例
+_question_bank: Optional[QuestionBankService] = None
+
+
+def resolve_pack_path(pack_setting: Optional[str], data_dir: Path = DATA_DIR) -> Optional[Path]:
+    """解析打包文件路径，相对路径基于data目录"""
+    if not pack_setting:
+        return None
+    path = Path(pack_setting)
+    return path if path.is_absolute() else data_dir / path
+
+
+def get_question_bank() -> QuestionBankService:
+    """获取题库服务实例（单例模式）"""
+    global _question_bank
+    if _question_bank is None:
+        settings = get_settings()
+        _question_bank = QuestionBankService(
+            pack_path=resolve_pack_path(settings.QUESTION_BANK_PACK)
+        )
+    return _question_bank
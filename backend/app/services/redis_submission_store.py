@@ -0,0 +1,290 @@
+"""
+Redis提交记录存储
+
+多个uvicorn worker共享同一个Redis，任意worker都能查询到其他worker创建的提交记录。
+
+存储布局：
+- <prefix><submission_id>：每条提交记录一个Hash，字段值为JSON编码
+- <prefix>ids：全部提交ID的有序集合（分值均为0，按字典序即创建时间排序）
+- <prefix>status:<status>：各状态的提交ID有序集合，状态变化时在同一pipeline中移动
+
+提交ID按生成时间有序（见core.ids），列表查询用ZREVRANGEBYLEX按ID范围和游标分页，
+各状态记录数取有序集合的ZCARD，都不扫描记录。
+
+创建在一个事务pipeline中完成；更新是一个Lua脚本（一次往返）：记录存在时才写入字段、刷新过期时间，
+状态变化时移动状态索引，已过期的记录不会被部分字段重新创建。
+记录的过期交给Redis的EXPIRE，进行中的记录每次更新都续期，已结束的记录按完成/失败TTL过期。
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .submission_store import (
+    ALL_STATUSES,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    SubmissionRecord,
+    SubmissionStore,
+    query_bounds
+)
+from ..core.ids import SUBMISSION_PREFIX, id_bounds
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis为可选依赖，仅在使用Redis存储时需要
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY_PREFIX = "dse:submission:"
+
+# 条件更新脚本
+# KEYS: 记录键，各状态索引键（顺序同ALL_STATUSES）
+# ARGV: 提交ID，默认TTL，各状态的编码值，各状态的TTL，之后是字段/值对
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local n = #KEYS - 1
+local previous = redis.call('HGET', KEYS[1], 'status')
+redis.call('HSET', KEYS[1], unpack(ARGV, 3 + 2 * n))
+local current = redis.call('HGET', KEYS[1], 'status')
+local ttl = tonumber(ARGV[2])
+for i = 1, n do
+    if ARGV[2 + i] == current then
+        ttl = tonumber(ARGV[2 + n + i])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+if current ~= previous then
+    for i = 1, n do
+        if ARGV[2 + i] == current then
+            redis.call('ZADD', KEYS[1 + i], 0, ARGV[1])
+        else
+            redis.call('ZREM', KEYS[1 + i], ARGV[1])
+        end
+    end
+end
+return 1
+"""
+
+
+def _encode_fields(values: Dict[str, Any]) -> Dict[str, str]:
+    """把记录字段编码为Hash字段值"""
+    return {key: json.dumps(value, ensure_ascii=False) for key, value in values.items()}
+
+
+def _decode_fields(values: Dict[str, str]) -> Dict[str, Any]:
+    """解码Hash字段值"""
+    return {key: json.loads(value) for key, value in values.items()}
+
+
+class RedisSubmissionStore(SubmissionStore):
+    """
+    Redis提交记录存储
+
+    client可以注入（例如fakeredis.aioredis.FakeRedis），未注入时根据url创建。
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Any = None,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        completed_ttl: float = 3600,
+        failed_ttl: float = 600,
+        active_ttl: float = 86400
+    ):
+        """
+        初始化存储
+
+        Args:
+            url: Redis连接地址（REDIS_URL）
+            client: 已创建的redis.asyncio客户端，提供时忽略url
+            key_prefix: 键前缀
+            completed_ttl: 完成记录的保留时间（秒）
+            failed_ttl: 失败和已取消记录的保留时间（秒）
+            active_ttl: 进行中记录的保留时间（秒），防止异常中断的任务永久占用内存
+
+        Raises:
+            RuntimeError: 未安装redis且未注入客户端
+        """
+        if client is None:
+            if redis_asyncio is None:
+                raise RuntimeError("使用Redis提交记录存储需要安装redis包")
+            if not url:
+                raise RuntimeError("使用Redis提交记录存储需要配置REDIS_URL")
+            client = redis_asyncio.from_url(url, decode_responses=True)
+            self._owns_client = True
+        else:
+            self._owns_client = False
+
+        self.client = client
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}ids"
+        self.ttl = {
+            STATUS_COMPLETED: int(completed_ttl),
+            STATUS_FAILED: int(failed_ttl),
+            STATUS_CANCELLED: int(failed_ttl)
+        }
+        self.active_ttl = int(active_ttl)
+        self._update_script = client.register_script(UPDATE_SCRIPT)
+
+        # 统计计数
+        self.writes = 0
+        self.missed_updates = 0
+
+    def _key(self, submission_id: str) -> str:
+        return f"{self.key_prefix}{submission_id}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self.key_prefix}status:{status}"
+
+    def _retention(self) -> int:
+        """索引中记录的最长保留时间"""
+        return max(self.active_ttl, *self.ttl.values())
+
+    async def close(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def create(self, record: SubmissionRecord) -> None:
+        key = self._key(record.submission_id)
+        now = time.time()
+        # 创建时间早于保留时间的提交ID上界
+        _, stale = id_bounds(end=datetime.fromtimestamp(now - self._retention()), prefix=SUBMISSION_PREFIX)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=_encode_fields(record.to_dict()))
+            pipe.expire(key, self.ttl.get(record.status, self.active_ttl))
+            pipe.zadd(self.index_key, {record.submission_id: 0})
+            for status in ALL_STATUSES:
+                if status != record.status:
+                    pipe.zrem(self._status_key(status), record.submission_id)
+            pipe.zadd(self._status_key(record.status), {record.submission_id: 0})
+            # 顺便清理索引中早已过期的成员
+            for index_key in (self.index_key, *map(self._status_key, ALL_STATUSES)):
+                pipe.zremrangebylex(index_key, "-", f"({stale}")
+            await pipe.execute()
+        self.writes += 1
+
+    async def get(self, submission_id: str) -> Optional[SubmissionRecord]:
+        values = await self.client.hgetall(self._key(submission_id))
+        if not values:
+            return None
+        return SubmissionRecord.from_dict({"submission_id": submission_id, **_decode_fields(values)})
+
+    async def update(self, submission_id: str, **changes: Any) -> bool:
+        key = self._key(submission_id)
+        record_changes = SubmissionRecord(submission_id=submission_id, **changes).to_dict()
+        values = {name: record_changes[name] for name in changes}
+        values["updated_at"] = record_changes["updated_at"]
+
+        fields = [item for pair in _encode_fields(values).items() for item in pair]
+        statuses = [json.dumps(status) for status in ALL_STATUSES]
+        ttls = [self.ttl.get(status, self.active_ttl) for status in ALL_STATUSES]
+        updated = await self._update_script(
+            keys=[key, *map(self._status_key, ALL_STATUSES)],
+            args=[submission_id, self.active_ttl, *statuses, *ttls, *fields]
+        )
+        if updated:
+            self.writes += 1
+            return True
+
+        # 记录已过期：只清理残留的索引成员，不重新创建记录
+        await self._drop(submission_id)
+        self.missed_updates += 1
+        return False
+
+    async def delete(self, submission_id: str) -> bool:
+        return await self._drop(submission_id)
+
+    async def _drop(self, submission_id: str) -> bool:
+        """删除记录及其全部索引成员"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(submission_id))
+            pipe.zrem(self.index_key, submission_id)
+            for status in ALL_STATUSES:
+                pipe.zrem(self._status_key(status), submission_id)
+            results = await pipe.execute()
+        return bool(results[0])
+
+    async def list_recent(self, limit: int = 100) -> List[SubmissionRecord]:
+        records, _ = await self.query(limit=limit)
+        return records
+
+    async def query(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[SubmissionRecord], Optional[str]]:
+        index_key = self.index_key if status is None else self._status_key(status)
+        lower, upper = query_bounds(created_after, created_before, cursor)
+        low = f"[{lower}" if lower is not None else "-"
+
+        records: List[SubmissionRecord] = []
+        exhausted = False
+        # 已过期的记录在索引中留有成员，跳过后继续向下取，直到凑满一页或取完
+        while len(records) < limit and not exhausted:
+            high = f"({upper}" if upper is not None else "+"
+            wanted = limit - len(records)
+            submission_ids = await self.client.zrevrangebylex(index_key, high, low, start=0, num=wanted)
+            exhausted = len(submission_ids) < wanted
+            if not submission_ids:
+                break
+            upper = submission_ids[-1]
+            records.extend(await self._load(submission_ids))
+
+        next_cursor = records[-1].submission_id if records and not exhausted else None
+        return records, next_cursor
+
+    async def _load(self, submission_ids: List[str]) -> List[SubmissionRecord]:
+        """批量读取记录，顺便从索引中清理已过期的成员"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for submission_id in submission_ids:
+                pipe.hgetall(self._key(submission_id))
+            rows = await pipe.execute()
+
+        records = []
+        expired = []
+        for submission_id, values in zip(submission_ids, rows):
+            if values:
+                records.append(SubmissionRecord.from_dict({"submission_id": submission_id, **_decode_fields(values)}))
+            else:
+                expired.append(submission_id)
+        if expired:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for index_key in (self.index_key, *map(self._status_key, ALL_STATUSES)):
+                    pipe.zrem(index_key, *expired)
+                await pipe.execute()
+        return records
+
+    async def count(self) -> int:
+        """索引中的记录数（已过期但尚未清理的成员也会计入）"""
+        return await self.client.zcard(self.index_key)
+
+    async def status_counts(self) -> Dict[str, int]:
+        """各状态索引中的记录数（已过期但尚未清理的成员也会计入）"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for status in ALL_STATUSES:
+                pipe.zcard(self._status_key(status))
+            counts = await pipe.execute()
+        return dict(zip(ALL_STATUSES, counts))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "key_prefix": self.key_prefix,
+            "completed_ttl": self.ttl[STATUS_COMPLETED],
+            "failed_ttl": self.ttl[STATUS_FAILED],
+            "active_ttl": self.active_ttl,
+            "writes": self.writes,
+            "missed_updates": self.missed_updates,
+        }
@@ -0,0 +1,231 @@
+"""
+预序列化响应缓存
+
+本模块缓存只读接口的序列化结果：JSON字节只生成一次，
+gzip和brotli压缩变体也只压缩一次，并为每种表示生成强ETag。
+客户端携带If-None-Match重新验证时直接返回304，不再经过Pydantic。
+
+设计原则：
+- 版本化：缓存键包含数据版本，数据更新后旧条目自然淘汰
+- 内容协商：按Accept-Encoding选择br、gzip或原始JSON
+- 有界：LRU淘汰，条目数有上限
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖，缺失时只提供gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_SIZE = 512
+
+# 缓存条目上限
+DEFAULT_MAX_ENTRIES = 256
+
+
+class PreparedResponse:
+    """
+    预序列化响应
+
+    保存一份响应的JSON字节、压缩变体和各表示对应的强ETag。
+    """
+
+    __slots__ = ("body", "media_type", "encodings", "etags", "_etag_values")
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        """序列化结果压缩并计算ETag（CPU密集，建议在线程中调用）"""
+        self.body = body
+        self.media_type = media_type
+
+        # 编码名 -> 字节内容；identity为原始JSON
+        self.encodings: Dict[str, bytes] = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(body, quality=11)
+            self.encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+        # 同一内容的不同编码是不同表示，各自使用独立的强ETag
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags: Dict[str, str] = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.encodings
+        }
+        self._etag_values: Set[str] = set(self.etags.values())
+
+    def _negotiate(self, accept_encoding: str) -> str:
+        """根据Accept-Encoding选择编码（优先br，其次gzip）"""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            parts = item.strip().split(";")
+            coding = parts[0].strip().lower()
+            if not coding:
+                continue
+            q = 1.0
+            for param in parts[1:]:
+                name, _, value = param.strip().partition("=")
+                if name.strip() == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if q > 0:
+                accepted.add(coding)
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def _not_modified(self, if_none_match: str) -> bool:
+        """判断If-None-Match是否命中（弱比较，允许W/前缀）"""
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in self._etag_values:
+                return True
+        return False
+
+    def to_response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """
+        生成HTTP响应
+
+        Args:
+            request: 当前请求，用于读取If-None-Match和Accept-Encoding
+            cache_control: Cache-Control头，默认要求客户端每次重新验证
+
+        Returns:
+            Response: 304响应或预编码的响应体
+        """
+        encoding = self._negotiate(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._not_modified(if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.encodings[encoding],
+            media_type=self.media_type,
+            headers=headers
+        )
+
+
+class ResponseCache:
+    """
+    预序列化响应的LRU缓存
+
+    同一个键并发未命中时只构建一次。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初始化缓存"""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, PreparedResponse]" = OrderedDict()
+        self._building: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[PreparedResponse]:
+        """读取缓存条目"""
+        with self._lock:
+            prepared = self._entries.get(key)
+            if prepared is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return prepared
+
+    def put(self, key: Hashable, prepared: PreparedResponse) -> None:
+        """写入缓存条目，超出上限时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[key] = prepared
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_build(
+        self,
+        key: Hashable,
+        serialize: Callable[[], bytes]
+    ) -> PreparedResponse:
+        """
+        读取缓存条目，未命中时序列化并压缩
+
+        序列化和压缩都在线程中执行，大试卷的首次请求不会阻塞事件循环。
+
+        Args:
+            key: 缓存键（应包含数据版本）
+            serialize: 生成JSON字节的函数（在线程中调用）
+
+        Returns:
+            PreparedResponse: 预序列化响应
+        """
+        prepared = self.get(key)
+        if prepared is not None:
+            return prepared
+
+        pending = self._building.get(key)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            self.misses += 1
+            prepared = await asyncio.to_thread(lambda: PreparedResponse(serialize()))
+            self.put(key, prepared)
+            future.set_result(prepared)
+            logger.info(f"响应缓存已构建: {key}，原始{len(prepared.body)}字节，"
+                        f"压缩变体: {sorted(e for e in prepared.encodings if e != 'identity')}")
+            return prepared
+        except Exception as e:
+            future.set_exception(e)
+            # 避免无人等待时出现"exception was never retrieved"警告
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._building.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 全局响应缓存实例
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """获取响应缓存实例（单例模式）"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,374 @@
+"""
+批改结果持久化
+
+本模块把提交记录和批改结果写入SQLite（DATABASE_URL），服务重启后学生仍能查询到历史结果。
+提交记录存储（内存/Redis）负责进行中的进度；结果数据库保存提交时和结束时的完整记录，
+在提交记录存储中查不到时作为后备数据源。
+
+设计原则：
+- WAL模式：读写互不阻塞，写入只追加日志
+- 批量写入：写操作先进入队列，后台任务按批在线程中执行，不阻塞事件循环
+- 索引查询：历史记录按状态、试卷和创建时间过滤，按(created_at, submission_id)游标分页，
+  创建时间相同的记录也不会跨页遗漏，不把全部结果载入内存
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+from .question_bank import DEMO_PAPER_ID
+from .submission_store import STATUS_FAILED, STATUS_PROCESSING, SubmissionRecord
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    submission_id TEXT PRIMARY KEY,
+    paper_id TEXT,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    final_score REAL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error_detail TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_created_at_id ON submissions (created_at, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submissions_status_created_at_id ON submissions (status, created_at, submission_id);
+"""
+
+COLUMNS = (
+    "submission_id", "paper_id", "status", "progress", "message", "final_score",
+    "request", "result", "error_detail", "created_at", "updated_at"
+)
+
+UPSERT_SQL = f"""
+INSERT INTO submissions ({", ".join(COLUMNS)})
+VALUES ({", ".join("?" for _ in COLUMNS)})
+ON CONFLICT(submission_id) DO UPDATE SET
+    status = excluded.status,
+    progress = excluded.progress,
+    message = excluded.message,
+    final_score = excluded.final_score,
+    result = excluded.result,
+    error_detail = excluded.error_detail,
+    updated_at = excluded.updated_at
+"""
+
+# 历史查询只返回概要列，不读取结果JSON
+SUMMARY_COLUMNS = "submission_id, paper_id, status, progress, final_score, created_at, updated_at"
+
+
+def parse_sqlite_url(database_url: str) -> Path:
+    """
+    解析SQLite连接地址
+
+    支持 sqlite:///relative/path.db 和 sqlite:////absolute/path.db。
+
+    Raises:
+        ValueError: 不是SQLite地址
+    """
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(f"只支持SQLite数据库地址（sqlite:///...）: {database_url}")
+    return Path(database_url[len(prefix):])
+
+
+def _to_row(record: SubmissionRecord) -> Tuple[Any, ...]:
+    """把提交记录转换为数据库行"""
+    data = record.to_dict()
+    return (
+        record.submission_id,
+        record.request.get("paper_id") or DEMO_PAPER_ID,
+        record.status,
+        record.progress,
+        record.message,
+        record.result.final_score if record.result else None,
+        json.dumps(data["request"], ensure_ascii=False),
+        json.dumps(data["result"], ensure_ascii=False) if data["result"] else None,
+        record.error_detail,
+        data["created_at"],
+        data["updated_at"],
+    )
+
+
+def _from_row(row: Any) -> SubmissionRecord:
+    """把完整的数据库行还原为提交记录"""
+    return SubmissionRecord.from_dict({
+        "submission_id": row["submission_id"],
+        "status": row["status"],
+        "progress": row["progress"],
+        "message": row["message"],
+        "request": json.loads(row["request"]),
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error_detail": row["error_detail"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    })
+
+
+class ResultsDatabase:
+    """
+    SQLite批改结果数据库
+
+    使用单个连接，所有数据库操作在线程中执行并由锁串行化。
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 0.5, batch_size: int = 200):
+        """
+        初始化数据库
+
+        Args:
+            path: 数据库文件路径
+            flush_interval: 批量写入间隔（秒）
+            batch_size: 单批最多写入条数
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 待写入记录：同一提交多次写入时只保留最新的一次
+        self._pending: Dict[str, Tuple[Any, ...]] = {}
+        # 正在写入的批次，写入完成前仍可被查询到
+        self._inflight: Dict[str, Tuple[Any, ...]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # 统计计数
+        self.rows_written = 0
+        self.batches_written = 0
+        self.write_errors = 0
+
+    # ===== 生命周期 =====
+
+    async def start(self, mark_interrupted: bool = True) -> None:
+        """
+        打开数据库、建表，并启动批量写入任务
+
+        Args:
+            mark_interrupted: 是否立即把重启前未完成的任务标记为失败；
+                配置了批改任务日志时为False，由日志重放在重新排队后调用mark_interrupted()
+        """
+        await asyncio.to_thread(self._open)
+        if mark_interrupted:
+            await self.mark_interrupted()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._writer = asyncio.create_task(self._write_loop())
+        logger.info(f"批改结果数据库已就绪: {self.path}")
+
+    async def close(self) -> None:
+        """停止写入任务、写入剩余记录并关闭数据库"""
+        if self._writer is not None:
+            # 不取消写入任务：让它写完正在写入的批次后自行退出，避免批次丢失
+            self._stopping = True
+            self._wakeup.set()
+            await self._writer
+            self._writer = None
+        await self.flush()
+        if self._conn is not None:
+            await asyncio.to_thread(self._close_connection)
+
+    def _close_connection(self) -> None:
+        # 与写入和查询使用同一把锁，不会在执行中途关闭连接
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+
+    def _open(self) -> None:
+        """打开连接并建表"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    async def mark_interrupted(self, resumed: Collection[str] = ()) -> int:
+        """
+        把重启前未完成的任务标记为失败
+
+        Args:
+            resumed: 已由批改任务日志重新排队的提交ID，这些记录保持processing
+
+        Returns:
+            int: 标记为失败的条数
+        """
+        marked = await asyncio.to_thread(self._mark_interrupted, set(resumed))
+        if marked:
+            logger.warning(f"服务重启前有{marked}个批改任务未完成，已标记为失败")
+        return marked
+
+    def _mark_interrupted(self, resumed: Set[str]) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT submission_id FROM submissions WHERE status = ?", (STATUS_PROCESSING,)
+            ).fetchall()
+            now = datetime.now().isoformat()
+            interrupted = [
+                (STATUS_FAILED, "批改失败", "服务重启导致批改中断，请重新提交", now, row["submission_id"])
+                for row in rows
+                if row["submission_id"] not in resumed
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE submissions SET status = ?, progress = 0, message = ?, error_detail = ?, updated_at = ? "
+                    "WHERE submission_id = ?",
+                    interrupted
+                )
+        return len(interrupted)
+
+    # ===== 写入 =====
+
+    def save(self, record: SubmissionRecord) -> None:
+        """把记录加入写入队列（不阻塞，由后台任务批量写入）"""
+        self._pending[record.submission_id] = _to_row(record)
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """立即写入队列中的全部记录"""
+        written = 0
+        while self._pending:
+            batch_ids = list(self._pending)[:self.batch_size]
+            self._inflight = {sid: self._pending.pop(sid) for sid in batch_ids}
+            batch = list(self._inflight.values())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                written += len(batch)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"批改结果写入失败（{len(batch)}条）: {e}")
+                # 写入期间没有更新过的记录放回队列，下次重试
+                for row in batch:
+                    self._pending.setdefault(row[0], row)
+                break
+            finally:
+                self._inflight = {}
+        return written
+
+    def _write_batch(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(UPSERT_SQL, rows)
+        self.rows_written += len(rows)
+        self.batches_written += 1
+
+    async def _write_loop(self) -> None:
+        """后台批量写入循环（close()设置_stopping后退出）"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+    # ===== 查询 =====
+
+    def _query(self, sql: str, params: Tuple[Any, ...]) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def get(self, submission_id: str) -> Optional[SubmissionRecord]:
+        """读取单条完整记录（包括尚未写入数据库的记录）"""
+        pending = self._pending.get(submission_id) or self._inflight.get(submission_id)
+        if pending is not None:
+            return _from_row(dict(zip(COLUMNS, pending)))
+        rows = await asyncio.to_thread(
+            self._query, "SELECT * FROM submissions WHERE submission_id = ?", (submission_id,)
+        )
+        return _from_row(rows[0]) if rows else None
+
+    async def query_history(
+        self,
+        status: Optional[str] = None,
+        paper_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        before: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        查询历史提交概要（按创建时间倒序，创建时间相同时按提交ID倒序）
+
+        Args:
+            status: 按状态过滤
+            paper_id: 按试卷过滤
+            created_from: 创建时间下界（含）
+            created_to: 创建时间上界（不含）
+            before: 游标，上一页最后一条的提交ID
+            limit: 返回条数
+
+        Returns:
+            List[Dict[str, Any]]: 提交概要（不含答案和批改结果）
+        """
+        conditions = []
+        params: List[Any] = []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if paper_id:
+            conditions.append("paper_id = ?")
+            params.append(paper_id)
+        if created_from:
+            conditions.append("created_at >= ?")
+            params.append(created_from.isoformat())
+        if created_to:
+            conditions.append("created_at < ?")
+            params.append(created_to.isoformat())
+        if before:
+            # 游标换算为(created_at, submission_id)，与排序键一致
+            conditions.append(
+                "(created_at, submission_id) < (SELECT created_at, submission_id FROM submissions WHERE submission_id = ?)"
+            )
+            params.append(before)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            f"SELECT {SUMMARY_COLUMNS} FROM submissions {where} "
+            "ORDER BY created_at DESC, submission_id DESC LIMIT ?"
+        )
+        params.append(limit)
+        rows = await asyncio.to_thread(self._query, sql, tuple(params))
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """数据库统计（用于健康检查）"""
+        return {
+            "path": str(self.path),
+            "pending": len(self._pending),
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "write_errors": self.write_errors,
+        }
+
+
+# 全局结果数据库实例
+_results_db: Optional[ResultsDatabase] = None
+
+
+def get_results_db() -> Optional[ResultsDatabase]:
+    """获取结果数据库实例（单例模式），未配置DATABASE_URL时返回None"""
+    global _results_db
+    settings = get_settings()
+    if _results_db is None and settings.DATABASE_URL:
+        _results_db = ResultsDatabase(
+            parse_sqlite_url(settings.DATABASE_URL),
+            flush_interval=settings.RESULTS_DB_FLUSH_INTERVAL,
+            batch_size=settings.RESULTS_DB_BATCH_SIZE
+        )
+    return _results_db
@@ -0,0 +1,516 @@
+"""
+提交记录存储
+
+本模块定义批改提交记录的存储接口，以及默认的进程内实现
+（多worker部署使用redis_submission_store中的Redis实现）。
+路由和后台批改任务只通过SubmissionStore接口读写提交记录，
+不同部署形态可以替换为共享或持久化的实现。
+
+进程内实现的设计原则：
+- 有界：限制条目数和估算内存占用，超出时按LRU淘汰，优先淘汰已结束的记录
+- 过期：已完成和失败的记录在TTL后过期，后台清理任务定期回收
+- 可观测：淘汰和过期计数通过stats()暴露，便于调整容量
+- 二级索引：写入时维护全部记录和各状态的有序提交ID列表，列表查询按ID范围二分定位并按游标分页，
+  各状态记录数直接取索引长度，不扫描全部记录
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import get_settings
+from ..core.ids import SUBMISSION_PREFIX, id_bounds
+from ..models.dse_models import AITeacherResponse
+
+logger = logging.getLogger(__name__)
+
+# 提交状态
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = frozenset({STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED})
+ALL_STATUSES = (STATUS_PROCESSING, STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+# 每条记录的固定开销估算（字节）
+RECORD_OVERHEAD = 512
+
+
+@dataclass
+class SubmissionRecord:
+    """批改提交记录"""
+    submission_id: str
+    status: str = STATUS_PROCESSING
+    progress: int = 0
+    message: str = "AI老师正在批改中..."
+    request: Dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+    result: Optional[AITeacherResponse] = None
+    error_detail: Optional[str] = None
+    # 批改进行中已完成的小题结果（QuestionResult字典），批改结束时清空
+    partial_results: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """批改是否已结束（完成、失败或已取消）"""
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典"""
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        data["updated_at"] = self.updated_at.isoformat()
+        data["result"] = self.result.model_dump(mode="json") if self.result else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SubmissionRecord":
+        """从to_dict()的结果还原"""
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for key in ("created_at", "updated_at"):
+            if isinstance(values.get(key), str):
+                values[key] = datetime.fromisoformat(values[key])
+        if values.get("result") is not None and not isinstance(values["result"], AITeacherResponse):
+            values["result"] = AITeacherResponse.model_validate(values["result"])
+        return cls(**values)
+
+
+class SubmissionStore(ABC):
+    """
+    提交记录存储接口
+
+    所有方法都是协程，实现可以是进程内字典，也可以是Redis或数据库。
+    """
+
+    async def start(self) -> None:
+        """启动后台任务（应用启动时调用）"""
+
+    async def close(self) -> None:
+        """停止后台任务并释放资源（应用关闭时调用）"""
+
+    @abstractmethod
+    async def create(self, record: SubmissionRecord) -> None:
+        """保存新的提交记录"""
+
+    @abstractmethod
+    async def get(self, submission_id: str) -> Optional[SubmissionRecord]:
+        """读取提交记录，不存在或已过期时返回None"""
+
+    @abstractmethod
+    async def update(self, submission_id: str, **changes: Any) -> bool:
+        """
+        更新提交记录的字段
+
+        Returns:
+            bool: 是否更新成功；记录不存在（已被淘汰或过期）时返回False，不会重新创建
+        """
+
+    @abstractmethod
+    async def delete(self, submission_id: str) -> bool:
+        """删除提交记录"""
+
+    @abstractmethod
+    async def list_recent(self, limit: int = 100) -> List[SubmissionRecord]:
+        """按创建时间倒序列出最近的提交记录"""
+
+    @abstractmethod
+    async def query(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[SubmissionRecord], Optional[str]]:
+        """
+        按状态和创建时间查询提交记录（按创建时间倒序，游标分页）
+
+        Args:
+            status: 按状态过滤
+            created_after: 创建时间下界（含）
+            created_before: 创建时间上界（不含）
+            cursor: 游标，上一页返回的next_cursor（上一页最后一条的提交ID）
+            limit: 返回条数
+
+        Returns:
+            Tuple[List[SubmissionRecord], Optional[str]]: (提交记录, 下一页游标)，没有更多数据时游标为None
+        """
+
+    @abstractmethod
+    async def count(self) -> int:
+        """当前记录数"""
+
+    @abstractmethod
+    async def status_counts(self) -> Dict[str, int]:
+        """各状态的记录数（来自写入时维护的索引，不扫描记录）"""
+
+    def stats(self) -> Dict[str, Any]:
+        """存储统计（用于健康检查）"""
+        return {"backend": type(self).__name__}
+
+
+def query_bounds(
+    created_after: Optional[datetime],
+    created_before: Optional[datetime],
+    cursor: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    把时间范围和游标转换为提交ID范围
+
+    提交ID按生成时间有序（见core.ids），创建时间范围可以直接换算为ID范围。
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (lower含, upper不含)，None表示不限
+    """
+    lower = upper = None
+    if created_after is not None or created_before is not None:
+        lower, upper = id_bounds(created_after, created_before, prefix=SUBMISSION_PREFIX)
+        if created_after is None:
+            lower = None
+        if created_before is None:
+            upper = None
+    if cursor is not None and (upper is None or cursor < upper):
+        upper = cursor
+    return lower, upper
+
+
+def _discard_sorted(ids: List[str], submission_id: str) -> None:
+    """从有序ID列表中删除一个ID（二分定位）"""
+    index = bisect.bisect_left(ids, submission_id)
+    if index < len(ids) and ids[index] == submission_id:
+        del ids[index]
+
+
+# 计入内存估算的字段（其余字段计入固定开销）
+SIZED_FIELDS = ("message", "error_detail", "request", "result", "partial_results")
+
+
+def estimate_field_size(name: str, value: Any) -> int:
+    """估算单个字段占用的内存（按序列化后的字节数近似）"""
+    if value is None:
+        return 0
+    if name == "request":
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    if name == "result":
+        return len(value.model_dump_json())
+    if name == "partial_results":
+        return sum(len(json.dumps(item, ensure_ascii=False)) for item in value)
+    return len(value)
+
+
+def estimate_record_size(record: SubmissionRecord) -> int:
+    """估算一条记录占用的内存"""
+    return RECORD_OVERHEAD + sum(estimate_field_size(name, getattr(record, name)) for name in SIZED_FIELDS)
+
+
+class InMemorySubmissionStore(SubmissionStore):
+    """
+    进程内提交记录存储
+
+    进行中和已结束的记录各自按访问顺序保存在一个OrderedDict中；条目数或估算内存超出上限时按LRU淘汰，
+    先淘汰已结束的记录，只有全部是进行中的记录时才淘汰进行中的记录，选择淘汰对象是O(1)。
+    内存估算按字段记录，更新时只重新估算变化的字段；partial_results中已估算过的小题结果不再重复序列化。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        completed_ttl: float = 3600,
+        failed_ttl: float = 600,
+        sweep_interval: float = 60
+    ):
+        """
+        初始化存储
+
+        Args:
+            max_entries: 最大条目数
+            max_memory_bytes: 估算内存上限（字节）
+            completed_ttl: 完成记录的保留时间（秒）
+            failed_ttl: 失败和已取消记录的保留时间（秒）
+            sweep_interval: 后台清理间隔（秒）
+        """
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl = {STATUS_COMPLETED: completed_ttl, STATUS_FAILED: failed_ttl, STATUS_CANCELLED: failed_ttl}
+        self.sweep_interval = sweep_interval
+
+        self._records: Dict[str, SubmissionRecord] = {}
+        # LRU顺序：进行中和已结束的记录分开保存，淘汰时直接取最久未使用的已结束记录
+        self._active_lru: "OrderedDict[str, None]" = OrderedDict()
+        self._finished_lru: "OrderedDict[str, None]" = OrderedDict()
+        # 各记录的字段内存估算，以及partial_results中每个小题结果（按对象）的估算
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._item_sizes: Dict[str, Dict[int, Tuple[Any, int]]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._memory_bytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        # 二级索引：全部记录和各状态记录的提交ID（升序）
+        self._ids: List[str] = []
+        self._ids_by_status: Dict[str, List[str]] = {status: [] for status in ALL_STATUSES}
+
+        # 统计计数
+        self.evicted_by_count = 0
+        self.evicted_by_memory = 0
+        self.evicted_active = 0
+        self.expired = 0
+
+    async def start(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def create(self, record: SubmissionRecord) -> None:
+        self._remove(record.submission_id)
+        self._records[record.submission_id] = record
+        self._touch(record)
+        self._index(record.submission_id, record.status)
+        self._sizes[record.submission_id] = {}
+        self._memory_bytes += RECORD_OVERHEAD
+        self._account(record, SIZED_FIELDS)
+        self._enforce_limits()
+
+    async def get(self, submission_id: str) -> Optional[SubmissionRecord]:
+        record = self._records.get(submission_id)
+        if record is None:
+            return None
+        if self._is_expired(submission_id, time.monotonic()):
+            self._remove(submission_id)
+            self.expired += 1
+            return None
+        self._touch(record)
+        return record
+
+    async def update(self, submission_id: str, **changes: Any) -> bool:
+        record = self._records.get(submission_id)
+        if record is None:
+            return False
+        previous_status = record.status
+        for key, value in changes.items():
+            setattr(record, key, value)
+        if record.status != previous_status:
+            _discard_sorted(self._ids_by_status.get(previous_status, []), submission_id)
+            bisect.insort(self._ids_by_status.setdefault(record.status, []), submission_id)
+        record.updated_at = datetime.now()
+        self._touch(record)
+
+        ttl = self.ttl.get(record.status)
+        if ttl is not None:
+            self._expires_at[submission_id] = time.monotonic() + ttl
+        else:
+            self._expires_at.pop(submission_id, None)
+
+        # 只重新估算变化的字段
+        changed = [name for name in SIZED_FIELDS if name in changes]
+        if changed:
+            self._account(record, changed)
+            self._enforce_limits()
+        return True
+
+    async def delete(self, submission_id: str) -> bool:
+        return self._remove(submission_id)
+
+    async def list_recent(self, limit: int = 100) -> List[SubmissionRecord]:
+        records, _ = await self.query(limit=limit)
+        return records
+
+    async def query(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[SubmissionRecord], Optional[str]]:
+        ids = self._ids if status is None else self._ids_by_status.get(status, [])
+        lower, upper = query_bounds(created_after, created_before, cursor)
+        start = bisect.bisect_left(ids, lower) if lower is not None else 0
+        index = bisect.bisect_left(ids, upper) if upper is not None else len(ids)
+
+        now = time.monotonic()
+        records = []
+        # 从上界向下取，跳过已过期但尚未清理的记录
+        while index > start and len(records) < limit:
+            index -= 1
+            submission_id = ids[index]
+            if not self._is_expired(submission_id, now):
+                records.append(self._records[submission_id])
+        next_cursor = records[-1].submission_id if records and index > start else None
+        return records, next_cursor
+
+    async def count(self) -> int:
+        return len(self._records)
+
+    async def status_counts(self) -> Dict[str, int]:
+        return {status: len(ids) for status, ids in self._ids_by_status.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._records),
+            "max_entries": self.max_entries,
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "evicted_by_count": self.evicted_by_count,
+            "evicted_by_memory": self.evicted_by_memory,
+            "evicted_active": self.evicted_active,
+            "expired": self.expired,
+        }
+
+    def sweep(self) -> int:
+        """清理已过期的记录，返回清理条数"""
+        now = time.monotonic()
+        expired = [sid for sid, expires_at in self._expires_at.items() if expires_at <= now]
+        for sid in expired:
+            self._remove(sid)
+        self.expired += len(expired)
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        """后台清理循环"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"已清理{removed}条过期提交记录，剩余{len(self._records)}条")
+            except Exception as e:
+                logger.error(f"清理过期提交记录失败: {e}")
+
+    def _is_expired(self, submission_id: str, now: float) -> bool:
+        expires_at = self._expires_at.get(submission_id)
+        return expires_at is not None and expires_at <= now
+
+    def _touch(self, record: SubmissionRecord) -> None:
+        """把记录移到所属LRU顺序的末尾（状态变化时换到另一个顺序）"""
+        lru, other = (
+            (self._finished_lru, self._active_lru) if record.is_finished else (self._active_lru, self._finished_lru)
+        )
+        other.pop(record.submission_id, None)
+        lru[record.submission_id] = None
+        lru.move_to_end(record.submission_id)
+
+    def _account(self, record: SubmissionRecord, names: Iterable[str]) -> None:
+        """重新估算指定字段的内存占用"""
+        sizes = self._sizes[record.submission_id]
+        for name in names:
+            value = getattr(record, name)
+            if name == "partial_results":
+                size = self._partial_results_size(record.submission_id, value)
+            else:
+                size = estimate_field_size(name, value)
+            self._memory_bytes += size - sizes.get(name, 0)
+            sizes[name] = size
+
+    def _partial_results_size(self, submission_id: str, items: Optional[List[Dict[str, Any]]]) -> int:
+        """估算partial_results，上一次已估算过的小题结果对象直接复用估算值"""
+        if not items:
+            self._item_sizes.pop(submission_id, None)
+            return 0
+        previous = self._item_sizes.get(submission_id, {})
+        current: Dict[int, Tuple[Any, int]] = {}
+        total = 0
+        for item in items:
+            cached = previous.get(id(item))
+            # 同时保存对象引用，防止对象释放后id被新对象复用
+            if cached is None or cached[0] is not item:
+                cached = (item, len(json.dumps(item, ensure_ascii=False)))
+            current[id(item)] = cached
+            total += cached[1]
+        self._item_sizes[submission_id] = current
+        return total
+
+    def _index(self, submission_id: str, status: str) -> None:
+        # 新提交的ID最大，insort退化为追加
+        bisect.insort(self._ids, submission_id)
+        bisect.insort(self._ids_by_status.setdefault(status, []), submission_id)
+
+    def _unindex(self, submission_id: str, status: str) -> None:
+        _discard_sorted(self._ids, submission_id)
+        _discard_sorted(self._ids_by_status.get(status, []), submission_id)
+
+    def _remove(self, submission_id: str) -> bool:
+        record = self._records.pop(submission_id, None)
+        if record is None:
+            return False
+        self._active_lru.pop(submission_id, None)
+        self._finished_lru.pop(submission_id, None)
+        self._unindex(submission_id, record.status)
+        self._memory_bytes -= RECORD_OVERHEAD + sum(self._sizes.pop(submission_id).values())
+        self._item_sizes.pop(submission_id, None)
+        self._expires_at.pop(submission_id, None)
+        return True
+
+    def _enforce_limits(self) -> None:
+        """超出条目数或内存上限时按LRU淘汰"""
+        while len(self._records) > self.max_entries or (
+            self._memory_bytes > self.max_memory_bytes and len(self._records) > 1
+        ):
+            by_memory = len(self._records) <= self.max_entries
+            victim = next(iter(self._finished_lru), None)
+            if victim is None:
+                victim = next(iter(self._active_lru))
+                self.evicted_active += 1
+                logger.warning(f"提交记录存储已满，淘汰进行中的记录: {victim}")
+            self._remove(victim)
+            if by_memory:
+                self.evicted_by_memory += 1
+            else:
+                self.evicted_by_count += 1
+
+
+# 全局提交记录存储实例
+_submission_store: Optional[SubmissionStore] = None
+
+
+def create_submission_store() -> SubmissionStore:
+    """
+    根据配置创建提交记录存储
+
+    SUBMISSION_STORE_BACKEND为redis时使用REDIS_URL指向的共享存储（多worker部署），
+    默认使用进程内存储。
+    """
+    settings = get_settings()
+    backend = settings.SUBMISSION_STORE_BACKEND.lower()
+    if backend == "redis":
+        from .redis_submission_store import RedisSubmissionStore
+        logger.info("提交记录存储: Redis")
+        return RedisSubmissionStore(
+            url=settings.REDIS_URL,
+            completed_ttl=settings.SUBMISSION_COMPLETED_TTL,
+            failed_ttl=settings.SUBMISSION_FAILED_TTL
+        )
+    if backend != "memory":
+        raise ValueError(f"未知的提交记录存储类型: {settings.SUBMISSION_STORE_BACKEND}")
+    return InMemorySubmissionStore(
+        max_entries=settings.SUBMISSION_STORE_MAX_ENTRIES,
+        max_memory_bytes=settings.SUBMISSION_STORE_MAX_MEMORY_MB * 1024 * 1024,
+        completed_ttl=settings.SUBMISSION_COMPLETED_TTL,
+        failed_ttl=settings.SUBMISSION_FAILED_TTL,
+        sweep_interval=settings.SUBMISSION_SWEEP_INTERVAL
+    )
+
+
+def get_submission_store() -> SubmissionStore:
+    """获取提交记录存储实例（单例模式）"""
+    global _submission_store
+    if _submission_store is None:
+        _submission_store = create_submission_store()
+    return _submission_store
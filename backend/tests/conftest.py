@@ -0,0 +1,40 @@
+"""
+测试公共配置
+
+运行方式（在backend目录下）：
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+
+异步测试使用anyio的pytest插件（随httpx安装），固定在asyncio后端运行。
+"""
+
+import httpx
+import pytest
+
+from app.services import grading_scheduler, progress_bus, submission_store
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def reset_services():
+    """每个测试使用全新的提交记录存储、进度总线和批改调度器"""
+    submission_store._submission_store = None
+    progress_bus._progress_bus = None
+    grading_scheduler._grading_scheduler = None
+    yield
+    submission_store._submission_store = None
+    progress_bus._progress_bus = None
+    grading_scheduler._grading_scheduler = None
+
+
+@pytest.fixture
+async def api_client(reset_services):
+    """直接调用ASGI应用的HTTP客户端（不经过网络，不触发启动事件）"""
+    from app.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await grading_scheduler.get_grading_scheduler().close()
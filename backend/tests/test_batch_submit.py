@@ -0,0 +1,103 @@
+"""批量提交班级答卷"""
+
+import json
+
+import pytest
+
+from app.models.dse_models import AITeacherResponse, QuestionResult
+from app.services.ai_teacher import AITeacherService
+from app.services.submission_store import get_submission_store
+
+pytestmark = pytest.mark.anyio
+
+ANSWERS = [{"question_id": "q11", "type": "multiple-choice", "selected_option": "A"}]
+
+
+def _batch(size: int) -> dict:
+    return {
+        "submissions": [
+            {
+                "studentId": f"s{index:02d}",
+                "answers": ANSWERS,
+                "start_time": "2024-01-01T10:00:00Z",
+                "end_time": "2024-01-01T10:30:00Z",
+            }
+            for index in range(size)
+        ]
+    }
+
+
+@pytest.fixture
+def stub_grading(monkeypatch):
+    """批改直接返回固定结果，不调用模型；记录批改进行中存储里的partial_results"""
+    partials = []
+
+    async def grade_answers(self, passage, questions, user_answers, time_spent, *args, on_progress=None, **kwargs):
+        result = QuestionResult(
+            question_number=1, is_correct=True, user_answer="A", correct_answer="A",
+            explanation="【原文定位】第[1]段", skill_analysis="細節理解"
+        )
+        if on_progress is not None:
+            await on_progress([result], 1)
+            records = await get_submission_store().query(status="processing", limit=1)
+            partials.extend(records[0][0].partial_results or [])
+        return AITeacherResponse(
+            results=[result], final_score=1.0, correct_count=1, total_questions=1, ability_analysis="表現良好",
+            skill_breakdown=[], strengths_detailed=[], weaknesses_detailed=[],
+            strengths=[], weaknesses=[], recommendations=[], time_spent=int(time_spent)
+        )
+
+    monkeypatch.setattr(AITeacherService, "grade_answers", grade_answers)
+    return partials
+
+
+async def test_result_lines_use_same_keys_as_results_endpoint(api_client, stub_grading):
+    lines = []
+    async with api_client.stream("POST", "/api/dse/submit/batch", json=_batch(2)) as response:
+        assert response.status_code == 200
+        async for line in response.aiter_lines():
+            if line:
+                lines.append(json.loads(line))
+
+    results = [line for line in lines if line["type"] == "result"]
+    assert len(results) == 2
+    assert lines[-1]["completed"] == 2
+    for line in results:
+        grading = line["grading"]
+        assert grading["result"]["finalScore"] == 1.0
+        assert grading["result"]["results"][0]["questionNumber"] == 1
+        assert grading == (await api_client.get(f"/api/dse/results/{line['submission_id']}")).json()
+
+
+async def test_partial_results_are_stored_by_alias(api_client, stub_grading):
+    response = await api_client.post("/api/dse/submit/batch", json=_batch(1))
+
+    assert response.status_code == 200
+    assert stub_grading and stub_grading[0]["questionNumber"] == 1
+    assert "question_number" not in stub_grading[0]
+
+
+async def test_batch_is_rejected_whole_when_queue_fills_during_submission(api_client, stub_grading, monkeypatch):
+    import asyncio
+
+    from app.services import grading_scheduler
+    from app.services.grading_scheduler import GradingScheduler
+
+    scheduler = GradingScheduler(concurrency=1, max_queue_depth=2)
+    grading_scheduler._grading_scheduler = scheduler
+    store = get_submission_store()
+    create = store.create
+
+    async def create_while_others_submit(record):
+        # 模拟批量提交创建记录期间，其他请求占满了批改队列
+        while scheduler.available:
+            scheduler.submit(f"other-{scheduler.accepted}", lambda: asyncio.sleep(10))
+        await create(record)
+
+    monkeypatch.setattr(store, "create", create_while_others_submit)
+
+    response = await api_client.post("/api/dse/submit/batch", json=_batch(2))
+
+    assert response.status_code == 503
+    assert await store.count() == 0
+    assert all(job_id.startswith("other-") for job_id in scheduler._jobs)
@@ -0,0 +1,166 @@
+"""批改取消、新提交取代旧提交和执行时限"""
+
+import asyncio
+
+import pytest
+
+from app.models.dse_models import AITeacherResponse
+from app.routes import dse
+from app.services import grading_scheduler
+from app.services.ai_teacher import AITeacherService
+from app.services.grading_scheduler import GradingScheduler
+from app.services.submission_store import get_submission_store
+
+pytestmark = pytest.mark.anyio
+
+
+def _submission(client_id=None):
+    body = {
+        "answers": [{"question_id": "q11", "type": "multiple-choice", "selected_option": "A"}],
+        "start_time": "2024-01-01T10:00:00Z",
+        "end_time": "2024-01-01T10:30:00Z",
+    }
+    if client_id is not None:
+        body["clientId"] = client_id
+    return body
+
+
+class BlockingGrader:
+    """批改一直阻塞到release()，记录开始、被取消和完成的批改次数"""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+        self.finished = 0
+        self._release = asyncio.Event()
+        self._started = asyncio.Event()
+
+    async def grade_answers(self, passage, questions, user_answers, time_spent, *args, on_progress=None, **kwargs):
+        self.started += 1
+        self._started.set()
+        try:
+            await self._release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished += 1
+        return AITeacherResponse(
+            results=[], final_score=1.0, correct_count=0, total_questions=0, ability_analysis="表現良好",
+            strengths=[], weaknesses=[], recommendations=[], time_spent=int(time_spent)
+        )
+
+    async def wait_started(self):
+        await asyncio.wait_for(self._started.wait(), 1)
+
+    def release(self):
+        self._release.set()
+
+
+@pytest.fixture
+def grader(monkeypatch):
+    grader = BlockingGrader()
+    monkeypatch.setattr(AITeacherService, "grade_answers", lambda self, *args, **kwargs: grader.grade_answers(*args, **kwargs))
+    return grader
+
+
+@pytest.fixture
+def scheduler(reset_services):
+    scheduler = GradingScheduler(concurrency=1, max_queue_depth=1)
+    grading_scheduler._grading_scheduler = scheduler
+    return scheduler
+
+
+async def _status(api_client, submission_id):
+    return (await api_client.get(f"/api/dse/results/{submission_id}")).json()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_cancel_while_queued_never_runs_the_job(api_client, grader, scheduler):
+    running = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+    await grader.wait_started()
+    queued = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+    assert scheduler.position(queued) == 1
+
+    response = await api_client.delete(f"/api/dse/results/{queued}")
+
+    assert response.status_code == 200
+    assert (response.json()["status"], response.json()["error_detail"]) == ("cancelled", "用户取消")
+    assert scheduler.position(queued) is None
+    grader.release()
+    await _settle()
+    assert grader.started == 1
+    assert (await _status(api_client, running))["status"] == "completed"
+    assert (await _status(api_client, queued))["status"] == "cancelled"
+
+
+async def test_cancel_while_running_interrupts_grading_and_frees_the_worker(api_client, grader, scheduler):
+    running = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+    await grader.wait_started()
+    queued = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+
+    response = await api_client.delete(f"/api/dse/results/{running}")
+    await _settle()
+
+    assert response.json()["status"] == "cancelled"
+    assert grader.cancelled == 1
+    # worker立即转去批改排队中的下一份答卷
+    assert grader.started == 2
+    assert scheduler.is_running(queued)
+    assert (await _status(api_client, running))["status"] == "cancelled"
+
+
+async def test_cancel_of_finished_or_unknown_submission_is_rejected(api_client, grader, scheduler):
+    submission_id = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+    grader.release()
+    await _settle()
+
+    assert (await api_client.delete(f"/api/dse/results/{submission_id}")).status_code == 409
+    assert (await api_client.delete("/api/dse/results/sub_unknown")).status_code == 404
+
+
+async def test_resubmit_supersedes_previous_submission(api_client, grader, scheduler):
+    previous = (await api_client.post("/api/dse/submit", json=_submission("student-1"))).json()["submission_id"]
+    await grader.wait_started()
+
+    response = await api_client.post("/api/dse/submit", json=_submission("student-1"))
+    await _settle()
+
+    assert response.status_code == 200
+    current = response.json()["submission_id"]
+    status = await _status(api_client, previous)
+    assert (status["status"], status["error_detail"]) == ("cancelled", "已被同一客户端的新提交取代")
+    assert scheduler.is_running(current)
+    assert scheduler.owned_by("student-1:" + (await dse.load_paper_data()).passage.id) == current
+
+
+async def test_rejected_resubmit_keeps_previous_submission(api_client, grader, scheduler):
+    previous = (await api_client.post("/api/dse/submit", json=_submission("student-1"))).json()["submission_id"]
+    await grader.wait_started()
+    # 其他学生的提交占满队列
+    assert (await api_client.post("/api/dse/submit", json=_submission("student-2"))).status_code == 200
+
+    response = await api_client.post("/api/dse/submit", json=_submission("student-1"))
+
+    assert response.status_code == 503
+    assert grader.cancelled == 0
+    assert scheduler.is_running(previous)
+    assert (await _status(api_client, previous))["status"] == "processing"
+    assert await get_submission_store().count() == 2
+
+
+async def test_job_exceeding_deadline_is_cancelled(api_client, grader, scheduler, monkeypatch):
+    monkeypatch.setattr(dse.settings, "GRADING_JOB_DEADLINE", 0.05)
+
+    submission_id = (await api_client.post("/api/dse/submit", json=_submission())).json()["submission_id"]
+    await grader.wait_started()
+    await asyncio.sleep(0.1)
+
+    status = await _status(api_client, submission_id)
+    assert status["status"] == "cancelled"
+    assert "执行时限" in status["error_detail"]
+    assert grader.cancelled == 1
+    assert not scheduler.is_running(submission_id)
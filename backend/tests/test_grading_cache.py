@@ -0,0 +1,118 @@
+"""批改缓存：整卷缓存的LRU、后备存储和损坏条目"""
+
+import asyncio
+
+import pytest
+
+from app.models.dse_models import AITeacherResponse, DSEQuestion, QuestionResult, UserAnswer
+from app.services.grading_cache import (
+    VERDICT_KEY_PREFIX,
+    DiskCacheBacking,
+    GradingCache,
+    VerdictCache,
+    make_cache_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+QUESTION = DSEQuestion(
+    id="q11", question_number=11, question_text="Which is true?", type="multiple-choice",
+    options=["A", "B", "C", "D"], correct_answer="A", total_marks=1, skill_type="detail"
+)
+
+
+def _response(score=1.0, time_spent=600):
+    result = QuestionResult(
+        question_number=1, is_correct=score == 1.0, user_answer="A", correct_answer="A",
+        explanation="【原文定位】第[1]段", skill_analysis="細節理解"
+    )
+    return AITeacherResponse(
+        results=[result], final_score=score, correct_count=int(score), total_questions=1, ability_analysis="表現良好",
+        skill_breakdown=[], strengths_detailed=[], weaknesses_detailed=[],
+        strengths=[], weaknesses=[], recommendations=[], time_spent=time_spent
+    )
+
+
+def _key(selected_option):
+    answers = [UserAnswer(question_id="q11", type="multiple-choice", selected_option=selected_option)]
+    return make_cache_key("v1", "model", "p1", [QUESTION], answers)
+
+
+def test_cache_key_normalizes_answers():
+    assert _key(" a ") == _key("A")
+    assert _key("") == _key("undefined") == _key(None)
+    assert _key("A") != _key("B")
+
+
+async def test_hit_returns_copy_with_current_time_spent():
+    cache = GradingCache()
+    await cache.put("key", _response(time_spent=600))
+
+    cached = await cache.get("key", time_spent=125.7)
+
+    assert cached.time_spent == 125
+    assert (await cache.get("key", time_spent=600)).time_spent == 600
+    assert await cache.get("other", time_spent=0) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+async def test_lru_evicts_least_recently_used_entry():
+    cache = GradingCache(max_entries=2)
+    await cache.put("first", _response())
+    await cache.put("second", _response())
+    await cache.get("first", time_spent=0)
+
+    await cache.put("third", _response())
+
+    assert await cache.get("second", time_spent=0) is None
+    assert await cache.get("first", time_spent=0) is not None
+
+
+async def test_disk_backing_survives_restart(tmp_path):
+    await GradingCache(backing=DiskCacheBacking(tmp_path)).put("key", _response(score=0.0))
+
+    cache = GradingCache(backing=DiskCacheBacking(tmp_path))
+    cached = await cache.get("key", time_spent=30)
+
+    assert cached.final_score == 0.0
+    assert cache.backing_hits == 1
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+async def test_corrupt_backing_entry_is_a_miss_and_removed(tmp_path):
+    backing = DiskCacheBacking(tmp_path)
+    await backing.set("truncated", '{"results": [')
+    await backing.set("old-schema", '{"score": 1}')
+    cache = GradingCache(backing=backing)
+
+    assert await cache.get("truncated", time_spent=0) is None
+    assert await cache.get("old-schema", time_spent=0) is None
+
+    assert (cache.misses, cache.backing_errors) == (2, 2)
+    assert await backing.get("truncated") is None
+    assert await backing.get("old-schema") is None
+
+
+async def test_concurrent_disk_writes_do_not_share_a_temp_file(tmp_path):
+    backing = DiskCacheBacking(tmp_path)
+    values = [_response(time_spent=index).model_dump_json(by_alias=True) for index in range(20)]
+
+    await asyncio.gather(*(backing.set("key", value) for value in values))
+
+    assert await backing.get("key") in values
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+async def test_corrupt_verdict_fragments_are_misses_and_removed(tmp_path):
+    backing = DiskCacheBacking(tmp_path)
+    await backing.set(VERDICT_KEY_PREFIX + "truncated", '{"is_correct": tr')
+    await backing.set(VERDICT_KEY_PREFIX + "old-schema", '{"correct": true}')
+    await VerdictCache(backing=backing).put_many({"valid": {"is_correct": True, "explanation": "解析", "skill_analysis": "細節"}})
+    cache = VerdictCache(backing=backing)
+
+    found = await cache.get_many(["truncated", "old-schema", "valid"])
+
+    assert list(found) == ["valid"]
+    assert (cache.backing_hits, cache.misses, cache.backing_errors) == (1, 2, 2)
+    assert await backing.get(VERDICT_KEY_PREFIX + "truncated") is None
+    assert await backing.get(VERDICT_KEY_PREFIX + "old-schema") is None
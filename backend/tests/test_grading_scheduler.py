@@ -0,0 +1,128 @@
+"""批改调度器：排队位置、优先级和背压"""
+
+import asyncio
+
+import pytest
+
+from app.services import grading_scheduler
+from app.services.grading_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    GradingScheduler,
+    QueueFullError,
+)
+from app.services.submission_store import get_submission_store
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def scheduler():
+    scheduler = GradingScheduler(concurrency=1, max_queue_depth=3)
+    yield scheduler
+    await scheduler.close()
+
+
+async def _occupy_worker(scheduler):
+    """提交一个一直执行的任务占住唯一的worker，返回放行它的事件"""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def run():
+        started.set()
+        await release.wait()
+
+    scheduler.submit("busy", run)
+    await started.wait()
+    return release
+
+
+def _recorder(order, submission_id):
+    async def run():
+        order.append(submission_id)
+    return run
+
+
+async def test_positions_follow_priority_then_arrival(scheduler):
+    await _occupy_worker(scheduler)
+
+    assert scheduler.submit("low", _recorder([], "low"), priority=PRIORITY_LOW) == 1
+    assert scheduler.submit("normal", _recorder([], "normal"), priority=PRIORITY_NORMAL) == 1
+    assert scheduler.submit("high", _recorder([], "high"), priority=PRIORITY_HIGH) == 1
+
+    assert [scheduler.position(sid) for sid in ("high", "normal", "low")] == [1, 2, 3]
+    assert scheduler.position("busy") is None
+    assert scheduler.is_running("busy")
+
+
+async def test_jobs_run_in_priority_order(scheduler):
+    release = await _occupy_worker(scheduler)
+    order = []
+    finished = asyncio.Event()
+    scheduler.submit("low", _recorder(order, "low"), priority=PRIORITY_LOW, on_done=finished.set)
+    scheduler.submit("normal-1", _recorder(order, "normal-1"))
+    scheduler.submit("normal-2", _recorder(order, "normal-2"))
+
+    release.set()
+    await asyncio.wait_for(finished.wait(), 1)
+
+    assert order == ["normal-1", "normal-2", "low"]
+    assert scheduler.stats()["completed"] == 4
+
+
+async def test_full_queue_rejects_new_jobs(scheduler):
+    release = await _occupy_worker(scheduler)
+    for index in range(3):
+        scheduler.submit(f"queued-{index}", _recorder([], index))
+    assert scheduler.available == 0
+
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.submit("rejected", _recorder([], "rejected"))
+    assert excinfo.value.depth == 3
+    assert scheduler.position("rejected") is None
+    assert (scheduler.stats()["accepted"], scheduler.stats()["rejected"]) == (4, 1)
+
+    # 执行中的任务不占排队名额：队列排空后又能接受新任务
+    release.set()
+    for _ in range(10):
+        if scheduler.depth == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert scheduler.available == 3
+    assert scheduler.submit("accepted", _recorder([], "accepted")) == 1
+
+
+async def test_positions_shift_when_earlier_job_starts(scheduler):
+    release = await _occupy_worker(scheduler)
+    blocker_started = asyncio.Event()
+
+    async def blocker():
+        blocker_started.set()
+        await asyncio.Event().wait()
+
+    scheduler.submit("first", blocker)
+    scheduler.submit("second", _recorder([], "second"))
+    assert scheduler.position("second") == 2
+
+    release.set()
+    await asyncio.wait_for(blocker_started.wait(), 1)
+    assert scheduler.position("second") == 1
+    assert scheduler.estimate_wait_seconds(1, seconds_per_job=30) == 60
+
+
+async def test_submit_endpoint_returns_503_when_queue_is_full(api_client):
+    grading_scheduler._grading_scheduler = GradingScheduler(concurrency=1, max_queue_depth=0)
+
+    response = await api_client.post(
+        "/api/dse/submit",
+        json={
+            "answers": [{"question_id": "q11", "type": "multiple-choice", "selected_option": "A"}],
+            "start_time": "2024-01-01T10:00:00Z",
+            "end_time": "2024-01-01T10:30:00Z",
+        }
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert await get_submission_store().count() == 0
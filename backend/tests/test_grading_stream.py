@@ -0,0 +1,68 @@
+"""流式批改输出的增量解析"""
+
+import json
+import random
+
+from app.services.grading_stream import ResultsStreamParser, parse_sse_line
+
+RESULTS = [
+    {"questionNumber": 1, "isCorrect": True, "explanation": "含有 \"引号\"、{括号} 和 [方括号]"},
+    {"questionNumber": 2, "isCorrect": False, "explanation": "反斜杠 \\ 结尾\\"},
+    {"questionNumber": 3, "isCorrect": True, "nested": {"results": [{"ignored": True}]}},
+]
+DOCUMENT = (
+    "好的，以下是批改结果：\n```json\n"
+    + json.dumps({"summary": {"results": "不是数组"}, "results": RESULTS, "finalScore": 2}, ensure_ascii=False)
+    + "\n```"
+)
+
+
+def _feed(chunks):
+    parser = ResultsStreamParser()
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    return parser, emitted
+
+
+def test_whole_document_yields_every_result():
+    parser, emitted = _feed([DOCUMENT])
+    assert emitted == RESULTS
+    assert parser.text == DOCUMENT
+    assert (parser.emitted, parser.skipped) == (3, 0)
+
+
+def test_results_split_across_chunks_are_reassembled():
+    # 逐字符输入：键名、字符串、转义和元素都跨越段边界
+    parser, emitted = _feed(list(DOCUMENT))
+    assert emitted == RESULTS
+    assert parser.text == DOCUMENT
+
+    rng = random.Random(0)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(DOCUMENT)), 12))
+        chunks = [DOCUMENT[start:end] for start, end in zip([0, *cuts], [*cuts, len(DOCUMENT)])]
+        parser, emitted = _feed(chunks)
+        assert emitted == RESULTS
+        assert parser.text == DOCUMENT
+
+
+def test_each_result_is_emitted_as_soon_as_it_closes():
+    element = json.dumps(RESULTS[0], ensure_ascii=False)
+    first = DOCUMENT.index(element) + len(element)
+    parser = ResultsStreamParser()
+    assert parser.feed(DOCUMENT[:first - 1]) == []
+    assert parser.feed(DOCUMENT[first - 1:first]) == [RESULTS[0]]
+    assert parser.feed(DOCUMENT[first:]) == RESULTS[1:]
+
+
+def test_invalid_element_is_skipped():
+    parser, emitted = _feed(['{"results": [{"a": 1,}, ', '{"b": 2}]}'])
+    assert emitted == [{"b": 2}]
+    assert parser.skipped == 1
+
+
+def test_parse_sse_line():
+    assert parse_sse_line('data: {"choices": [{"delta": {"content": "文本"}}]}') == "文本"
+    assert parse_sse_line(": OPENROUTER PROCESSING") is None
+    assert parse_sse_line("data: [DONE]") is None
@@ -0,0 +1,64 @@
+"""提交ID在多线程、多进程下的唯一性和有序性"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.ids import SUBMISSION_PREFIX, IdGenerator, parse_id
+
+THREADS = 8
+PROCESSES = 4
+IDS_PER_WORKER = 2000
+
+
+def _generate(worker_id: int, count: int = IDS_PER_WORKER):
+    """在独立进程中用指定worker ID生成一批ID"""
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=worker_id)
+    return [generator.new_id() for _ in range(count)]
+
+
+def test_ids_from_many_threads_are_unique_and_ordered():
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    created = []
+    order = threading.Lock()
+
+    def worker():
+        for _ in range(IDS_PER_WORKER):
+            # 在同一把锁内生成并记录，created的顺序即生成顺序
+            with order:
+                created.append(generator.new_id())
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        for future in [pool.submit(worker) for _ in range(THREADS)]:
+            future.result()
+
+    assert len(created) == THREADS * IDS_PER_WORKER
+    assert len(set(created)) == len(created)
+    assert created == sorted(created)
+
+
+def test_ids_from_many_processes_are_unique_and_ordered():
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(PROCESSES, mp_context=context) as pool:
+        first = list(pool.map(_generate, range(PROCESSES)))
+        # 跨进程的顺序以毫秒为粒度：第二轮在第一轮全部完成、且进入下一毫秒之后开始生成
+        time.sleep(0.002)
+        second = list(pool.map(_generate, range(PROCESSES)))
+
+    batches = first + second
+    created = [value for batch in batches for value in batch]
+    assert len(set(created)) == len(created)
+
+    # 同一进程内严格递增，worker ID与配置一致
+    for worker_id, batch in enumerate(first):
+        assert batch == sorted(batch)
+        assert {parse_id(value, SUBMISSION_PREFIX)[1] for value in batch} == {worker_id}
+
+    # 不同进程之间：后生成的一轮整体排在前一轮之后
+    assert max(value for batch in first for value in batch) < min(value for batch in second for value in batch)
+
+    # 不同进程之间：毫秒时间戳更早的ID排序更靠前
+    ordered = sorted(created)
+    timestamps = [parse_id(value, SUBMISSION_PREFIX)[0] for value in ordered]
+    assert timestamps == sorted(timestamps)
@@ -0,0 +1,81 @@
+"""客观题本地评分（混合批改模式）"""
+
+import pytest
+
+from app.models.dse_models import UserAnswer
+from app.routes.dse import load_paper_data
+from app.services.ai_teacher import AITeacherService
+
+pytestmark = pytest.mark.anyio
+
+
+def _sub_q(sub_type, user_answer, correct_answer):
+    return {
+        "sub_question_number": 1, "type": sub_type, "skill_type": "detail", "user_answer": user_answer,
+        "correct_answer": correct_answer, "reference_paragraphs": ["p2"], "explanation": "",
+    }
+
+
+@pytest.mark.parametrize("sub_type, user_answer, correct_answer, expected", [
+    ("multiple-choice", "A", "A", True),
+    ("multiple-choice", " a ", "A", True),
+    ("multiple-choice", "B", "A", False),
+    ("multiple-choice", "未作答", "A", False),
+    ("timeline-sequencing-sub", "d", "D", True),
+    ("timeline-sequencing-sub", "C", "D", False),
+    ("fill-in-blank-sub", "Limits.", "limits", True),
+    ("fill-in-blank-sub", "  solid ", "solid", True),
+    ("fill-in-blank-sub", "未作答", "solid", False),
+])
+def test_grades_objective_answers_locally(sub_type, user_answer, correct_answer, expected):
+    fragment = AITeacherService()._grade_locally(_sub_q(sub_type, user_answer, correct_answer))
+
+    assert fragment["is_correct"] is expected
+    assert fragment["explanation"].startswith("【原文定位】")
+
+
+def test_open_fill_in_answer_is_left_to_the_model():
+    assert AITeacherService()._grade_locally(_sub_q("fill-in-blank-sub", "restrict", "limits")) is None
+
+
+async def _grade(service, fill_in):
+    snapshot = await load_paper_data()
+    answers = [
+        UserAnswer(question_id="q5", type="fill-in-blank", fill_in_answers=fill_in),
+        UserAnswer(question_id="q11", type="multiple-choice", selected_option="a"),
+        UserAnswer(question_id="q20", type="timeline-sequencing", timeline_answers={"i": "B", "ii": "A", "iii": "D"}),
+    ]
+    return await service.grade_answers(snapshot.passage, list(snapshot.questions), answers, 600)
+
+
+async def test_objective_sheet_is_graded_without_model_call(monkeypatch):
+    service = AITeacherService()
+
+    async def no_model_call(*args, **kwargs):
+        raise AssertionError("全部小题可在本地评分时不应调用模型")
+
+    monkeypatch.setattr(service, "_call_ai_model", no_model_call)
+
+    result = await _grade(service, {"q5_i": "Limits", "q5_ii": "solid", "q5_iii": ""})
+
+    assert [item.is_correct for item in result.results] == [True, True, False, True, True, False, False]
+    assert (result.correct_count, result.total_questions) == (4, 7)
+    assert result.final_score == pytest.approx(4 / 7)
+    assert result.results[2].user_answer == "未作答"
+
+
+async def test_only_open_answers_are_sent_to_the_model(monkeypatch):
+    service = AITeacherService()
+    prompted = []
+
+    def record_prompt(context):
+        prompted.append(context)
+        raise RuntimeError("只检查发给模型的上下文")
+
+    monkeypatch.setattr(service, "_create_grading_prompt", record_prompt)
+
+    await _grade(service, {"q5_i": "restrict", "q5_ii": "solid", "q5_iii": "overkill"})
+
+    context, = prompted
+    assert [sub_q["sub_question_number"] for sub_q in context["sub_questions"]] == [1]
+    assert len(context["graded_sub_questions"]) == 6
@@ -0,0 +1,71 @@
+"""长轮询等待者的唤醒、并发和超时"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.progress_bus import ProgressBus, build_event
+
+pytestmark = pytest.mark.anyio
+
+SUBMISSION_ID = "submission_test"
+# 发布后等待者被唤醒的时间上限（秒）
+WAKEUP_BOUND = 0.05
+
+
+def _event(progress: int, status: str = "processing"):
+    return build_event(SUBMISSION_ID, status, progress, f"进度{progress}")
+
+
+async def test_waiter_wakes_promptly_after_publish():
+    bus = ProgressBus()
+    async with bus.watch(SUBMISSION_ID) as watch:
+        waiter = asyncio.create_task(watch.wait(since_progress=0, timeout=5))
+        await asyncio.sleep(0.01)
+
+        published_at = time.monotonic()
+        assert await bus.publish(SUBMISSION_ID, _event(30)) == 1
+        event = await waiter
+        elapsed = time.monotonic() - published_at
+
+    assert event.progress == 30
+    assert elapsed < WAKEUP_BOUND
+    assert not bus.has_listeners(SUBMISSION_ID)
+
+
+async def test_concurrent_waiters_all_wake_once_with_latest_event():
+    bus = ProgressBus()
+    waiters = 20
+    entered = asyncio.Event()
+    woken = []
+
+    async def wait_once():
+        async with bus.watch(SUBMISSION_ID) as watch:
+            if bus.stats()["watchers"] == waiters:
+                entered.set()
+            woken.append(await watch.wait(since_progress=0, timeout=5))
+
+    tasks = [asyncio.create_task(wait_once()) for _ in range(waiters)]
+    await asyncio.wait_for(entered.wait(), timeout=1)
+
+    # 连续两次发布在同一轮事件循环内完成，等待者被唤醒时看到的是最新事件
+    await bus.publish(SUBMISSION_ID, _event(30))
+    await bus.publish(SUBMISSION_ID, _event(60))
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    assert len(woken) == waiters
+    assert {event.progress for event in woken} == {60}
+    assert not bus.has_listeners(SUBMISSION_ID)
+
+
+async def test_wait_returns_none_on_timeout():
+    bus = ProgressBus()
+    async with bus.watch(SUBMISSION_ID) as watch:
+        started_at = time.monotonic()
+        assert await watch.wait(since_progress=0, timeout=0.05) is None
+        assert time.monotonic() - started_at >= 0.04
+
+        # 进度没有变化的事件不会唤醒等待者
+        await bus.publish(SUBMISSION_ID, _event(0))
+        assert await watch.wait(since_progress=0, timeout=0.05) is None
@@ -0,0 +1,50 @@
+"""批改进度事件的序列化"""
+
+import json
+
+import pytest
+
+from app.core.ids import new_submission_id
+from app.models.dse_models import AITeacherResponse, QuestionResult
+from app.services.submission_store import STATUS_COMPLETED, SubmissionRecord, get_submission_store
+
+pytestmark = pytest.mark.anyio
+
+
+def _graded_record() -> SubmissionRecord:
+    result = AITeacherResponse(
+        results=[QuestionResult(
+            question_number=1, is_correct=True, user_answer="limits", correct_answer="limits",
+            explanation="【原文定位】第[2]段", skill_analysis="詞彙理解", reference_text="limits the author"
+        )],
+        final_score=1.0, correct_count=1, total_questions=1, ability_analysis="表現良好",
+        skill_breakdown=[], strengths_detailed=[], weaknesses_detailed=[],
+        strengths=[], weaknesses=[], recommendations=[], time_spent=60
+    )
+    return SubmissionRecord(
+        submission_id=new_submission_id(),
+        status=STATUS_COMPLETED,
+        progress=100,
+        message="批改完成",
+        result=result
+    )
+
+
+def _sse_payloads(body: str) -> list:
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+async def test_sse_payload_matches_results_response(api_client):
+    record = _graded_record()
+    await get_submission_store().create(record)
+
+    results = await api_client.get(f"/api/dse/results/{record.submission_id}")
+    events = await api_client.get(f"/api/dse/results/{record.submission_id}/events")
+
+    assert results.status_code == 200
+    payloads = _sse_payloads(events.text)
+    assert len(payloads) == 1
+    assert payloads[0] == results.json()
+    assert payloads[0]["result"]["finalScore"] == 1.0
+    assert payloads[0]["result"]["results"][0]["questionNumber"] == 1
+
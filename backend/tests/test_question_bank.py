@@ -0,0 +1,47 @@
+"""题库重新加载"""
+
+import json
+import shutil
+
+import pytest
+
+from app.services.question_bank import BANK_FILES, DATA_DIR, DEMO_PAPER_ID, QuestionBankService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name in BANK_FILES:
+        shutil.copy(DATA_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def _retitle(data_dir, title):
+    path = data_dir / "article.json"
+    article = json.loads(path.read_text(encoding="utf-8"))
+    article["title"] = title
+    path.write_text(json.dumps(article, ensure_ascii=False), encoding="utf-8")
+
+
+async def test_edits_are_picked_up_per_request_without_watcher(data_dir):
+    service = QuestionBankService(data_dir=data_dir)
+    first = await service.get_bank()
+    # 内容未变化时不重建
+    assert await service.get_bank() is first
+
+    _retitle(data_dir, "修改后的标题")
+    bank = await service.get_bank()
+    assert bank is not first
+    assert bank.get_paper(DEMO_PAPER_ID).passage.title == "修改后的标题"
+
+
+async def test_broken_edit_keeps_current_bank_without_watcher(data_dir):
+    service = QuestionBankService(data_dir=data_dir)
+    first = await service.get_bank()
+
+    (data_dir / "questions.json").write_text("{", encoding="utf-8")
+    bank = await service.get_bank()
+    assert bank.version == first.version
+    assert bank.get_paper(DEMO_PAPER_ID) is not None
+    assert service.last_error
@@ -0,0 +1,28 @@
+"""题目数据接口的投影和响应模型"""
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+QUESTION_PATHS = ("/api/dse/demo-questions", "/api/dse/papers/{paper_id}")
+
+
+async def test_openapi_documents_full_and_projected_shapes(api_client):
+    schema = (await api_client.get("/openapi.json")).json()
+    for path in QUESTION_PATHS:
+        body = schema["paths"][path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        refs = {option["$ref"].rsplit("/", 1)[-1] for option in body["anyOf"]}
+        assert refs == {"DemoQuestionsResponse", "ProjectedQuestionsResponse"}
+
+
+async def test_projection_returns_projected_shape(api_client):
+    full = (await api_client.get("/api/dse/demo-questions")).json()
+    assert {"passage", "questions", "total_marks"} <= set(full)
+    assert "total_questions" not in full
+
+    projected = (await api_client.get(
+        "/api/dse/demo-questions", params={"mode": "questions", "limit": 1, "fields": "id"}
+    )).json()
+    assert "passage" not in projected
+    assert projected["total_questions"] == len(full["questions"])
+    assert projected["questions"] == [{"id": full["questions"][0]["id"]}]
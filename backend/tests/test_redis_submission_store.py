@@ -0,0 +1,164 @@
+"""Redis提交记录存储（使用fakeredis）"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.ids import new_submission_id
+from app.services.redis_submission_store import RedisSubmissionStore
+from app.services.submission_store import (
+    ALL_STATUSES,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    SubmissionRecord
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def store():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield RedisSubmissionStore(client=client, key_prefix="test:submission:")
+    await client.flushall()
+    await client.aclose()
+
+
+async def _create(store, count):
+    """按创建顺序生成count条记录，返回提交ID"""
+    submission_ids = []
+    for _ in range(count):
+        record = SubmissionRecord(submission_id=new_submission_id(), request={"paper_id": "paper"})
+        await store.create(record)
+        submission_ids.append(record.submission_id)
+    return submission_ids
+
+
+async def test_create_and_get_round_trip(store):
+    record = SubmissionRecord(
+        submission_id=new_submission_id(),
+        message="排队等待批改...",
+        request={"paper_id": "paper", "answers": {"q1": "A"}}
+    )
+    await store.create(record)
+
+    loaded = await store.get(record.submission_id)
+    assert loaded.to_dict() == record.to_dict()
+    assert await store.get(new_submission_id()) is None
+    assert await store.client.ttl(store._key(record.submission_id)) == store.active_ttl
+
+
+async def test_update_moves_status_index_and_sets_ttl(store):
+    submission_id, = await _create(store, 1)
+
+    assert await store.update(submission_id, progress=50, message="批改中")
+    record = await store.get(submission_id)
+    assert (record.status, record.progress, record.message) == (STATUS_PROCESSING, 50, "批改中")
+
+    assert await store.update(submission_id, status=STATUS_COMPLETED, progress=100)
+    assert (await store.get(submission_id)).status == STATUS_COMPLETED
+    assert await store.status_counts() == {status: int(status == STATUS_COMPLETED) for status in ALL_STATUSES}
+    assert await store.client.ttl(store._key(submission_id)) == store.ttl[STATUS_COMPLETED]
+
+
+async def test_delete_removes_record_and_index_members(store):
+    submission_id, = await _create(store, 1)
+
+    assert await store.delete(submission_id)
+    assert await store.get(submission_id) is None
+    assert await store.count() == 0
+    assert sum((await store.status_counts()).values()) == 0
+    assert not await store.delete(submission_id)
+
+
+async def test_query_pages_newest_first_with_cursor(store):
+    submission_ids = await _create(store, 7)
+    newest_first = submission_ids[::-1]
+
+    pages = []
+    cursor = None
+    while True:
+        records, cursor = await store.query(cursor=cursor, limit=3)
+        pages.append([record.submission_id for record in records])
+        if cursor is None:
+            break
+
+    assert pages == [newest_first[0:3], newest_first[3:6], newest_first[6:7]]
+
+
+async def test_query_filters_by_status_and_time(store):
+    submission_ids = await _create(store, 4)
+    await store.update(submission_ids[0], status=STATUS_FAILED)
+    await store.update(submission_ids[2], status=STATUS_FAILED)
+
+    records, cursor = await store.query(status=STATUS_FAILED)
+    assert [record.submission_id for record in records] == [submission_ids[2], submission_ids[0]]
+    assert cursor is None
+
+    future = datetime.now() + timedelta(hours=1)
+    records, _ = await store.query(created_after=future)
+    assert records == []
+    records, _ = await store.query(created_before=future, limit=10)
+    assert len(records) == 4
+
+
+async def test_query_skips_and_cleans_expired_members(store):
+    submission_ids = await _create(store, 5)
+    # 模拟Redis过期：Hash被删除，索引成员仍然留着
+    await store.client.delete(store._key(submission_ids[3]), store._key(submission_ids[2]))
+
+    records, cursor = await store.query(limit=3)
+    assert [record.submission_id for record in records] == [submission_ids[4], submission_ids[1], submission_ids[0]]
+    assert await store.count() == 3
+
+
+async def test_update_of_expired_record_does_not_recreate_it(store, monkeypatch):
+    submission_id, = await _create(store, 1)
+    await store.client.delete(store._key(submission_id))
+
+    assert not await store.update(submission_id, status=STATUS_COMPLETED, progress=100)
+    assert not await store.client.exists(store._key(submission_id))
+    assert await store.count() == 0
+    assert store.missed_updates == 1
+
+    # 不依赖事后清理：更新本身就不能写入已过期的记录
+    dropped = []
+    monkeypatch.setattr(store, "_drop", lambda submission_id: _record(dropped, submission_id))
+    assert not await store.update(submission_id, progress=100)
+    assert not await store.client.exists(store._key(submission_id))
+    assert dropped == [submission_id]
+
+
+async def _record(calls, value):
+    calls.append(value)
+    return False
+
+
+async def test_every_update_refreshes_expiry(store):
+    submission_id, = await _create(store, 1)
+    key = store._key(submission_id)
+
+    await store.client.expire(key, 5)
+    assert await store.update(submission_id, progress=40)
+    assert await store.client.ttl(key) == store.active_ttl
+
+    assert await store.update(submission_id, status=STATUS_FAILED, error_detail="超时")
+    await store.client.expire(key, 5)
+    assert await store.update(submission_id, message="批改失败")
+    assert await store.client.ttl(key) == store.ttl[STATUS_FAILED]
+    assert (await store.status_counts())[STATUS_FAILED] == 1
+
+
+async def test_update_is_a_single_script_call(store, monkeypatch):
+    submission_id, = await _create(store, 1)
+    with monkeypatch.context() as patch:
+        # 不经过WATCH/MULTI事务pipeline
+        patch.setattr(store.client, "pipeline", None)
+        assert await store.update(submission_id, status=STATUS_COMPLETED, progress=100)
+
+    record = await store.get(submission_id)
+    assert (record.status, record.progress) == (STATUS_COMPLETED, 100)
+    assert await store.status_counts() == {status: int(status == STATUS_COMPLETED) for status in ALL_STATUSES}
@@ -0,0 +1,41 @@
+"""预序列化响应缓存"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.response_cache import ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cache_miss_serializes_off_the_event_loop():
+    cache = ResponseCache()
+    loop_thread = threading.get_ident()
+    serialized_in = []
+
+    def serialize():
+        serialized_in.append(threading.get_ident())
+        return b'{"questions": []}' * 100
+
+    prepared = await cache.get_or_build(("questions", "paper", "v1"), serialize)
+    assert serialized_in and serialized_in[0] != loop_thread
+    assert "gzip" in prepared.encodings
+
+    # 命中时不再序列化
+    assert await cache.get_or_build(("questions", "paper", "v1"), serialize) is prepared
+    assert len(serialized_in) == 1
+
+
+async def test_concurrent_misses_build_once():
+    cache = ResponseCache()
+    calls = []
+
+    def serialize():
+        calls.append(1)
+        return b"{}"
+
+    results = await asyncio.gather(*(cache.get_or_build("key", serialize) for _ in range(10)))
+    assert len(calls) == 1
+    assert all(prepared is results[0] for prepared in results)
@@ -0,0 +1,153 @@
+"""批改结果数据库：历史分页和关闭"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core.ids import new_submission_id
+from app.services import results_db
+from app.services.results_db import ResultsDatabase
+from app.services.submission_store import STATUS_COMPLETED, SubmissionRecord
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def database(tmp_path):
+    database = ResultsDatabase(tmp_path / "results.db", flush_interval=0.01)
+    await database.start()
+    yield database
+    await database.close()
+
+
+def _records(count, created_at):
+    return [
+        SubmissionRecord(
+            submission_id=new_submission_id(),
+            status=STATUS_COMPLETED,
+            request={"paper_id": "paper"},
+            created_at=created_at
+        )
+        for _ in range(count)
+    ]
+
+
+async def test_history_pages_do_not_skip_rows_with_same_created_at(database):
+    created_at = datetime(2024, 5, 1, 9, 30)
+    older, = _records(1, datetime(2024, 5, 1, 9, 0))
+    same_time = _records(5, created_at)
+    for record in [older, *same_time]:
+        database.save(record)
+    await database.flush()
+
+    seen = []
+    cursor = None
+    for _ in range(len(same_time) + 1):
+        rows = await database.query_history(before=cursor, limit=2)
+        seen.extend(row["submission_id"] for row in rows)
+        if len(rows) < 2:
+            break
+        cursor = rows[-1]["submission_id"]
+
+    expected = sorted((record.submission_id for record in same_time), reverse=True) + [older.submission_id]
+    assert seen == expected
+
+
+async def test_history_endpoint_cursor_is_last_submission_id(database, api_client, monkeypatch):
+    same_time = _records(3, datetime(2024, 5, 1, 9, 30))
+    for record in same_time:
+        database.save(record)
+    await database.flush()
+    monkeypatch.setattr(results_db, "_results_db", database)
+
+    first = (await api_client.get("/api/dse/history", params={"limit": 2})).json()
+    second = (await api_client.get(
+        "/api/dse/history", params={"limit": 2, "cursor": first["next_cursor"]}
+    )).json()
+
+    ids = [row["submission_id"] for row in first["submissions"] + second["submissions"]]
+    assert first["next_cursor"] == ids[1]
+    assert ids == sorted((record.submission_id for record in same_time), reverse=True)
+    assert second["next_cursor"] is None
+
+
+async def test_close_waits_for_batch_being_written(tmp_path, monkeypatch):
+    database = ResultsDatabase(tmp_path / "results.db", flush_interval=0.01)
+    await database.start()
+    write_batch = database._write_batch
+    writing = threading.Event()
+
+    def slow_write_batch(rows):
+        writing.set()
+        time.sleep(0.2)
+        write_batch(rows)
+
+    monkeypatch.setattr(database, "_write_batch", slow_write_batch)
+    record, = _records(1, datetime.now())
+    database.save(record)
+    # 等后台写入任务开始写这一批，再关闭数据库
+    await asyncio.to_thread(writing.wait, 1)
+    await database.close()
+
+    reopened = ResultsDatabase(tmp_path / "results.db")
+    await reopened.start()
+    try:
+        assert (await reopened.get(record.submission_id)).status == STATUS_COMPLETED
+    finally:
+        await reopened.close()
+    assert database.write_errors == 0
+
+
+async def test_restart_with_journal_only_fails_submissions_it_did_not_resume(tmp_path, monkeypatch, reset_services):
+    from app.models.dse_models import SubmitAnswersRequest
+    from app.routes import dse
+    from app.services import grading_journal
+    from app.services.grading_journal import GradingJournal
+    from app.services.grading_scheduler import PRIORITY_LOW, get_grading_scheduler
+
+    request = SubmitAnswersRequest(
+        answers=[{"question_id": "q11", "type": "multiple-choice", "selected_option": "A"}],
+        start_time="2024-01-01T10:00:00Z",
+        end_time="2024-01-01T10:30:00Z"
+    ).model_dump(mode="json")
+    journaled, lost = (
+        SubmissionRecord(submission_id=new_submission_id(), request=request) for _ in range(2)
+    )
+
+    # 重启前：两个提交都在批改中，只有一个写进了批改日志
+    database = ResultsDatabase(tmp_path / "results.db")
+    await database.start()
+    database.save(journaled)
+    database.save(lost)
+    await database.close()
+    journal = GradingJournal(tmp_path / "journal.jsonl")
+    await journal.start()
+    journal.record_submitted(journaled, PRIORITY_LOW)
+    await journal.close()
+
+    # 重启后：数据库不再一律标记失败，由日志重放决定
+    database = ResultsDatabase(tmp_path / "results.db")
+    await database.start(mark_interrupted=False)
+    assert (await database.get(journaled.submission_id)).status == "processing"
+
+    grading = asyncio.Event()
+
+    async def process_grading(*args, **kwargs):
+        await grading.wait()
+
+    monkeypatch.setattr(dse, "process_grading", process_grading)
+    monkeypatch.setattr(results_db, "_results_db", database)
+    monkeypatch.setattr(grading_journal, "_grading_journal", GradingJournal(tmp_path / "journal.jsonl"))
+    try:
+        await dse.resume_from_journal()
+        await database.flush()
+        assert (await database.get(journaled.submission_id)).status == "processing"
+        assert (await database.get(lost.submission_id)).status == "failed"
+    finally:
+        grading.set()
+        await get_grading_scheduler().close()
+        await grading_journal._grading_journal.close()
+        await database.close()
@@ -0,0 +1,119 @@
+"""提交记录列表：按状态和时间的索引查询与游标分页"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core import ids
+from app.core.ids import SUBMISSION_PREFIX, IdGenerator
+from app.services.submission_store import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    InMemorySubmissionStore,
+    SubmissionRecord,
+    get_submission_store,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """冻结ID生成器的时钟（毫秒），同一毫秒内生成的ID只靠序号区分"""
+    now = {"ms": 1_714_550_400_000}
+    monkeypatch.setattr(ids.time, "time_ns", lambda: now["ms"] * 1_000_000)
+    return now
+
+
+async def _create(store, generator, count, status=STATUS_PROCESSING):
+    submission_ids = []
+    for _ in range(count):
+        record = SubmissionRecord(submission_id=generator.new_id(), status=status)
+        await store.create(record)
+        submission_ids.append(record.submission_id)
+    return submission_ids
+
+
+async def _pages(store, limit, **filters):
+    pages = []
+    cursor = None
+    for _ in range(10):
+        records, cursor = await store.query(cursor=cursor, limit=limit, **filters)
+        pages.append([record.submission_id for record in records])
+        if cursor is None:
+            break
+    return pages
+
+
+async def test_pages_split_submissions_from_the_same_millisecond(clock):
+    store = InMemorySubmissionStore()
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    earlier = await _create(store, generator, 1)
+    clock["ms"] += 1
+    same_time = await _create(store, generator, 5)
+
+    pages = await _pages(store, limit=2)
+
+    newest_first = (earlier + same_time)[::-1]
+    assert pages == [newest_first[0:2], newest_first[2:4], newest_first[4:6]]
+
+
+async def test_status_filter_follows_status_changes():
+    store = InMemorySubmissionStore()
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    submission_ids = await _create(store, generator, 5)
+    for submission_id in submission_ids[1::2]:
+        await store.update(submission_id, status=STATUS_COMPLETED)
+    await store.update(submission_ids[0], status=STATUS_FAILED)
+
+    assert await _pages(store, limit=1, status=STATUS_COMPLETED) == [[submission_ids[3]], [submission_ids[1]]]
+    assert await store.status_counts() == {STATUS_PROCESSING: 2, STATUS_COMPLETED: 2, STATUS_FAILED: 1, "cancelled": 0}
+
+
+async def test_time_range_maps_to_id_range(clock):
+    store = InMemorySubmissionStore()
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    before = await _create(store, generator, 2)
+    clock["ms"] += 60_000
+    inside = await _create(store, generator, 3)
+    clock["ms"] += 60_000
+    await _create(store, generator, 2)
+
+    start = datetime.fromtimestamp((clock["ms"] - 60_000) / 1000)
+    end = datetime.fromtimestamp(clock["ms"] / 1000)
+    records, cursor = await store.query(created_after=start, created_before=end, limit=10)
+
+    assert [record.submission_id for record in records] == inside[::-1]
+    assert cursor is None
+    records, _ = await store.query(created_before=start, limit=10)
+    assert [record.submission_id for record in records] == before[::-1]
+
+
+async def test_expired_records_are_skipped_without_short_pages():
+    store = InMemorySubmissionStore(completed_ttl=0.01)
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    submission_ids = await _create(store, generator, 5)
+    await store.update(submission_ids[3], status=STATUS_COMPLETED)
+    time.sleep(0.02)
+
+    records, cursor = await store.query(limit=3)
+
+    assert [record.submission_id for record in records] == [submission_ids[4], submission_ids[2], submission_ids[1]]
+    assert cursor == submission_ids[1]
+
+
+async def test_listing_endpoint_pages_with_next_cursor(api_client):
+    store = get_submission_store()
+    generator = IdGenerator(SUBMISSION_PREFIX, worker_id=1)
+    submission_ids = await _create(store, generator, 3)
+    await store.update(submission_ids[0], status=STATUS_COMPLETED)
+
+    first = (await api_client.get("/api/dse/submissions", params={"limit": 2})).json()
+    second = (await api_client.get("/api/dse/submissions", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+
+    assert [item["submission_id"] for item in first["submissions"]] == submission_ids[:0:-1]
+    assert [item["submission_id"] for item in second["submissions"]] == [submission_ids[0]]
+    assert second["next_cursor"] is None
+    assert (first["total"], first["status_counts"]["completed"]) == (3, 1)
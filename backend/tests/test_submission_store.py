@@ -0,0 +1,123 @@
+"""进程内提交记录存储：LRU淘汰、内存估算和过期清理"""
+
+import time
+
+import pytest
+
+from app.core.ids import new_submission_id
+from app.services.submission_store import (
+    STATUS_COMPLETED,
+    STATUS_PROCESSING,
+    InMemorySubmissionStore,
+    SubmissionRecord,
+    estimate_record_size,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def _partial(number):
+    return {"questionNumber": number, "isCorrect": True, "score": 1.0, "feedback": "答对了" * 20}
+
+
+async def _create(store, status=STATUS_PROCESSING, **fields):
+    record = SubmissionRecord(submission_id=new_submission_id(), status=status, **fields)
+    await store.create(record)
+    return record
+
+
+async def test_eviction_skips_processing_records():
+    store = InMemorySubmissionStore(max_entries=3)
+    active = await _create(store)
+    finished = await _create(store, status=STATUS_COMPLETED)
+    newer_active = await _create(store)
+
+    await _create(store)
+
+    assert await store.get(finished.submission_id) is None
+    assert await store.get(active.submission_id) is not None
+    assert await store.get(newer_active.submission_id) is not None
+    assert store.evicted_by_count == 1
+    assert store.evicted_active == 0
+
+
+async def test_eviction_takes_least_recently_used_finished_record():
+    store = InMemorySubmissionStore(max_entries=3)
+    first = await _create(store)
+    second = await _create(store)
+    await _create(store)
+    await store.update(first.submission_id, status=STATUS_COMPLETED)
+    await store.update(second.submission_id, status=STATUS_COMPLETED)
+    # 读取使first成为最近使用的已结束记录
+    await store.get(first.submission_id)
+
+    await _create(store)
+
+    assert await store.get(second.submission_id) is None
+    assert await store.get(first.submission_id) is not None
+
+
+async def test_evicts_processing_record_only_when_nothing_is_finished():
+    store = InMemorySubmissionStore(max_entries=2)
+    oldest = await _create(store)
+    await _create(store)
+
+    await _create(store)
+
+    assert await store.get(oldest.submission_id) is None
+    assert store.evicted_active == 1
+
+
+async def test_memory_budget_evicts_finished_records():
+    record_size = estimate_record_size(SubmissionRecord(submission_id="x", status=STATUS_COMPLETED))
+    store = InMemorySubmissionStore(max_memory_bytes=record_size * 3)
+    finished = await _create(store, status=STATUS_COMPLETED)
+    active = await _create(store)
+
+    await store.update(active.submission_id, partial_results=[_partial(n) for n in range(1, 40)])
+
+    assert await store.get(finished.submission_id) is None
+    assert await store.get(active.submission_id) is not None
+    assert store.evicted_by_memory == 1
+
+
+async def test_incremental_size_matches_full_estimate():
+    store = InMemorySubmissionStore()
+    record = await _create(store, request={"paper_id": "paper", "answers": {"1": "A"}})
+    partial = []
+    for number in range(1, 6):
+        # 与批改进度回调一样，已完成的小题结果对象在每次更新中复用
+        partial = partial + [_partial(number)]
+        await store.update(record.submission_id, partial_results=partial, message=f"已批改{number}道小题")
+        assert store.stats()["memory_bytes"] == estimate_record_size(record)
+
+    await store.update(record.submission_id, status=STATUS_COMPLETED, partial_results=None, error_detail="超时")
+    assert store.stats()["memory_bytes"] == estimate_record_size(record)
+
+    await store.delete(record.submission_id)
+    assert store.stats()["memory_bytes"] == 0
+
+
+async def test_partial_results_replaced_items_are_reestimated():
+    store = InMemorySubmissionStore()
+    record = await _create(store)
+    await store.update(record.submission_id, partial_results=[_partial(1)])
+
+    longer = dict(_partial(1), feedback="答错了" * 100)
+    await store.update(record.submission_id, partial_results=[longer])
+
+    assert store.stats()["memory_bytes"] == estimate_record_size(record)
+
+
+async def test_finished_records_expire():
+    store = InMemorySubmissionStore(completed_ttl=0.01)
+    record = await _create(store)
+    await store.update(record.submission_id, status=STATUS_COMPLETED)
+    active = await _create(store)
+
+    time.sleep(0.02)
+
+    assert store.sweep() == 1
+    assert await store.get(record.submission_id) is None
+    assert await store.get(active.submission_id) is not None
+    assert store.stats()["entries"] == 1
@@ -0,0 +1,101 @@
+"""逐题判定缓存：片段存取和拼装批改结果"""
+
+import pytest
+
+from app.models.dse_models import AITeacherResponse, QuestionResult, UserAnswer
+from app.routes.dse import load_paper_data
+from app.services import ai_teacher
+from app.services.ai_teacher import GRADING_LANGUAGE, PROMPT_VERSION, AITeacherService
+from app.services.grading_cache import VERDICT_FIELDS, VerdictCache, make_verdict_key
+
+pytestmark = pytest.mark.anyio
+
+# 与标准答案不同的填空答案，不能在本地评分
+FILL_IN = {"q5_i": "restrict", "q5_ii": "strong", "q5_iii": "too much"}
+
+
+def _answers():
+    return [
+        UserAnswer(question_id="q5", type="fill-in-blank", fill_in_answers=FILL_IN),
+        UserAnswer(question_id="q11", type="multiple-choice", selected_option="B"),
+        UserAnswer(question_id="q20", type="timeline-sequencing", timeline_answers={"i": "B", "ii": "D", "iii": "A"}),
+    ]
+
+
+def _fragment(is_correct):
+    return {"is_correct": is_correct, "explanation": "【原文定位】第[2]段", "skill_analysis": "詞彙理解", "reference_text": None}
+
+
+async def _context():
+    snapshot = await load_paper_data()
+    service = AITeacherService()
+    context = service._build_grading_context(snapshot.passage, list(snapshot.questions), _answers(), 600)
+    return snapshot, service, context
+
+
+def test_verdict_key_ignores_case_and_spacing_of_fill_in_answers():
+    sub_q = {"question_id": "q5", "sub_id": "q5_i", "type": "fill-in-blank-sub", "user_answer": " Restrict "}
+
+    assert make_verdict_key("v1", "p1", sub_q, "zh") == make_verdict_key("v1", "p1", dict(sub_q, user_answer="restrict"), "zh")
+    assert make_verdict_key("v1", "p1", sub_q, "zh") != make_verdict_key("v2", "p1", sub_q, "zh")
+    assert make_verdict_key("v1", "p1", sub_q, "zh") != make_verdict_key("v1", "p1", sub_q, "en")
+
+
+async def test_put_many_keeps_only_fragment_fields_and_evicts_lru():
+    cache = VerdictCache(max_entries=2)
+    await cache.put_many({"a": dict(_fragment(True), question_number=1, user_answer="A"), "b": _fragment(False)})
+    await cache.get_many(["a"])
+    await cache.put_many({"c": _fragment(True)})
+
+    found = await cache.get_many(["a", "b", "c"])
+
+    assert set(found) == {"a", "c"}
+    assert set(found["a"]) == set(VERDICT_FIELDS)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+async def test_merge_recomputes_score_over_whole_paper():
+    _, service, context = await _context()
+    # 模型只批改了三道填空小题，全部判为正确
+    model_results = [
+        QuestionResult(question_number=number, user_answer=FILL_IN[sub_id], correct_answer="x", **_fragment(True))
+        for number, sub_id in ((1, "q5_i"), (2, "q5_ii"), (3, "q5_iii"))
+    ]
+    response = AITeacherResponse(
+        results=model_results, final_score=1.0, correct_count=3, total_questions=3, ability_analysis="",
+        skill_breakdown=[], strengths_detailed=[], weaknesses_detailed=[],
+        strengths=[], weaknesses=[], recommendations=[], time_spent=600
+    )
+    # 其余小题来自本地评分或缓存：选择题答错，时序题答对
+    resolved = {4: _fragment(False), 5: _fragment(True), 6: _fragment(True), 7: _fragment(True)}
+
+    merged = service._merge_verdicts(context, resolved, 600, response)
+
+    assert [item.question_number for item in merged.results] == [1, 2, 3, 4, 5, 6, 7]
+    assert (merged.correct_count, merged.total_questions) == (6, 7)
+    assert merged.final_score == pytest.approx(6 / 7)
+    assert merged.results[3].user_answer == "B" and merged.results[3].correct_answer == "A"
+
+
+async def test_fully_cached_sheet_is_assembled_without_model_call(monkeypatch):
+    snapshot, service, context = await _context()
+    verdicts = VerdictCache()
+    await verdicts.put_many({
+        make_verdict_key(snapshot.version, PROMPT_VERSION, sub_q, GRADING_LANGUAGE): _fragment(sub_q["sub_id"] != "q5_iii")
+        for sub_q in context["sub_questions"] if sub_q["type"] == "fill-in-blank-sub"
+    })
+
+    async def no_model_call(*args, **kwargs):
+        raise AssertionError("全部小题已判定时不应调用模型")
+
+    monkeypatch.setattr(ai_teacher, "get_grading_cache", lambda: None)
+    monkeypatch.setattr(ai_teacher, "get_verdict_cache", lambda: verdicts)
+    monkeypatch.setattr(service, "_call_ai_model", no_model_call)
+
+    result = await service.grade_answers(
+        snapshot.passage, list(snapshot.questions), _answers(), 600, paper_version=snapshot.version
+    )
+
+    assert [item.is_correct for item in result.results] == [True, True, False, False, True, True, True]
+    assert result.final_score == pytest.approx(5 / 7)
+    assert verdicts.hits == 3